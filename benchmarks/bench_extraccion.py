@@ -0,0 +1,103 @@
+"""
+Compara la extracción de pedidos fila por fila (versión original del
+dashboard) contra el parser en streaming y el modo por lotes con str.extract,
+y el cálculo original de ingresos extra (re.findall sobre el chat completo en
+cada "Analizar") contra los bonos capturados en la misma lectura.
+
+Uso:
+    python benchmarks/bench_extraccion.py [num_pedidos]
+"""
+import io
+import os
+import re
+import sys
+import timeit
+from datetime import datetime
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from chat_parser import Pedido, extraer_chat, extraer_pedidos_df, iter_pedidos  # noqa: E402
+from chat_sintetico import generar_chat  # noqa: E402
+from order_pipeline import sumar_bonos  # noqa: E402
+
+
+def extraccion_original(text):
+    """Bucle original de main_dashboard.py (sin filtrado ni normalización)"""
+    data = []
+    for pedido in text.split("_*Recoger en*_")[1:]:
+        est_match = re.search(r"📍(.*?)(?:\n|$)", pedido)
+        establecimiento = est_match.group(1).strip() if est_match else "-"
+        prod_match = re.search(r"_\*Pedido\*_\n(.+?)_\*Entregar en\*_", pedido, re.S)
+        producto = prod_match.group(1).strip().replace("▪️", "").replace("◼️", "") if prod_match else "-"
+        costo_match = re.search(r"_\*Cobrar\*_\s*\n*\s*\$(\d+)", pedido)
+        costo = int(costo_match.group(1)) if costo_match else 0
+        fecha_match = re.search(r"\[(\d{2}/\d{2}/\d{2}),", pedido)
+        fecha = fecha_match.group(1) if fecha_match else None
+        data.append([fecha, establecimiento, producto, costo])
+    df = pd.DataFrame(data, columns=["fecha", "establecimiento", "producto", "costo_envio"])
+    df["fecha"] = pd.to_datetime(df["fecha"], format="%d/%m/%y", errors="coerce")
+    return df
+
+
+def extra_ingresos_original(text, fecha_inicio_dt, fecha_fin_dt):
+    """Búsqueda original de bonos de main_dashboard.py"""
+    pattern = r"\[(\d{2}/\d{2}/\d{2}),.*?\] Yupii:.*?([$🔴🟢🟡🟣🟠🟤⚫️]*\$\d+).*más de envío"
+    matches = re.findall(pattern, text)
+    total = 0
+    for fecha_str, monto_text in matches:
+        monto_match = re.search(r"\$(\d+)", monto_text)
+        monto = int(monto_match.group(1)) if monto_match else 0
+        fecha = pd.to_datetime(fecha_str, format="%d/%m/%y", errors="coerce")
+        if pd.notnull(fecha) and fecha_inicio_dt <= fecha <= fecha_fin_dt:
+            total += monto
+    return total
+
+
+def medir(funcion):
+    return min(timeit.repeat(funcion, number=1, repeat=3))
+
+
+def extraccion_streaming(text):
+    df = pd.DataFrame(iter_pedidos(io.StringIO(text)), columns=list(Pedido._fields))
+    df["fecha"] = pd.to_datetime(df["fecha"], format="%d/%m/%y", errors="coerce")
+    return df
+
+
+def extraccion_lotes(text):
+    return extraer_pedidos_df(io.StringIO(text))
+
+
+def main():
+    pedidos = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    text = generar_chat(pedidos)
+    print(f"Chat sintético: {pedidos:,} pedidos, {len(text) / 1e6:.1f} MB")
+
+    referencia = extraccion_original(text)
+    for nombre, funcion in [
+        ("original (fila por fila)", extraccion_original),
+        ("streaming (iter_pedidos)", extraccion_streaming),
+        ("lotes (str.extract)", extraccion_lotes),
+    ]:
+        # La versión original no guardaba la hora (marca_tiempo)
+        pd.testing.assert_frame_equal(funcion(text)[list(referencia.columns)], referencia, check_dtype=False)
+        segundos = medir(lambda: funcion(text))
+        print(f"{nombre:<28} {segundos * 1000:8.1f} ms")
+
+    # Bonos: antes se buscaban en el texto completo en cada "Analizar"
+    pedidos, bonos = extraer_chat(io.StringIO(text))
+    pd.testing.assert_frame_equal(pedidos[list(referencia.columns)], referencia, check_dtype=False)
+    inicio, fin = datetime(2025, 2, 1), datetime(2025, 4, 30, 23, 59, 59)
+    assert sumar_bonos(bonos, inicio, fin) == extra_ingresos_original(text, inicio, fin)
+    print(f"\nBonos en el chat: {len(bonos):,}")
+    lectura = medir(lambda: extraer_chat(io.StringIO(text))) - medir(lambda: extraccion_lotes(text))
+    print(f"{'captura en la lectura':<28} {lectura * 1000:8.1f} ms  (una vez por chat)")
+    original = medir(lambda: extra_ingresos_original(text, inicio, fin))
+    filtro = medir(lambda: sumar_bonos(bonos, inicio, fin))
+    print(f"{'por Analizar, original':<28} {original * 1000:8.1f} ms")
+    print(f"{'por Analizar, sumar_bonos':<28} {filtro * 1000:8.1f} ms  ({original / filtro:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
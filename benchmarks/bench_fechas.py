@@ -0,0 +1,66 @@
+"""
+Compara la conversión de fechas original contra date_parsing:
+
+- fechas del chat "dd/mm/yy": ``pd.to_datetime(format="%d/%m/%y")`` contra
+  ``parse_ddmmyy`` (un valor distinto se convierte una sola vez)
+- fechas ISO de un CSV exportado: ``pd.to_datetime`` con inferencia de
+  formato (lo que hacía el dashboard global) contra ``normalizar_fechas``
+
+Uso:
+    python benchmarks/bench_fechas.py [num_fechas]
+"""
+import os
+import sys
+import timeit
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from date_parsing import normalizar_fechas, parse_ddmmyy  # noqa: E402
+
+
+def generar_fechas(num_fechas, seed=0):
+    """Fechas de dos años de pedidos, con algunos valores faltantes o inválidos"""
+    rng = np.random.default_rng(seed)
+    dias = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 730, num_fechas), unit="D")
+    fechas = pd.Series(dias.strftime("%d/%m/%y"), dtype=object)
+    fechas[rng.random(num_fechas) < 0.001] = None
+    fechas[rng.random(num_fechas) < 0.001] = "31/02/25"
+    return fechas
+
+
+def medir(funcion):
+    return min(timeit.repeat(funcion, number=1, repeat=3))
+
+
+def inferencia_original(valores):
+    """Carga original del dashboard global (infer_datetime_format está obsoleto en pandas 2)"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return pd.to_datetime(valores, infer_datetime_format=True, errors="coerce")
+
+
+def main():
+    num_fechas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    chat = generar_fechas(num_fechas)
+    print(f"{num_fechas:,} fechas, {chat.nunique():,} distintas")
+
+    original = lambda: pd.to_datetime(chat, format="%d/%m/%y", errors="coerce")  # noqa: E731
+    pd.testing.assert_series_equal(parse_ddmmyy(chat), original())
+    antes, despues = medir(original), medir(lambda: parse_ddmmyy(chat))
+    print(f"{'dd/mm/yy, to_datetime(format)':<34} {antes * 1000:8.1f} ms")
+    print(f"{'dd/mm/yy, parse_ddmmyy':<34} {despues * 1000:8.1f} ms  ({antes / despues:.1f}x)")
+
+    # El CSV exportado guarda las fechas en ISO
+    iso = pd.Series(parse_ddmmyy(chat).dt.strftime("%Y-%m-%d %H:%M:%S").to_numpy(dtype=object))
+    pd.testing.assert_series_equal(normalizar_fechas(iso), inferencia_original(iso))
+    antes, despues = medir(lambda: inferencia_original(iso)), medir(lambda: normalizar_fechas(iso))
+    print(f"{'ISO, inferencia de formato':<34} {antes * 1000:8.1f} ms")
+    print(f"{'ISO, normalizar_fechas':<34} {despues * 1000:8.1f} ms  ({antes / despues:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
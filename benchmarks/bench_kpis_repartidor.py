@@ -0,0 +1,70 @@
+"""
+Compara la tabla de rendimiento por repartidor del dashboard global original
+(groupby con ``lambda x: x.dt.date.nunique()``) contra courier_kpis, que usa
+ordinales de día enteros y bincount.
+
+Uso:
+    python benchmarks/bench_kpis_repartidor.py [num_pedidos] [num_repartidores]
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from courier_kpis import dias_activos, estadisticas_por_repartidor  # noqa: E402
+
+
+def generar_pedidos(num_pedidos, num_repartidores, seed=0):
+    rng = np.random.default_rng(seed)
+    segundos = rng.integers(0, 365 * 24 * 3600, num_pedidos)
+    nombres = np.array([f"Repartidor {i:03d}" for i in range(num_repartidores)])
+    return pd.DataFrame({
+        "fecha": pd.Timestamp("2024-01-01") + pd.to_timedelta(segundos, unit="s"),
+        "repartidor": pd.Categorical(nombres[rng.integers(0, num_repartidores, num_pedidos)]),
+        "costo_envio": rng.choice([30, 35, 40, 45, 50, 60], num_pedidos).astype("int32"),
+    })
+
+
+def estadisticas_original(df):
+    """Cálculo original de global_dashboard.py"""
+    stats = df.groupby("repartidor", observed=True).agg({
+        "costo_envio": ["count", "sum", "mean"],
+        "fecha": lambda x: x.dt.date.nunique()
+    }).round(2)
+    stats.columns = ["Envíos", "Ingresos_Total", "Promedio_Envío", "Días_Activos"]
+    stats = stats.reset_index()
+    stats["Pago_Repartidor_70%"] = (stats["Ingresos_Total"] * 0.7).round(2)
+    stats["Promedio_Diario"] = (stats["Ingresos_Total"] / stats["Días_Activos"]).round(2)
+    return stats
+
+
+def medir(funcion):
+    return min(timeit.repeat(funcion, number=1, repeat=3))
+
+
+def main():
+    pedidos = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    repartidores = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    df = generar_pedidos(pedidos, repartidores)
+    print(f"Pedidos sintéticos: {pedidos:,} de {repartidores} repartidores en 365 días")
+
+    pd.testing.assert_frame_equal(estadisticas_por_repartidor(df), estadisticas_original(df), check_dtype=False)
+    assert dias_activos(df["fecha"]) == df["fecha"].dt.date.nunique()
+
+    original = medir(lambda: estadisticas_original(df))
+    vectorizado = medir(lambda: estadisticas_por_repartidor(df))
+    print(f"{'por repartidor, original (lambda)':<36} {original * 1000:8.1f} ms")
+    print(f"{'por repartidor, courier_kpis':<36} {vectorizado * 1000:8.1f} ms  ({original / vectorizado:.1f}x)")
+
+    original = medir(lambda: df["fecha"].dt.date.nunique())
+    vectorizado = medir(lambda: dias_activos(df["fecha"]))
+    print(f"{'días activos, dt.date.nunique()':<36} {original * 1000:8.1f} ms")
+    print(f"{'días activos, dias_activos':<36} {vectorizado * 1000:8.1f} ms  ({original / vectorizado:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Casos adversarios para las reglas de chat_parser: marcadores faltantes y
+mensajes gigantes que hacían que los regex originales del dashboard
+recorrieran el texto una y otra vez (tiempo cuadrático o peor).
+
+Para cada caso compara el regex original contra la regla actual en tamaños
+chicos (mismo resultado y cómo crece el tiempo al cuadruplicar la entrada) y
+verifica que la regla actual crece linealmente en entradas de varios MB.
+
+Uso:
+    python benchmarks/bench_regex_adversario.py
+"""
+import io
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from chat_parser import (  # noqa: E402
+    RE_COSTO, RE_ESTABLECIMIENTO, extraer_chat, extraer_producto, parse_linea_bono
+)
+
+# Patrones originales de main_dashboard.py
+ORIGINAL_PRODUCTO = re.compile(r"_\*Pedido\*_\n(.+?)_\*Entregar en\*_", re.S)
+ORIGINAL_COSTO = re.compile(r"_\*Cobrar\*_\s*\n*\s*\$(\d+)")
+ORIGINAL_ESTABLECIMIENTO = re.compile(r"📍(.*?)(?:\n|$)")
+ORIGINAL_BONO = re.compile(r"\[(\d{2}/\d{2}/\d{2}),.*?\] Yupii:.*?([$🔴🟢🟡🟣🟠🟤⚫️]*\$\d+).*más de envío")
+
+# Crecimiento máximo del tiempo al cuadruplicar la entrada (lineal ~4, cuadrático ~16)
+MAX_CRECIMIENTO = 8
+
+
+def grupo(match, indice=1):
+    return match.group(indice) if match else None
+
+
+def bono_original(texto):
+    match = ORIGINAL_BONO.search(texto)
+    if not match:
+        return None
+    return match.group(1), int(re.search(r"\$(\d+)", match.group(2)).group(1))
+
+
+def bono_actual(texto):
+    bono = parse_linea_bono(texto)
+    return tuple(bono) if bono else None
+
+
+# (nombre, generador de entrada de tamaño n, regla original, regla actual)
+CASOS = [
+    (
+        "producto sin _*Entregar en*_",
+        lambda n: "📍Tacos\n" + "_*Pedido*_\nTacos\n" * n + "_*Cobrar*_\n$40\n",
+        lambda texto: grupo(ORIGINAL_PRODUCTO.search(texto)),
+        extraer_producto,
+    ),
+    (
+        "producto pegado a _*Entregar en*_",
+        lambda n: "_*Pedido*_\n_*Entregar en*_" + "_*Pedido*_\n" * n,
+        lambda texto: grupo(ORIGINAL_PRODUCTO.search(texto)),
+        extraer_producto,
+    ),
+    (
+        "_*Cobrar*_ seguido de espacios",
+        lambda n: "_*Cobrar*_" + " \n" * n + "sin monto",
+        lambda texto: grupo(ORIGINAL_COSTO.search(texto)),
+        lambda texto: grupo(RE_COSTO.search(texto)),
+    ),
+    (
+        "📍 en una línea gigante",
+        lambda n: "📍" + "Tacos " * n,
+        lambda texto: grupo(ORIGINAL_ESTABLECIMIENTO.search(texto)),
+        lambda texto: grupo(RE_ESTABLECIMIENTO.search(texto)),
+    ),
+    (
+        "bono gigante sin 'más de envío'",
+        lambda n: "[01/01/25, 10:00:00] Yupii: " + "$10 " * n,
+        bono_original,
+        bono_actual,
+    ),
+    (
+        "muchas fechas sin '] Yupii:'",
+        lambda n: "[01/01/25, " * n + "más de envío",
+        bono_original,
+        bono_actual,
+    ),
+    (
+        "bono con muchos montos",
+        lambda n: "[01/01/25, 10:00:00] Yupii: " + "$10 " * n + "más de envío",
+        bono_original,
+        bono_actual,
+    ),
+]
+
+
+def medir(funcion, texto):
+    return min(timeit.repeat(lambda: funcion(texto), number=1, repeat=3))
+
+
+def chat_adversario(pedidos, repeticiones):
+    """Chat cuyos pedidos no tienen '_*Entregar en*_' y repiten '_*Pedido*_' muchas veces"""
+    pedido = (
+        "[01/01/25, 10:00:00] Yupii: _*Recoger en*_\n📍Tacos\n"
+        + "_*Pedido*_\nTacos\n" * repeticiones
+        + "_*Cobrar*_\n$40\n"
+    )
+    return pedido * pedidos + "[01/01/25, 10:00:00] Yupii: " + "$10 " * repeticiones * 4 + "\n"
+
+
+def main():
+    chico, grande = 500, 1_000_000
+    print(f"{'caso':<36} {'original x4':>12} {'actual x4':>10} {'actual ms/MB':>13}")
+    for nombre, generar, original, actual in CASOS:
+        texto, texto_x4 = generar(chico), generar(chico * 4)
+        assert original(texto) == actual(texto), nombre
+        assert original(texto_x4) == actual(texto_x4), nombre
+        crecimiento_original = medir(original, texto_x4) / medir(original, texto)
+
+        # Entradas de varios MB: solo la regla actual termina en un tiempo razonable
+        texto, texto_x4 = generar(grande // 4), generar(grande)
+        segundos, segundos_x4 = medir(actual, texto), medir(actual, texto_x4)
+        crecimiento = segundos_x4 / max(segundos, 1e-6)
+        ms_por_mb = segundos_x4 * 1000 / (len(texto_x4) / 1e6)
+        print(f"{nombre:<36} {crecimiento_original:>11.1f}x {crecimiento:>9.1f}x {ms_por_mb:>13.2f}")
+        assert crecimiento < MAX_CRECIMIENTO, f"{nombre}: crece {crecimiento:.1f}x al cuadruplicar la entrada"
+
+    # De punta a punta: bloques de pedido truncados a MAX_BLOQUE_CHARS y un mensaje gigante
+    tiempos = []
+    for pedidos in (50, 200):
+        chat = chat_adversario(pedidos, 10_000)
+        tiempos.append(medir(lambda texto: extraer_chat(io.StringIO(texto)), chat))
+        print(f"chat adversario de {len(chat) / 1e6:5.1f} MB: {tiempos[-1] * 1000:8.1f} ms")
+    assert tiempos[1] / tiempos[0] < MAX_CRECIMIENTO
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import random
+
+ESTABLECIMIENTOS = [
+    "Tacomarin Centro", "Taco Marin", "Mc Donald's", "KFC", "Tortas Lupita",
+    "Pizza-Hut local", "Star Bucks", "Mariscos El Güero", "donde sea", "-",
+]
+PRODUCTOS = [
+    "2 tacos de pastor con todo", "tiene un envio", "Combo #1", "PAGO",
+    "Hamburguesa doble con queso", "▪️Sushi roll especial", "agua",
+    "a nombre de Yupii", "Pollo asado y tortillas", "FARMACIA",
+]
+
+
+def generar_chat(pedidos: int = 10_000, seed: int = 0) -> str:
+    """
+    Genera un chat de WhatsApp sintético con el formato de pedidos de Yupii
+
+    Args:
+        pedidos: Número de pedidos a generar
+        seed: Semilla para que el chat sea reproducible
+
+    Returns:
+        Texto del chat exportado
+    """
+    rnd = random.Random(seed)
+    lineas = ["[01/01/25, 09:00:00] Yupii: Bienvenido al grupo\n"]
+    for i in range(pedidos):
+        fecha = f"{rnd.randint(1, 28):02d}/{rnd.randint(1, 12):02d}/25"
+        hora = f"{rnd.randint(8, 23):02d}:{rnd.randint(0, 59):02d}:{rnd.randint(0, 59):02d}"
+        lineas.append(
+            f"[{fecha}, {hora}] Yupii: _*Recoger en*_\n"
+            f"📍{rnd.choice(ESTABLECIMIENTOS)}\n"
+            f"_*Pedido*_\n{rnd.choice(PRODUCTOS)}\n"
+            f"_*Entregar en*_\nCalle {rnd.randint(1, 300)} #{i}\n"
+            f"_*Cobrar*_\n${rnd.choice([35, 40, 45, 50, 60])}\n"
+        )
+        if rnd.random() < 0.05:
+            lineas.append(f"[{fecha}, {hora}] Yupii: Por la lluvia 🟢${rnd.choice([10, 20])} más de envío\n")
+    return "".join(lineas)
@@ -0,0 +1,115 @@
+"""
+Verifica que las escrituras concurrentes al dataset global no pierden ni
+duplican pedidos.
+
+Varias sesiones (cada una con su propio S3Manager, como si fueran procesos
+distintos) agregan a la vez lotes que se traslapan sobre las mismas
+particiones; al final el dataset debe tener exactamente los pedidos únicos y
+el resumen diario debe sumar lo mismo que los pedidos guardados.
+
+Necesita un S3 local: define S3_ENDPOINT_URL (MinIO, moto server) o ten
+instalado moto para levantar uno en memoria.
+
+Uso:
+    python benchmarks/concurrencia_dataset.py [sesiones] [lotes_por_sesion]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+
+def levantar_s3_local():
+    """Arranca moto server si no hay un endpoint configurado y crea el bucket"""
+    if not os.getenv("S3_ENDPOINT_URL"):
+        from moto.server import ThreadedMotoServer
+
+        servidor = ThreadedMotoServer(port=5057, verbose=False)
+        servidor.start()
+        os.environ.update(
+            S3_ENDPOINT_URL="http://127.0.0.1:5057",
+            AWS_ACCESS_KEY_ID="test",
+            AWS_SECRET_ACCESS_KEY="test",
+            AWS_DEFAULT_REGION="us-east-1",
+        )
+    os.environ.setdefault("S3_BUCKET_NAME", "yupii-concurrencia")
+
+    import boto3
+
+    cliente = boto3.client("s3", endpoint_url=os.environ["S3_ENDPOINT_URL"])
+    try:
+        cliente.create_bucket(Bucket=os.environ["S3_BUCKET_NAME"])
+    except cliente.exceptions.BucketAlreadyOwnedByYou:
+        pass
+
+
+def generar_pedidos(num_pedidos, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "fecha": pd.to_datetime("2025-01-01") + pd.to_timedelta(rng.integers(0, 60, num_pedidos), unit="D"),
+        "establecimiento": rng.choice(["Oxxo", "Pizzas Juan", "Tacos El Güero"], num_pedidos),
+        "producto": rng.choice(["Producto no especificado", "Coca 600", "2 tacos"], num_pedidos),
+        "costo_envio": rng.choice([30, 35, 40, 50], num_pedidos),
+        "repartidor": rng.choice(["Ana", "Beto"], num_pedidos),
+    })
+    return df.sort_values("fecha", kind="stable").reset_index(drop=True)
+
+
+def main():
+    sesiones = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    lotes = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    levantar_s3_local()
+    from dataset_store import claves_pedidos
+    from s3_manager import S3Manager
+
+    pedidos = generar_pedidos(3000)
+    esperadas = set(claves_pedidos(pedidos).to_numpy())
+
+    def sesion(numero):
+        manager = S3Manager()
+        rng = np.random.default_rng(numero)
+        for _ in range(lotes):
+            # Rango de fechas aleatorio: los lotes de distintas sesiones se traslapan
+            inicio, fin = sorted(rng.integers(0, 60, 2))
+            fechas = pd.to_datetime("2025-01-01") + pd.to_timedelta([inicio, fin], unit="D")
+            lote = pedidos[(pedidos["fecha"] >= fechas[0]) & (pedidos["fecha"] <= fechas[1])]
+            if manager.append_dataset(lote) < 0:
+                raise RuntimeError("append_dataset falló")
+        # Cada sesión termina con el chat completo, así que no debe faltar nada
+        manager.append_dataset(pedidos)
+        return manager.commit_conflicts
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sesiones) as executor:
+        conflictos = sum(executor.map(sesion, range(sesiones)))
+    duracion = time.perf_counter() - inicio
+
+    guardado = S3Manager().load_partitions(columns=["clave"])
+    claves = guardado["clave"].to_numpy()
+    duplicados = len(claves) - len(set(claves))
+    faltantes = len(esperadas - set(claves))
+    resumidos = int(S3Manager().query_rollup()["envios"].sum())
+
+    print(f"Sesiones: {sesiones} x {lotes + 1} lotes en {duracion:.1f} s")
+    print(f"Commits reintentados por conflicto: {conflictos}")
+    print(f"Pedidos esperados: {len(esperadas):,} | guardados: {len(claves):,}")
+    print(f"Duplicados: {duplicados} | faltantes: {faltantes}")
+    print(f"Pedidos en el resumen diario: {resumidos:,}")
+    if duplicados or faltantes:
+        print("❌ Se perdieron o duplicaron pedidos")
+        return 1
+    if resumidos != len(claves):
+        print("❌ El resumen diario no coincide con los pedidos guardados")
+        return 1
+    print("✅ Sin pérdidas ni duplicados")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
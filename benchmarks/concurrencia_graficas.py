@@ -0,0 +1,105 @@
+"""
+Verifica que las gráficas del dashboard se pueden dibujar a la vez desde
+varios hilos, como pasa con varias sesiones en el servidor de Streamlit.
+
+Dibuja 50 gráficas (todas las de charts.py con datos distintos) en un pool
+de hilos y comprueba que cada PNG es idéntico al dibujado en serie, que los
+rcParams globales no cambiaron y que pyplot no registró figuras.
+
+Uso:
+    python benchmarks/concurrencia_graficas.py [graficas] [hilos]
+"""
+import copy
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import matplotlib
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from charts import (  # noqa: E402
+    dibujar_png, grafica_dias_semana, grafica_envios_por_repartidor, grafica_ingresos_por_repartidor,
+    grafica_tendencia_diaria, grafica_top_establecimientos, tarjeta_kpis
+)
+
+DIAS = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+
+
+def generar_trabajo(indice):
+    """Gráfica, datos y opciones del trabajo ``indice`` (distintos en cada uno)"""
+    rng = np.random.default_rng(indice)
+    tipo = indice % 6
+    if tipo == 0:
+        envios = int(rng.integers(10, 500))
+        ingreso = envios * 40.0
+        return tarjeta_kpis, (), dict(
+            nombre=f"Repartidor {indice}", fecha_inicio=date(2025, 1, 1), fecha_fin=date(2025, 1, 31),
+            envios=envios, ingreso=ingreso, pago=ingreso * 0.7, reparaciones=0.0,
+            entregar=ingreso * 0.3, ingresos_extra=float(rng.integers(0, 3)) * 50,
+        )
+    if tipo == 1:
+        return grafica_dias_semana, (pd.DataFrame({
+            "dia_semana": DIAS,
+            "producto": rng.integers(5, 80, 7),
+            "costo_envio": rng.integers(200, 3000, 7),
+        }),), {}
+    repartidores = pd.DataFrame({
+        "repartidor": [f"Repartidor {i}" for i in range(int(rng.integers(3, 12)))],
+    })
+    repartidores["Envíos"] = rng.integers(10, 400, len(repartidores))
+    repartidores["Ingresos_Total"] = repartidores["Envíos"] * 42
+    if tipo == 2:
+        return grafica_envios_por_repartidor, (repartidores,), {}
+    if tipo == 3:
+        return grafica_ingresos_por_repartidor, (repartidores,), {}
+    if tipo == 4:
+        dias = pd.date_range("2025-01-01", periods=int(rng.integers(20, 120)), freq="D")
+        envios = rng.integers(0, 60, len(dias))
+        return grafica_tendencia_diaria, (pd.DataFrame({
+            "fecha_solo": dias.date, "Envíos": envios, "Ingresos": envios * 40,
+        }),), {}
+    return grafica_top_establecimientos, (pd.DataFrame({
+        "establecimiento_normalizado": [f"Establecimiento {i}" for i in range(10)],
+        "Envíos": np.sort(rng.integers(5, 200, 10))[::-1],
+    }),), {}
+
+
+def dibujar(trabajo):
+    grafica, datos, opciones = trabajo
+    return dibujar_png(grafica, *datos, **opciones)
+
+
+def main():
+    num_graficas = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    hilos = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    trabajos = [generar_trabajo(i) for i in range(num_graficas)]
+    rc_inicial = copy.deepcopy(dict(matplotlib.rcParams))
+
+    inicio = time.perf_counter()
+    en_serie = [dibujar(trabajo) for trabajo in trabajos]
+    serie = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        en_paralelo = list(pool.map(dibujar, trabajos))
+    paralelo = time.perf_counter() - inicio
+
+    distintas = [i for i, (a, b) in enumerate(zip(en_serie, en_paralelo)) if a != b]
+    assert not distintas, f"PNG distintos en paralelo: {distintas}"
+    assert all(png.startswith(b"\x89PNG") for png in en_paralelo)
+    assert dict(matplotlib.rcParams) == rc_inicial, "Los rcParams globales cambiaron"
+    if "matplotlib.pyplot" in sys.modules:
+        assert not sys.modules["matplotlib.pyplot"].get_fignums(), "Quedaron figuras registradas en pyplot"
+
+    print(f"{num_graficas} gráficas, {hilos} hilos: PNG idénticos a los dibujados en serie")
+    print(f"{'en serie':<12} {serie:6.2f} s")
+    print(f"{'en paralelo':<12} {paralelo:6.2f} s  ({serie / paralelo:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
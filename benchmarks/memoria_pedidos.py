@@ -0,0 +1,115 @@
+"""
+Memoria de la tabla de pedidos con los tipos originales contra el esquema
+compacto de order_schema, en un dataset sintético parecido al real: un año
+de pedidos de varios repartidores, establecimientos con distribución de
+Zipf y productos escritos a mano (miles de textos distintos que se repiten).
+
+Cada sesión de Streamlit guarda su propia tabla: con el esquema compacto
+cada copia solo tiene códigos y el texto de los productos existe una sola
+vez en el diccionario compartido. También mide cuánto cuesta codificar un
+lote chico cuando el diccionario ya es grande: con productos conocidos se
+reutiliza el tipo vigente y con uno nuevo se publica una versión.
+
+Uso:
+    python benchmarks/memoria_pedidos.py [num_pedidos] [sesiones]
+"""
+import os
+import sys
+import time
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from order_schema import PRODUCTOS, memoria_bytes, normalizar_tipos  # noqa: E402
+
+PLATILLOS = [
+    "tacos de pastor", "tacos de asada", "hamburguesa doble", "pizza grande de peperoni",
+    "sushi roll especial", "pollo asado", "tortas de milanesa", "quesadillas", "enchiladas verdes",
+    "café americano", "frappé de moka", "agua de jamaica", "medicamento de farmacia", "despensa",
+]
+DETALLES = [
+    "con todo", "sin cebolla", "extra queso", "para llevar", "con salsa aparte",
+    "bien dorado", "sin picante", "con papas", "y refresco", "",
+]
+MB = 1024 * 1024
+
+
+def zipf(rng, n, tamano, a=1.3):
+    """Índices en [0, n) con distribución de Zipf (pocos valores muy frecuentes)"""
+    return (rng.zipf(a, tamano) - 1) % n
+
+
+def generar_pedidos(num_pedidos, seed=0):
+    """Pedidos con los tipos que tenían las tablas de ambos dashboards antes del esquema compacto"""
+    rng = np.random.default_rng(seed)
+    establecimientos = [f"Establecimiento {i}" for i in range(400)]
+    productos = [
+        f"{rng.integers(1, 6)} {PLATILLOS[rng.integers(len(PLATILLOS))]} {DETALLES[rng.integers(len(DETALLES))]}".strip()
+        + f" #{i}"
+        for i in range(20_000)
+    ]
+    repartidores = [f"Repartidor {i}" for i in range(40)]
+
+    dias = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, num_pedidos), unit="D")
+    segundos = rng.integers(8 * 3600, 23 * 3600, num_pedidos)
+    return pd.DataFrame({
+        "fecha": dias,
+        "establecimiento": np.array(establecimientos, dtype=object)[zipf(rng, len(establecimientos), num_pedidos)],
+        "producto": np.array(productos, dtype=object)[zipf(rng, len(productos), num_pedidos)],
+        "costo_envio": rng.choice([35, 40, 45, 50, 60], num_pedidos).astype(np.int64),
+        "marca_tiempo": pd.array(dias.values.astype("datetime64[s]").astype(np.int64) + segundos, dtype="Int64"),
+        "repartidor": np.array(repartidores, dtype=object)[rng.integers(0, len(repartidores), num_pedidos)],
+    })
+
+
+def main():
+    num_pedidos = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    sesiones = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    original = generar_pedidos(num_pedidos)
+    compacta = normalizar_tipos(original.copy())
+    segundos = min(timeit.repeat(lambda: normalizar_tipos(original.copy()), number=1, repeat=3))
+
+    # Mismos datos: solo cambió la representación
+    pd.testing.assert_frame_equal(
+        compacta.astype({"establecimiento": object, "producto": object, "repartidor": object,
+                         "costo_envio": np.int64, "fecha": "datetime64[ns]"}),
+        original,
+    )
+
+    print(f"{num_pedidos:,} pedidos, {original['producto'].nunique():,} productos distintos, "
+          f"{original['establecimiento'].nunique():,} establecimientos")
+    print(f"\n{'columna':<16} {'original':>10} {'compacta':>10}  tipo")
+    antes, despues = original.memory_usage(deep=True), compacta.memory_usage(deep=True)
+    despues["producto"] = compacta["producto"].cat.codes.nbytes
+    for columna in original.columns:
+        print(f"{columna:<16} {antes[columna] / MB:8.1f} MB {despues[columna] / MB:7.1f} MB  {compacta[columna].dtype.name}")
+
+    total_original = int(antes.sum())
+    total_compacta = memoria_bytes(compacta)
+    diccionario = PRODUCTOS.memoria_bytes()
+    print(f"{'total':<16} {total_original / MB:8.1f} MB {total_compacta / MB:7.1f} MB  "
+          f"(+ {diccionario / MB:.1f} MB del diccionario compartido, una vez por proceso)")
+    print(f"\nConversión al esquema compacto: {segundos * 1000:.1f} ms")
+
+    en_sesiones = total_compacta * sesiones + diccionario
+    print(f"{sesiones} sesiones con su copia: {total_original * sesiones / MB:,.1f} MB -> "
+          f"{en_sesiones / MB:,.1f} MB ({total_original * sesiones / en_sesiones:.1f}x menos)")
+
+    lotes = 200
+    for descripcion, lote in [
+        ("productos conocidos", lambda i: [original["producto"].iat[i], original["producto"].iat[i + 1]]),
+        ("un producto nuevo", lambda i: [f"producto nuevo {i}", original["producto"].iat[i]]),
+    ]:
+        inicio = time.perf_counter()
+        for i in range(lotes):
+            PRODUCTOS.codificar(pd.Series(lote(i)))
+        por_lote = (time.perf_counter() - inicio) / lotes
+        print(f"Lote con {descripcion} ({len(PRODUCTOS):,} textos en el diccionario): {por_lote * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
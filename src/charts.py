@@ -0,0 +1,304 @@
+import hashlib
+import io
+import os
+from typing import Callable
+
+import matplotlib.patches as patches
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from size_cache import SizeBoundedCache
+
+# Colores corporativos Yupii
+YUPII_BLUE = "#185E8D"
+YUPII_CYAN = "#00AEEF"
+YUPII_BLACK = "#000000"
+
+# Resolución de las gráficas en pantalla (la misma que usaba st.pyplot) y de las descargas
+DPI_PANTALLA = 200
+DPI_DESCARGA = 300
+
+# Límite de memoria para los PNG ya renderizados (compartido por todas las sesiones)
+CACHE_MAX_MB = int(os.getenv("CHART_CACHE_MAX_MB", "64"))
+
+_cache = SizeBoundedCache(CACHE_MAX_MB * 1024 * 1024)
+
+# Estilo "whitegrid" de seaborn; se aplica a cada eje en lugar de cambiar los rcParams globales
+GRIS_CUADRICULA = ".8"
+GRIS_TEXTO = ".15"
+
+
+def huella(*valores) -> str:
+    """
+    Hash estable de los datos y opciones de una gráfica
+
+    Los DataFrame y Series se hashean por contenido (valores, índice y
+    nombres de columnas), las funciones por su nombre completo y el resto de
+    valores por su ``repr``.
+    """
+    digest = hashlib.sha1()
+    for valor in valores:
+        if isinstance(valor, (pd.DataFrame, pd.Series)):
+            nombres = list(valor.columns) if isinstance(valor, pd.DataFrame) else [valor.name]
+            digest.update(repr(nombres).encode("utf-8"))
+            digest.update(pd.util.hash_pandas_object(valor, index=True).to_numpy().tobytes())
+        elif callable(valor):
+            digest.update(f"{valor.__module__}.{valor.__qualname__}".encode("utf-8"))
+        else:
+            digest.update(repr(valor).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def render_png(grafica: Callable[..., Figure], *datos, dpi: int = DPI_PANTALLA, **opciones) -> bytes:
+    """
+    Dibuja una gráfica y devuelve el PNG terminado, reutilizándolo si nada cambió
+
+    La cache se indexa por la gráfica, la resolución y la huella de los datos
+    agregados y las opciones: una ejecución con los mismos datos no vuelve a
+    dibujar ni a rasterizar.
+
+    Args:
+        grafica: Función de este módulo que construye la figura
+        *datos: Datos agregados que recibe la gráfica
+        dpi: Resolución del PNG
+        **opciones: Opciones de la gráfica (deben tener un ``repr`` estable)
+
+    Returns:
+        Bytes del PNG
+    """
+    clave = (grafica.__name__, dpi, huella(*datos, sorted(opciones.items())))
+    png = _cache.get(clave)
+    if png is None:
+        png = dibujar_png(grafica, *datos, dpi=dpi, **opciones)
+        _cache.put(clave, png, len(png))
+    return png
+
+
+def dibujar_png(grafica: Callable[..., Figure], *datos, dpi: int = DPI_PANTALLA, **opciones) -> bytes:
+    """
+    Dibuja una gráfica y la rasteriza a PNG sin pasar por la cache
+
+    Cada llamada trabaja sobre su propia figura y su propio canvas Agg, sin
+    pyplot ni rcParams globales, así que varias sesiones pueden dibujar a la
+    vez en hilos distintos.
+    """
+    fig = grafica(*datos, **opciones)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    return buffer.getvalue()
+
+
+def _nueva_figura(**kwargs) -> Figure:
+    """Figura con su propio canvas Agg (no se registra en pyplot)"""
+    fig = Figure(**kwargs)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def _estilo_cuadricula(*axes) -> None:
+    """Aplica a los ejes el estilo "whitegrid" de seaborn: fondo blanco, cuadrícula gris y sin marcas"""
+    for ax in axes:
+        ax.set_facecolor("white")
+        ax.set_axisbelow(True)
+        ax.grid(True, color=GRIS_CUADRICULA, linestyle="-")
+        for spine in ax.spines.values():
+            spine.set_edgecolor(GRIS_CUADRICULA)
+        ax.tick_params(which="both", bottom=False, top=False, left=False, right=False, colors=GRIS_TEXTO)
+
+
+def tarjeta_kpis(nombre, fecha_inicio, fecha_fin, envios, ingreso, pago, reparaciones, entregar,
+                 ingresos_extra) -> Figure:
+    """Tarjeta tipo reporte con los KPIs de un repartidor en un rango de fechas"""
+    fig = _nueva_figura(figsize=(8, 7), dpi=200)
+    ax = fig.subplots()
+    ax.axis('off')
+    # Fondo con color corporativo
+    rect = patches.Rectangle((0, 0), 1, 1, transform=ax.transAxes, color=YUPII_CYAN, alpha=0.12)
+    ax.add_patch(rect)
+    # Título
+    ax.text(0.5, 0.95, "Dashboard Yupii para Repartidores", fontsize=20, fontweight='bold', color=YUPII_BLUE, ha='center', va='top')
+    # Nombre
+    ax.text(0.5, 0.88, f"Repartidor: {nombre}", fontsize=16, fontweight='bold', color=YUPII_BLACK, ha='center', va='top')
+    # Fechas
+    ax.text(0.5, 0.82, f"Rango: {fecha_inicio.strftime('%d/%m/%Y')} - {fecha_fin.strftime('%d/%m/%Y')}", fontsize=13, color=YUPII_BLACK, ha='center', va='top')
+    # KPIs
+    kpi_labels = [
+        "Envíos totales:",
+        "Ingreso total:",
+        "Pago al repartidor (70%):",
+        "Reparaciones:",
+        "Total a entregar a Yupii:",
+    ]
+    kpi_values = [
+        f"{envios}",
+        f"${ingreso:,.2f}",
+        f"${pago:,.2f}",
+        f"${reparaciones:,.2f}",
+        f"${entregar:,.2f}",
+    ]
+    for i, (label, value) in enumerate(zip(kpi_labels, kpi_values)):
+        ax.text(0.05, 0.7 - i*0.09, label, fontsize=14, color=YUPII_BLUE, ha='left', va='center')
+        ax.text(0.95, 0.7 - i*0.09, value, fontsize=14, color=YUPII_BLACK, ha='right', va='center')
+    # Ingresos extra
+    if ingresos_extra > 0:
+        ax.text(0.5, 0.25, f"Ingresos extra por mensajes de Yupii: ${ingresos_extra:,.2f}", fontsize=13, color="#008000", ha='center', va='center')
+    # Footer
+    ax.text(0.5, 0.08, "Colores corporativos Yupii: #185E8D, #00AEEF, #000000", fontsize=10, color=YUPII_BLACK, ha='center', va='center')
+    fig.tight_layout()
+    return fig
+
+
+def grafica_dias_semana(resumen_dias: pd.DataFrame) -> Figure:
+    """
+    Barras dobles de pedidos (eje izquierdo) e ingresos (eje derecho) por día de la semana
+
+    Args:
+        resumen_dias: Columnas 'dia_semana', 'producto' (pedidos) y 'costo_envio' (ingresos)
+    """
+    fig = _nueva_figura(figsize=(12, 7), dpi=200)
+    ax1 = fig.subplots()
+    ax2 = ax1.twinx()
+
+    # Configurar estilo
+    _estilo_cuadricula(ax1, ax2)
+
+    # Eje primario (pedidos)
+    x_pos = range(len(resumen_dias))
+    bars1 = ax1.bar([x - 0.2 for x in x_pos], resumen_dias["producto"],
+                   width=0.4, label="Pedidos", color=YUPII_BLUE, alpha=0.8, edgecolor="white")
+
+    # Eje secundario (ingresos)
+    bars2 = ax2.bar([x + 0.2 for x in x_pos], resumen_dias["costo_envio"],
+                   width=0.4, label="Ingresos ($)", color=YUPII_CYAN, alpha=0.8, edgecolor="white")
+
+    # Configurar etiquetas y títulos
+    ax1.set_xlabel("Día de la Semana", fontsize=14, color=YUPII_BLACK)
+    ax1.set_ylabel("Número de Pedidos", fontsize=14, color=YUPII_BLUE)
+    ax2.set_ylabel("Ingresos ($)", fontsize=14, color=YUPII_CYAN)
+    ax1.set_title("Pedidos e Ingresos por Día de la Semana", fontsize=16, color=YUPII_BLACK, fontweight='bold')
+
+    # Configurar ejes
+    ax1.set_xticks(x_pos)
+    ax1.set_xticklabels(resumen_dias["dia_semana"], rotation=45, ha='right')
+    ax1.tick_params(axis='y', labelcolor=YUPII_BLUE)
+    ax2.tick_params(axis='y', labelcolor=YUPII_CYAN)
+
+    # Agregar valores en las barras
+    for i, (bar1, bar2) in enumerate(zip(bars1, bars2)):
+        # Valor de pedidos
+        ax1.text(bar1.get_x() + bar1.get_width()/2, bar1.get_height() + 0.5,
+                f'{int(resumen_dias.iloc[i]["producto"])}',
+                ha='center', va='bottom', fontsize=10, color=YUPII_BLUE, fontweight='bold')
+        # Valor de ingresos
+        ax2.text(bar2.get_x() + bar2.get_width()/2, bar2.get_height() + max(resumen_dias["costo_envio"])*0.01,
+                f'${int(resumen_dias.iloc[i]["costo_envio"])}',
+                ha='center', va='bottom', fontsize=10, color=YUPII_CYAN, fontweight='bold')
+
+    # Leyenda combinada
+    lines1, labels1 = ax1.get_legend_handles_labels()
+    lines2, labels2 = ax2.get_legend_handles_labels()
+    ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper left')
+
+    fig.tight_layout()
+    return fig
+
+
+def grafica_envios_por_repartidor(stats_repartidor: pd.DataFrame) -> Figure:
+    """Barras con el número de envíos de cada repartidor (columnas 'repartidor' y 'Envíos')"""
+    fig = _nueva_figura(figsize=(10, 6))
+    ax1 = fig.subplots()
+
+    bars = ax1.bar(stats_repartidor["repartidor"], stats_repartidor["Envíos"],
+                  color=YUPII_BLUE, alpha=0.8)
+
+    ax1.set_xlabel("Repartidor", fontsize=12, color=YUPII_BLACK)
+    ax1.set_ylabel("Número de Envíos", fontsize=12, color=YUPII_BLACK)
+    ax1.set_title("Envíos por Repartidor", fontsize=14, color=YUPII_BLACK, fontweight='bold')
+    ax1.tick_params(axis='x', rotation=45)
+
+    # Agregar valores en las barras
+    for bar in bars:
+        height = bar.get_height()
+        ax1.text(bar.get_x() + bar.get_width()/2., height + 0.5,
+                f'{int(height)}',
+                ha='center', va='bottom', fontsize=10, color=YUPII_BLACK)
+
+    fig.tight_layout()
+    return fig
+
+
+def grafica_ingresos_por_repartidor(stats_repartidor: pd.DataFrame) -> Figure:
+    """Barras con los ingresos de cada repartidor (columnas 'repartidor' e 'Ingresos_Total')"""
+    fig = _nueva_figura(figsize=(10, 6))
+    ax2 = fig.subplots()
+
+    bars = ax2.bar(stats_repartidor["repartidor"], stats_repartidor["Ingresos_Total"],
+                  color=YUPII_CYAN, alpha=0.8)
+
+    ax2.set_xlabel("Repartidor", fontsize=12, color=YUPII_BLACK)
+    ax2.set_ylabel("Ingresos Totales ($)", fontsize=12, color=YUPII_BLACK)
+    ax2.set_title("Ingresos por Repartidor", fontsize=14, color=YUPII_BLACK, fontweight='bold')
+    ax2.tick_params(axis='x', rotation=45)
+
+    # Agregar valores en las barras
+    for bar in bars:
+        height = bar.get_height()
+        ax2.text(bar.get_x() + bar.get_width()/2., height + max(stats_repartidor["Ingresos_Total"])*0.01,
+                f'${int(height)}',
+                ha='center', va='bottom', fontsize=10, color=YUPII_BLACK)
+
+    fig.tight_layout()
+    return fig
+
+
+def grafica_tendencia_diaria(tendencia: pd.DataFrame) -> Figure:
+    """Líneas de envíos e ingresos por día (columnas 'fecha_solo', 'Envíos' e 'Ingresos')"""
+    fig = _nueva_figura(figsize=(14, 10))
+    ax3, ax4 = fig.subplots(2, 1)
+
+    # Envíos por día
+    ax3.plot(tendencia["fecha_solo"], tendencia["Envíos"],
+            marker='o', linewidth=2, color=YUPII_BLUE, markersize=4)
+    ax3.set_ylabel("Número de Envíos", fontsize=12, color=YUPII_BLUE)
+    ax3.set_title("Tendencia Diaria de Envíos", fontsize=14, color=YUPII_BLACK, fontweight='bold')
+    ax3.grid(True, alpha=0.3)
+    ax3.tick_params(axis='x', rotation=45)
+
+    # Ingresos por día
+    ax4.plot(tendencia["fecha_solo"], tendencia["Ingresos"],
+            marker='s', linewidth=2, color=YUPII_CYAN, markersize=4)
+    ax4.set_xlabel("Fecha", fontsize=12, color=YUPII_BLACK)
+    ax4.set_ylabel("Ingresos ($)", fontsize=12, color=YUPII_CYAN)
+    ax4.set_title("Tendencia Diaria de Ingresos", fontsize=14, color=YUPII_BLACK, fontweight='bold')
+    ax4.grid(True, alpha=0.3)
+    ax4.tick_params(axis='x', rotation=45)
+
+    fig.tight_layout()
+    return fig
+
+
+def grafica_top_establecimientos(top: pd.DataFrame) -> Figure:
+    """Barras horizontales de envíos por establecimiento (columnas 'establecimiento_normalizado' y 'Envíos')"""
+    fig = _nueva_figura(figsize=(10, 8))
+    ax5 = fig.subplots()
+
+    # Crear gráfica horizontal para mejor legibilidad
+    y_pos = range(len(top))
+    bars = ax5.barh(y_pos, top["Envíos"], color=YUPII_BLUE, alpha=0.8)
+
+    ax5.set_yticks(y_pos)
+    ax5.set_yticklabels(top["establecimiento_normalizado"], fontsize=10)
+    ax5.set_xlabel("Número de Envíos", fontsize=12, color=YUPII_BLACK)
+    ax5.set_title("Top 10 Establecimientos por Envíos", fontsize=14, color=YUPII_BLACK, fontweight='bold')
+
+    # Agregar valores en las barras
+    for i, bar in enumerate(bars):
+        width = bar.get_width()
+        ax5.text(width + 0.5, bar.get_y() + bar.get_height()/2,
+                f'{int(width)}',
+                ha='left', va='center', fontsize=9, color=YUPII_BLACK)
+
+    fig.tight_layout()
+    return fig
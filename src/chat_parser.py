@@ -0,0 +1,335 @@
+import re
+import pandas as pd
+from typing import IO, Iterator, List, NamedTuple, Optional, Tuple
+
+from date_parsing import PATRON_SUFIJO_12H, marcas_de_tiempo, parse_ddmmyy
+
+# Marcador que abre cada pedido dentro del chat exportado de WhatsApp
+MARCADOR_PEDIDO = "_*Recoger en*_"
+
+# Límite de caracteres que se conservan por pedido. Los datos de un pedido
+# siempre aparecen en sus primeras líneas; el resto del bloque (mensajes que
+# no son pedidos) se descarta para mantener la memoria acotada.
+MAX_BLOQUE_CHARS = 64 * 1024
+
+# Caracteres que se leen del archivo en cada paso
+TAMANO_LECTURA = 1024 * 1024
+
+# Marcadores fijos: se buscan con str.find en lugar de dentro de un regex
+MARCA_PRODUCTO = "_*Pedido*_\n"
+MARCA_ENTREGA = "_*Entregar en*_"
+MARCA_BONO = "] Yupii:"
+MARCA_ENVIO_EXTRA = "más de envío"
+
+# Límite de caracteres por línea al buscar bonos: los mensajes de bono son
+# cortos, de una línea más larga solo se revisa el inicio
+MAX_LINEA_CHARS = 64 * 1024
+
+# Patrones compilados una sola vez al importar el módulo. Todos corren en
+# tiempo lineal: no terminan en ".*" ambiguos ni tienen cuantificadores
+# seguidos que compitan por los mismos caracteres (ver
+# benchmarks/bench_regex_adversario.py)
+RE_ESTABLECIMIENTO = re.compile(r"📍([^\n]*)")
+RE_COSTO = re.compile(r"_\*Cobrar\*_\s*+\$(\d+)")
+# Fecha y, si la tiene, hora del mensaje: "[dd/mm/yy, hh:mm:ss]" o, con reloj
+# de 12 horas, "[dd/mm/yy, h:mm:ss p. m.]" (la hora se captura con su sufijo)
+RE_FECHA = re.compile(
+    r"\[(\d{2}/\d{2}/\d{2}),(?: (\d{1,2}:\d{2}(?::\d{2})?(?:" + PATRON_SUFIJO_12H + r")?))?"
+)
+RE_MONTO = re.compile(r"\$(\d+)")
+
+
+class Pedido(NamedTuple):
+    """Pedido extraído del chat, antes de filtrar productos o normalizar establecimientos"""
+
+    fecha: Optional[str]
+    establecimiento: str
+    producto: str
+    costo_envio: int
+    hora: Optional[str] = None
+
+
+class Bono(NamedTuple):
+    """Ingreso extra anunciado por Yupii en el chat, antes de convertir la fecha"""
+
+    fecha: str
+    monto: int
+
+
+class _LectorBonos:
+    """
+    Busca mensajes de bono en el texto que va leyendo ``iter_bloques``
+
+    Recibe cada lectura tal cual y revisa solo las líneas completas que
+    contienen MARCA_BONO; la línea en curso se guarda (hasta
+    MAX_LINEA_CHARS) hasta que llega su salto de línea.
+    """
+
+    def __init__(self, bonos: List[Bono]):
+        self.bonos = bonos
+        self.linea = ""
+        self.truncada = False
+
+    def agregar(self, lectura: str) -> None:
+        if self.truncada:
+            # El resto de una línea demasiado larga se descarta hasta el siguiente salto
+            salto = lectura.find("\n")
+            if salto == -1:
+                return
+            self._buscar(self.linea, len(self.linea))
+            self.linea = ""
+            self.truncada = False
+            lectura = lectura[salto + 1:]
+
+        texto = self.linea + lectura
+        corte = texto.rfind("\n")
+        if corte != -1:
+            self._buscar(texto, corte)
+            texto = texto[corte + 1:]
+        if len(texto) > MAX_LINEA_CHARS:
+            texto = texto[:MAX_LINEA_CHARS]
+            self.truncada = True
+        self.linea = texto
+
+    def terminar(self) -> None:
+        self._buscar(self.linea, len(self.linea))
+        self.linea = ""
+        self.truncada = False
+
+    def _buscar(self, texto: str, fin: int) -> None:
+        """Agrega los bonos de las líneas de ``texto[:fin]`` (a lo más uno por línea)"""
+        pos = texto.find(MARCA_BONO, 0, fin)
+        while pos != -1:
+            inicio = texto.rfind("\n", 0, pos) + 1
+            final = texto.find("\n", pos, fin)
+            if final == -1:
+                final = fin
+            bono = parse_linea_bono(texto, inicio, final)
+            if bono:
+                self.bonos.append(bono)
+            pos = texto.find(MARCA_BONO, final, fin)
+
+
+def parse_linea_bono(texto: str, inicio: int = 0, fin: Optional[int] = None) -> Optional[Bono]:
+    r"""
+    Extrae el bono de una línea "[dd/mm/yy, hh:mm:ss] Yupii: ... $N ... más de envío"
+
+    Equivale a ``re.search(r"\[(\d{2}/\d{2}/\d{2}),.*?\] Yupii:.*?\$(\d+).*más de envío", linea)``
+    pero en tiempo lineal: si la línea cumple el patrón, lo cumple desde su
+    primera fecha, su primer "] Yupii:" y su primer "$N", así que cada parte
+    se busca una sola vez en lugar de reintentar con cada combinación.
+
+    Args:
+        texto: Texto que contiene la línea
+        inicio: Posición donde empieza la línea
+        fin: Posición donde termina la línea (sin el salto de línea)
+
+    Returns:
+        Bono o None si la línea no es un mensaje de bono
+    """
+    if fin is None:
+        fin = len(texto)
+    fecha = RE_FECHA.search(texto, inicio, fin)
+    if not fecha:
+        return None
+    yupii = texto.find(MARCA_BONO, fecha.end(), fin)
+    if yupii == -1:
+        return None
+    monto = RE_MONTO.search(texto, yupii + len(MARCA_BONO), fin)
+    if not monto or texto.find(MARCA_ENVIO_EXTRA, monto.end(), fin) == -1:
+        return None
+    return Bono(fecha.group(1), int(monto.group(1)))
+
+
+def iter_bloques(archivo: IO[str], tamano_lectura: int = TAMANO_LECTURA,
+                 bonos: Optional[List[Bono]] = None) -> Iterator[str]:
+    """
+    Recorre el chat una sola vez y entrega el texto de cada pedido
+
+    Equivale a ``text.split(MARCADOR_PEDIDO)[1:]`` pero sin cargar el chat
+    completo en memoria: se lee por bloques de tamaño fijo y solo se mantiene
+    el pedido en curso.
+
+    Args:
+        archivo: Objeto tipo archivo de texto con el chat exportado
+        tamano_lectura: Caracteres a leer en cada llamada a ``read``
+        bonos: Lista donde agregar los mensajes de bono encontrados en la
+            misma pasada (estén o no dentro de un pedido); queda completa
+            cuando se termina de recorrer el iterador
+
+    Returns:
+        Iterador con el texto que sigue a cada marcador de pedido
+    """
+    partes = None  # None mientras no se haya encontrado el primer marcador
+    tamano = 0
+    resto = ""
+    # Caracteres finales que se guardan por si el marcador quedó partido entre dos lecturas
+    cola = len(MARCADOR_PEDIDO) - 1
+    lector_bonos = _LectorBonos(bonos) if bonos is not None else None
+
+    while True:
+        lectura = archivo.read(tamano_lectura)
+        if lector_bonos is not None:
+            if lectura:
+                lector_bonos.agregar(lectura)
+            else:
+                lector_bonos.terminar()
+        if lectura:
+            fragmentos = (resto + lectura).split(MARCADOR_PEDIDO)
+            ultimo = fragmentos[-1]
+            resto = ultimo[-cola:] if len(ultimo) > cola else ultimo
+            fragmentos[-1] = ultimo[:len(ultimo) - len(resto)]
+        else:
+            fragmentos = [resto]
+
+        if partes is not None and tamano < MAX_BLOQUE_CHARS:
+            partes.append(fragmentos[0][:MAX_BLOQUE_CHARS - tamano])
+            tamano += len(partes[-1])
+
+        for fragmento in fragmentos[1:]:
+            if partes is not None:
+                yield "".join(partes)
+            partes = [fragmento[:MAX_BLOQUE_CHARS]]
+            tamano = len(partes[0])
+
+        if not lectura:
+            break
+
+    if partes is not None:
+        yield "".join(partes)
+
+
+def extraer_producto(bloque: str) -> Optional[str]:
+    r"""
+    Texto del producto: entre el primer "_*Pedido*_" y el siguiente "_*Entregar en*_"
+
+    Equivale a ``re.search(r"_\*Pedido\*_\n(.+?)_\*Entregar en\*_", bloque, re.S)``
+    pero con dos ``str.find``: si falta el marcador de entrega el regex volvía
+    a recorrer el resto del bloque desde cada "_*Pedido*_" (tiempo cuadrático).
+
+    Args:
+        bloque: Texto que sigue a un marcador de pedido
+
+    Returns:
+        Texto sin limpiar o None si falta alguno de los marcadores
+    """
+    inicio = bloque.find(MARCA_PRODUCTO)
+    if inicio == -1:
+        return None
+    inicio += len(MARCA_PRODUCTO)
+    # El producto tiene al menos un carácter
+    fin = bloque.find(MARCA_ENTREGA, inicio + 1)
+    if fin == -1:
+        return None
+    return bloque[inicio:fin]
+
+
+def parse_bloque(bloque: str) -> Pedido:
+    """
+    Extrae los campos de un pedido a partir de su bloque de texto
+
+    Args:
+        bloque: Texto que sigue a un marcador de pedido
+
+    Returns:
+        Pedido con fecha (dd/mm/yy), establecimiento, producto, costo de envío
+        y hora del mensaje (hh:mm:ss, con su sufijo si el chat usa reloj de 12 horas)
+    """
+    est_match = RE_ESTABLECIMIENTO.search(bloque)
+    establecimiento = est_match.group(1).strip() if est_match else "-"
+
+    producto = extraer_producto(bloque)
+    producto = producto.strip().replace("▪️", "").replace("◼️", "") if producto is not None else "-"
+
+    costo_match = RE_COSTO.search(bloque)
+    costo = int(costo_match.group(1)) if costo_match else 0
+
+    fecha_match = RE_FECHA.search(bloque)
+    fecha = fecha_match.group(1) if fecha_match else None
+    hora = fecha_match.group(2) if fecha_match else None
+
+    return Pedido(fecha, establecimiento, producto, costo, hora)
+
+
+def iter_pedidos(archivo: IO[str]) -> Iterator[Pedido]:
+    """
+    Lee el chat en una sola pasada y entrega cada pedido encontrado
+
+    Args:
+        archivo: Objeto tipo archivo de texto con el chat exportado
+
+    Returns:
+        Iterador de Pedido en el orden en que aparecen en el chat
+    """
+    for bloque in iter_bloques(archivo):
+        yield parse_bloque(bloque)
+
+
+def extraer_pedidos_df(archivo: IO[str], bonos: Optional[List[Bono]] = None) -> pd.DataFrame:
+    """
+    Extrae todos los pedidos del chat en modo por lotes
+
+    Carga los bloques de pedido en una sola Series y obtiene cada campo con
+    un ``Series.str.extract`` (el producto con ``extraer_producto``), en lugar
+    de construir el DataFrame fila por fila.
+
+    Args:
+        archivo: Objeto tipo archivo de texto con el chat exportado
+        bonos: Lista donde agregar los mensajes de bono (ver ``iter_bloques``)
+
+    Returns:
+        DataFrame con columnas fecha (datetime, el día), establecimiento,
+        producto, costo_envio y marca_tiempo (Int64, segundos desde
+        1970-01-01 en la hora local del chat; ver ``marcas_de_tiempo``)
+    """
+    bloques = pd.Series(list(iter_bloques(archivo, bonos=bonos)), dtype=object)
+
+    establecimiento = bloques.str.extract(RE_ESTABLECIMIENTO, expand=False).str.strip()
+    producto = (
+        bloques.map(extraer_producto)
+        .str.strip()
+        .str.replace("▪️", "", regex=False)
+        .str.replace("◼️", "", regex=False)
+    )
+    costo = bloques.str.extract(RE_COSTO, expand=False)
+    fecha_hora = bloques.str.extract(RE_FECHA)
+    fecha = parse_ddmmyy(fecha_hora[0])
+
+    return pd.DataFrame({
+        "fecha": fecha,
+        "establecimiento": establecimiento.fillna("-").astype(object),
+        "producto": producto.fillna("-").astype(object),
+        "costo_envio": costo.fillna("0").astype(int),
+        "marca_tiempo": marcas_de_tiempo(fecha, fecha_hora[1]),
+    })
+
+
+def bonos_df(bonos: List[Bono]) -> pd.DataFrame:
+    """
+    Tabla tipada de bonos
+
+    Args:
+        bonos: Bonos en el orden en que aparecen en el chat
+
+    Returns:
+        DataFrame con columnas fecha (datetime, NaT si no es válida) y monto (int64)
+    """
+    return pd.DataFrame({
+        "fecha": parse_ddmmyy(pd.Series([bono.fecha for bono in bonos], dtype=object)),
+        "monto": pd.Series([bono.monto for bono in bonos], dtype="int64"),
+    })
+
+
+def extraer_chat(archivo: IO[str]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Extrae pedidos y bonos del chat en una sola lectura
+
+    Args:
+        archivo: Objeto tipo archivo de texto con el chat exportado
+
+    Returns:
+        Tupla (pedidos como en ``extraer_pedidos_df``, bonos como en ``bonos_df``)
+    """
+    bonos: List[Bono] = []
+    pedidos = extraer_pedidos_df(archivo, bonos=bonos)
+    return pedidos, bonos_df(bonos)
@@ -0,0 +1,111 @@
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from date_parsing import normalizar_fechas
+
+# Parte de los ingresos que se paga al repartidor
+PAGO_REPARTIDOR = 0.7
+
+# Tamaño máximo (repartidores x días) de la tabla de marcas para contar días
+# distintos en O(n); con rangos más grandes se ordena con np.unique
+MAX_MARCAS = 50_000_000
+
+# Columnas de la tabla de rendimiento, en el orden en que se muestran
+COLUMNAS_ESTADISTICAS = [
+    "repartidor", "Envíos", "Ingresos_Total", "Promedio_Envío",
+    "Días_Activos", "Pago_Repartidor_70%", "Promedio_Diario",
+]
+
+
+def dias_ordinales(fechas: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convierte fechas a número de día (días desde 1970-01-01) sin crear objetos date
+
+    Args:
+        fechas: Serie datetime64
+
+    Returns:
+        Tupla (ordinales int64, máscara de fechas válidas)
+    """
+    valores = normalizar_fechas(fechas).to_numpy(dtype="datetime64[ns]")
+    validas = ~np.isnat(valores)
+    return valores.astype("datetime64[D]").astype(np.int64), validas
+
+
+def dias_activos(fechas: pd.Series) -> int:
+    """Número de días distintos con al menos una fecha (equivale a ``dt.date.nunique()``)"""
+    ordinales, validas = dias_ordinales(fechas)
+    return int(_dias_distintos(np.zeros(validas.sum(), dtype=np.int64), ordinales[validas], 1)[0])
+
+
+def _dias_distintos(codigos: np.ndarray, dias: np.ndarray, total: int) -> np.ndarray:
+    """Días distintos de cada código (0..total-1) a partir de pares (código, día)"""
+    if not len(dias):
+        return np.zeros(total, dtype=np.int64)
+    primero = dias.min()
+    tramo = int(dias.max() - primero + 1)
+    if total * tramo <= MAX_MARCAS:
+        # Una marca por (código, día): sin ordenar, lineal en el número de renglones
+        marcas = np.zeros((total, tramo), dtype=bool)
+        marcas[codigos, dias - primero] = True
+        return marcas.sum(axis=1)
+    pares = np.unique(codigos.astype(np.int64) * tramo + (dias - primero))
+    return np.bincount(pares // tramo, minlength=total)
+
+
+def estadisticas_por_repartidor(df: pd.DataFrame, envios: Optional[str] = None,
+                                ingresos: str = "costo_envio") -> pd.DataFrame:
+    """
+    Calcula la tabla de rendimiento por repartidor con operaciones vectorizadas
+
+    Los repartidores se codifican como enteros y los días como ordinales, así
+    que envíos e ingresos salen de un ``bincount`` y los días activos de una
+    tabla de marcas (repartidor, día); no hay callbacks de Python por grupo.
+    Acepta pedidos individuales o renglones ya agregados (resumen diario).
+
+    Args:
+        df: DataFrame con 'repartidor', 'fecha' y la columna de ingresos
+        envios: Columna con el número de pedidos de cada renglón (None =
+            cada renglón con ingresos es un pedido)
+        ingresos: Columna con los ingresos de cada renglón
+
+    Returns:
+        DataFrame con COLUMNAS_ESTADISTICAS, un renglón por repartidor
+        (los vacíos se omiten) ordenado por repartidor
+    """
+    codigos, repartidores = pd.factorize(df["repartidor"], sort=True)
+    validos = codigos >= 0
+    total = len(repartidores)
+
+    montos = pd.to_numeric(df[ingresos], errors="coerce")
+    if envios is None:
+        # Como ``count``: solo cuentan los pedidos con costo
+        pesos = montos.notna().to_numpy(dtype=np.float64)
+    else:
+        pesos = df[envios].to_numpy(dtype=np.float64)
+    num_envios = np.bincount(codigos[validos], weights=pesos[validos], minlength=total)
+    suma_ingresos = np.bincount(codigos[validos], weights=montos.fillna(0).to_numpy(dtype=np.float64)[validos],
+                                minlength=total)
+
+    # Días activos: pares (repartidor, día) únicos contados por repartidor
+    ordinales, validas = dias_ordinales(df["fecha"])
+    seleccion = validos & validas
+    num_dias = _dias_distintos(codigos[seleccion], ordinales[seleccion], total)
+
+    if pd.api.types.is_integer_dtype(df[ingresos].dtype):
+        suma_ingresos = suma_ingresos.astype(np.int64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        promedio = suma_ingresos / num_envios
+
+    stats = pd.DataFrame({
+        "repartidor": repartidores,
+        "Envíos": num_envios.astype(np.int64),
+        "Ingresos_Total": suma_ingresos,
+        "Promedio_Envío": promedio,
+        "Días_Activos": num_dias,
+    }).round(2)
+    stats["Pago_Repartidor_70%"] = (stats["Ingresos_Total"] * PAGO_REPARTIDOR).round(2)
+    stats["Promedio_Diario"] = (stats["Ingresos_Total"] / stats["Días_Activos"]).round(2)
+    return stats[COLUMNAS_ESTADISTICAS]
@@ -0,0 +1,115 @@
+import json
+import os
+import random
+import time
+from typing import Dict, NamedTuple, Optional
+
+from botocore.exceptions import ClientError
+
+from dataset_store import Particion
+
+# Reintentos de un commit cuando otro proceso modificó la partición al mismo tiempo
+COMMIT_RETRIES = int(os.getenv("DATASET_COMMIT_RETRIES", "8"))
+
+# Espera base (segundos) entre reintentos; crece exponencialmente con jitter
+COMMIT_BACKOFF = float(os.getenv("DATASET_COMMIT_BACKOFF", "0.05"))
+
+MANIFEST_NAME = "_manifest.json"
+
+# Códigos con los que S3 rechaza una escritura condicional
+CODIGOS_CONFLICTO = ("PreconditionFailed", "ConditionalRequestConflict", "412", "409")
+
+
+class ConflictoConcurrente(Exception):
+    """Otro proceso confirmó cambios en la partición y se agotaron los reintentos"""
+
+
+class Manifest(NamedTuple):
+    """
+    Versión confirmada de una partición: qué partes la forman
+
+    ``resumenes`` tiene el tamaño del resumen diario de cada parte que ya lo
+    tiene (las partes anteriores a los resúmenes no aparecen). ``etag`` es
+    None si el manifest todavía no existe en S3.
+    """
+
+    version: int
+    partes: Dict[str, int]
+    resumenes: Dict[str, int]
+    etag: Optional[str]
+
+
+def manifest_key(particion: Particion) -> str:
+    """Clave del manifest de una partición"""
+    return particion.prefix + MANIFEST_NAME
+
+
+def es_conflicto(error: Exception) -> bool:
+    """True si el error es el rechazo de una escritura condicional"""
+    return isinstance(error, ClientError) and error.response.get("Error", {}).get("Code") in CODIGOS_CONFLICTO
+
+
+def esperar_reintento(intento: int) -> None:
+    """Backoff exponencial con jitter completo antes de reintentar un commit"""
+    time.sleep(random.uniform(0, COMMIT_BACKOFF * 2 ** min(intento, 10)))
+
+
+def leer_manifest(s3_client, bucket_name: str, particion: Particion) -> Optional[Manifest]:
+    """
+    Lee el manifest de una partición
+
+    Args:
+        s3_client: Cliente boto3 de S3
+        bucket_name: Bucket del dataset
+        particion: Partición a consultar
+
+    Returns:
+        Manifest o None si la partición todavía no tiene manifest
+    """
+    try:
+        response = s3_client.get_object(Bucket=bucket_name, Key=manifest_key(particion))
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+            return None
+        raise
+
+    contenido = json.loads(response["Body"].read())
+    return Manifest(contenido["version"], contenido["partes"], contenido.get("resumenes", {}), response.get("ETag"))
+
+
+def confirmar(s3_client, bucket_name: str, particion: Particion, base: Manifest,
+              partes: Dict[str, int], resumenes: Optional[Dict[str, int]] = None) -> Manifest:
+    """
+    Publica una nueva versión de la partición solo si nadie la cambió desde ``base``
+
+    Es una escritura condicional: ``IfMatch`` con el ETag leído, o
+    ``IfNoneMatch='*'`` si el manifest aún no existía. Si otro proceso
+    confirmó antes, S3 la rechaza y se lanza el ClientError (ver
+    ``es_conflicto``) para que el llamador relea y reintente.
+
+    Args:
+        s3_client: Cliente boto3 de S3
+        bucket_name: Bucket del dataset
+        particion: Partición a modificar
+        base: Manifest sobre el que se calcularon los cambios
+        partes: Partes (clave -> tamaño en bytes) de la nueva versión
+        resumenes: Tamaño del resumen diario de cada parte; None conserva
+            los de ``base`` para las partes que siguen
+
+    Returns:
+        El manifest publicado
+    """
+    version = base.version + 1
+    if resumenes is None:
+        resumenes = {key: size for key, size in base.resumenes.items() if key in partes}
+    body = json.dumps({"version": version, "partes": partes, "resumenes": resumenes}, sort_keys=True).encode("utf-8")
+    condicion = {"IfMatch": base.etag} if base.etag else {"IfNoneMatch": "*"}
+    response = s3_client.put_object(
+        Bucket=bucket_name,
+        Key=manifest_key(particion),
+        Body=body,
+        ContentType="application/json",
+        **condicion
+    )
+    return Manifest(version, partes, resumenes, response.get("ETag"))
+
@@ -0,0 +1,112 @@
+from typing import List, Optional
+
+import pandas as pd
+
+from date_parsing import normalizar_fechas
+from dataset_store import DATASET_PREFIX, PART_EXTENSION, normalizar_tipos
+
+# Los resúmenes se guardan junto a las partes de su partición con este prefijo
+RESUMEN_PREFIX = "resumen-"
+
+# Columnas de un resumen diario: una fila por (día, repartidor, establecimiento)
+COLUMNAS_GRUPO = ["fecha", "repartidor", "establecimiento"]
+COLUMNAS_RESUMEN = COLUMNAS_GRUPO + ["envios", "ingresos"]
+
+# Columnas de los pedidos que hacen falta para resumirlos
+COLUMNAS_PEDIDO = ["fecha", "repartidor", "establecimiento", "costo_envio"]
+
+
+def key_de_resumen(key_parte: str) -> str:
+    """
+    Clave del resumen diario de una parte
+
+    Cada parte tiene a lo más un resumen, con el mismo hash en el nombre, así
+    que reemplazar o borrar la parte identifica también su resumen.
+    """
+    carpeta, nombre = key_parte.rsplit("/", 1)
+    digest = nombre.split("-", 1)[1].rsplit(".", 1)[0]
+    return f"{carpeta}/{RESUMEN_PREFIX}{digest}{PART_EXTENSION}"
+
+
+def es_resumen(key: str) -> bool:
+    """True si la clave es un resumen diario y no una parte con pedidos"""
+    return key.startswith(DATASET_PREFIX) and key.rsplit("/", 1)[-1].startswith(RESUMEN_PREFIX)
+
+
+def resumir_pedidos(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Resume pedidos por día, repartidor y establecimiento
+
+    Los pedidos sin fecha, repartidor o establecimiento conservan su grupo
+    (con el valor vacío), así que la suma de 'envios' siempre es el total
+    de pedidos.
+
+    Args:
+        df: Pedidos con las columnas de COLUMNAS_PEDIDO
+
+    Returns:
+        DataFrame con COLUMNAS_RESUMEN ('envios' = número de pedidos,
+        'ingresos' = suma de 'costo_envio')
+    """
+    if df.empty:
+        return vacio()
+
+    grupos = pd.DataFrame({
+        "fecha": normalizar_fechas(df["fecha"]).dt.normalize(),
+        "repartidor": df["repartidor"].astype(object),
+        "establecimiento": df["establecimiento"].astype(object),
+        "costo_envio": pd.to_numeric(df["costo_envio"], errors="coerce").fillna(0).astype("int64"),
+    })
+    resumen = grupos.groupby(COLUMNAS_GRUPO, dropna=False, sort=False)["costo_envio"].agg(
+        envios="size", ingresos="sum"
+    ).reset_index()
+    return normalizar_tipos(resumen.astype({"envios": "int64", "ingresos": "int64"}))
+
+
+def combinar_resumenes(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Suma varios resúmenes en uno solo (un renglón por grupo)
+
+    Args:
+        frames: Resúmenes con COLUMNAS_RESUMEN
+
+    Returns:
+        Resumen combinado, ordenado por fecha
+    """
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return vacio()
+
+    todos = pd.concat([frame[COLUMNAS_RESUMEN].astype({"repartidor": object, "establecimiento": object})
+                       for frame in frames], ignore_index=True)
+    resumen = todos.groupby(COLUMNAS_GRUPO, dropna=False, sort=False)[["envios", "ingresos"]].sum().reset_index()
+    return normalizar_tipos(resumen.sort_values("fecha", kind="stable", ignore_index=True))
+
+
+def filtrar_resumen(resumen: pd.DataFrame, inicio: Optional[pd.Timestamp] = None,
+                    fin: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """
+    Renglones de un resumen cuyos días caen en [inicio, fin]
+
+    El resumen es por día: cuenta completo cualquier día que toque el rango.
+    Los renglones sin fecha solo se conservan si no hay rango.
+    """
+    if inicio is None and fin is None:
+        return resumen
+    mascara = resumen["fecha"].notna()
+    if inicio is not None:
+        mascara &= resumen["fecha"] >= pd.Timestamp(inicio).normalize()
+    if fin is not None:
+        mascara &= resumen["fecha"] <= pd.Timestamp(fin)
+    return resumen[mascara]
+
+
+def vacio() -> pd.DataFrame:
+    """Resumen sin renglones con los tipos de COLUMNAS_RESUMEN"""
+    return normalizar_tipos(pd.DataFrame({
+        "fecha": pd.Series(dtype="datetime64[ns]"),
+        "repartidor": pd.Series(dtype=object),
+        "establecimiento": pd.Series(dtype=object),
+        "envios": pd.Series(dtype="int64"),
+        "ingresos": pd.Series(dtype="int64"),
+    }))
@@ -0,0 +1,224 @@
+import hashlib
+import io
+import os
+from typing import Iterator, List, NamedTuple, Optional, Tuple, Union
+from urllib.parse import quote, unquote
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from date_parsing import normalizar_fechas
+from order_schema import TIPOS_COLUMNAS, normalizar_tipos
+
+# Prefijo del dataset global particionado (un objeto inmutable por lote ingerido)
+DATASET_PREFIX = "datasets/global/"
+
+# Archivo CSV monolítico que se usaba antes de particionar
+LEGACY_DATASET = "dataset_global.csv"
+
+# Partes de una partición a partir de las cuales se compacta
+COMPACT_MIN_PARTS = int(os.getenv("DATASET_COMPACT_MIN_PARTS", "8"))
+
+# Las partes de al menos este tamaño (MB) ya no se consideran pequeñas
+COMPACT_TARGET_MB = int(os.getenv("DATASET_COMPACT_TARGET_MB", "32"))
+
+# Partes que se descargan en paralelo al leer el dataset
+DATASET_READ_WORKERS = int(os.getenv("DATASET_READ_WORKERS", "8"))
+
+# Mes usado para pedidos sin fecha válida
+MES_SIN_FECHA = "sin-fecha"
+
+# Filas por row group de Parquet; sus estadísticas de 'fecha' permiten saltar
+# los grupos fuera del rango consultado
+ROW_GROUP_ROWS = 50_000
+
+# Formato de las partes nuevas (Parquet). Las partes CSV de versiones
+# anteriores se siguen leyendo y se convierten al compactar.
+PART_EXTENSION = ".parquet"
+LEGACY_PART_EXTENSION = ".csv"
+
+# Columnas que identifican un pedido (junto con su ordinal entre pedidos idénticos)
+COLUMNAS_CLAVE = ["repartidor", "fecha", "establecimiento", "producto", "costo_envio"]
+
+
+class Particion(NamedTuple):
+    """Partición del dataset global: un repartidor en un mes"""
+
+    repartidor: str
+    mes: str
+
+    @property
+    def prefix(self) -> str:
+        return f"{DATASET_PREFIX}repartidor={quote(self.repartidor, safe='')}/mes={self.mes}/"
+
+
+def particion_de_key(key: str) -> Optional[Particion]:
+    """
+    Obtiene la partición a la que pertenece una clave del dataset
+
+    Args:
+        key: Clave completa en S3
+
+    Returns:
+        Particion o None si la clave no tiene el formato esperado
+    """
+    if not key.startswith(DATASET_PREFIX) or not key.endswith((PART_EXTENSION, LEGACY_PART_EXTENSION)):
+        return None
+    partes = key[len(DATASET_PREFIX):].split("/")
+    if len(partes) != 3 or not partes[0].startswith("repartidor=") or not partes[1].startswith("mes="):
+        return None
+    return Particion(unquote(partes[0][len("repartidor="):]), partes[1][len("mes="):])
+
+
+def dividir_en_particiones(df: pd.DataFrame) -> Iterator[Tuple[Particion, pd.DataFrame]]:
+    """
+    Separa un lote de pedidos por repartidor y mes
+
+    Args:
+        df: Pedidos con columnas 'repartidor' y 'fecha' (datetime)
+
+    Yields:
+        Tuplas (Particion, pedidos de esa partición)
+    """
+    meses = df["fecha"].dt.strftime("%Y-%m").fillna(MES_SIN_FECHA)
+    repartidores = df["repartidor"].astype(object).fillna("").astype(str)
+    for (repartidor, mes), grupo in df.groupby([repartidores, meses], sort=True):
+        yield Particion(repartidor, mes), grupo
+
+
+def claves_pedidos(df: pd.DataFrame) -> pd.Series:
+    """
+    Calcula una clave estable (uint64) por pedido
+
+    La clave es el hash de repartidor, fecha, establecimiento, producto y
+    costo, más el ordinal del pedido entre los idénticos del mismo día; así
+    dos pedidos iguales legítimos no se confunden, pero volver a ingerir el
+    mismo día produce las mismas claves.
+
+    Args:
+        df: Pedidos con las columnas de COLUMNAS_CLAVE (las que falten cuentan como vacías)
+
+    Returns:
+        Serie uint64 con el mismo índice que df
+    """
+    vacia = pd.Series("", index=df.index)
+    fechas = normalizar_fechas(df["fecha"]) if "fecha" in df.columns else pd.Series(pd.NaT, index=df.index)
+    campos = pd.DataFrame({
+        "repartidor": df.get("repartidor", vacia).astype(object).fillna("").astype(str),
+        # Siempre en nanosegundos: la clave no depende de la unidad con que se guardó la fecha
+        "fecha": fechas.to_numpy(dtype="datetime64[ns]").astype("int64"),
+        "establecimiento": df.get("establecimiento", vacia).astype(object).fillna("").astype(str),
+        "producto": df.get("producto", vacia).astype(object).fillna("").astype(str),
+        "costo_envio": pd.to_numeric(df.get("costo_envio", vacia), errors="coerce").fillna(0).astype("int64"),
+    }, index=df.index)
+    campos["ordinal"] = campos.groupby(COLUMNAS_CLAVE, sort=False).cumcount()
+    return pd.util.hash_pandas_object(campos, index=False)
+
+
+def con_claves(df: pd.DataFrame) -> pd.DataFrame:
+    """Agrega la columna 'clave' a un DataFrame que no la tenga (partes anteriores a las claves)"""
+    if "clave" in df.columns:
+        return df
+    return df.assign(clave=claves_pedidos(df))
+
+
+def serializar_parte(df: pd.DataFrame) -> bytes:
+    """Convierte un lote a los bytes (Parquet con tipos) que se guardan como parte"""
+    df = normalizar_tipos(df.copy())
+    for columna, tipo in TIPOS_COLUMNAS.items():
+        if tipo == "category" and columna in df.columns:
+            df[columna] = df[columna].cat.remove_unused_categories()
+    # Los códigos de producto dependen del proceso; la parte guarda el texto
+    if "producto" in df.columns:
+        df["producto"] = df["producto"].astype(object)
+
+    # Ordenado por fecha, cada row group cubre un tramo de días distinto
+    if "fecha" in df.columns:
+        df = df.sort_values("fecha", kind="stable")
+
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False, row_group_size=ROW_GROUP_ROWS)
+    return buffer.getvalue()
+
+
+def meses_en_rango(inicio: pd.Timestamp, fin: pd.Timestamp) -> List[str]:
+    """Meses ('YYYY-MM') que tocan el rango de fechas [inicio, fin]"""
+    return [periodo.strftime("%Y-%m") for periodo in pd.period_range(inicio, fin, freq="M")]
+
+
+def filtrar_rango(df: pd.DataFrame, inicio: pd.Timestamp, fin: pd.Timestamp) -> pd.DataFrame:
+    """Pedidos con fecha dentro de [inicio, fin] (los que no tienen fecha quedan fuera)"""
+    return df[(df["fecha"] >= inicio) & (df["fecha"] <= fin)]
+
+
+def grupos_en_rango(archivo: pq.ParquetFile, inicio: pd.Timestamp, fin: pd.Timestamp) -> List[int]:
+    """
+    Row groups de un Parquet cuyas estadísticas de 'fecha' se cruzan con el rango
+
+    Los grupos sin estadísticas se incluyen siempre.
+    """
+    indice = archivo.schema_arrow.get_field_index("fecha")
+    if indice < 0:
+        return list(range(archivo.num_row_groups))
+
+    grupos = []
+    for grupo in range(archivo.num_row_groups):
+        estadisticas = archivo.metadata.row_group(grupo).column(indice).statistics
+        if estadisticas is None or not estadisticas.has_min_max:
+            grupos.append(grupo)
+        elif estadisticas.max >= inicio and estadisticas.min <= fin:
+            grupos.append(grupo)
+    return grupos
+
+
+def leer_parte(contenido: Union[bytes, io.RawIOBase], key: str, columns: Optional[List[str]] = None,
+               rango: Optional[Tuple[pd.Timestamp, pd.Timestamp]] = None) -> pd.DataFrame:
+    """
+    Lee una parte (inversa de serializar_parte)
+
+    Args:
+        contenido: Bytes del objeto o archivo con acceso aleatorio; con un
+            archivo solo se leen el pie del Parquet y los bloques necesarios
+        key: Clave del objeto (define el formato por su extensión)
+        columns: Solo estas columnas (None = todas); las que la parte no
+            tenga se ignoran
+        rango: (inicio, fin) para quedarse solo con los pedidos de esas
+            fechas; se saltan los row groups que no las contienen
+
+    Returns:
+        DataFrame con los tipos del dataset global
+    """
+    if isinstance(contenido, bytes):
+        contenido = io.BytesIO(contenido)
+
+    if key.endswith(LEGACY_PART_EXTENSION):
+        df = normalizar_tipos(pd.read_csv(contenido))
+        if rango is not None:
+            df = filtrar_rango(df, *rango)
+        if columns is not None:
+            df = df[[columna for columna in columns if columna in df.columns]]
+        return df
+
+    archivo = pq.ParquetFile(contenido, pre_buffer=True)
+    nombres = archivo.schema_arrow.names
+    if columns is not None:
+        columns = [columna for columna in columns if columna in nombres]
+    # Con los tipos ya aplicados, las partes (de cualquier versión) se concatenan sin volver a object
+    if rango is None:
+        return normalizar_tipos(archivo.read(columns=columns).to_pandas())
+
+    leer = columns if columns is None or "fecha" in columns else columns + ["fecha"]
+    df = normalizar_tipos(archivo.read_row_groups(grupos_en_rango(archivo, *rango), columns=leer).to_pandas())
+    df = filtrar_rango(df, *rango)
+    return df if columns is None else df[columns]
+
+
+def key_de_parte(particion: Particion, contenido: bytes) -> str:
+    """
+    Clave de una parte a partir del hash de su contenido
+
+    Subir dos veces el mismo lote produce la misma clave, así que la escritura
+    es idempotente y no genera objetos duplicados.
+    """
+    digest = hashlib.sha1(contenido).hexdigest()[:20]
+    return f"{particion.prefix}part-{digest}{PART_EXTENSION}"
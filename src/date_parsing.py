@@ -0,0 +1,190 @@
+import re
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+# Formato de las fechas del chat de WhatsApp: "[dd/mm/yy, hh:mm:ss]"
+FORMATO_CHAT = "%d/%m/%y"
+
+# Como strptime, los años de dos dígitos 69-99 son 1969-1999 y 00-68 son 2000-2068
+PIVOTE_SIGLO = 69
+
+# Sufijo de las exportaciones con reloj de 12 horas: " a. m.", " p. m.", " AM", " PM"
+# (WhatsApp separa con espacio normal, sin salto o angosto según la plataforma)
+PATRON_SUFIJO_12H = r"[ \u00a0\u202f]?[aApP]\.?[ \u00a0\u202f]?[mM]\.?"
+
+# Hora de un mensaje del chat: "HH:MM:SS" (algunas exportaciones omiten los
+# segundos) o "h:mm:ss p. m." con reloj de 12 horas
+RE_HORA = re.compile(r"^(\d{1,2}):(\d{2})(?::(\d{2}))?(" + PATRON_SUFIJO_12H + r")?$")
+
+# Posiciones de los dígitos y de los separadores en "dd/mm/yy" y "hh:mm:ss"
+_DIGITOS = [0, 1, 3, 4, 6, 7]
+_SEPARADORES = [2, 5]
+
+
+def parse_ddmmyy(valores: pd.Series) -> pd.Series:
+    """
+    Convierte textos "dd/mm/yy" a datetime64 sin inferir el formato
+
+    Cada valor distinto se convierte una sola vez (un chat tiene miles de
+    pedidos pero solo cientos de días). Los textos con el formato exacto se
+    leen rebanando sus caracteres en arreglos de enteros; el resto (p. ej.
+    "1/2/25") pasa por ``pd.to_datetime`` con el mismo formato, así que el
+    resultado es idéntico a ``pd.to_datetime(valores, format="%d/%m/%y", errors="coerce")``.
+
+    Args:
+        valores: Serie de textos (None/NaN se vuelven NaT)
+
+    Returns:
+        Serie datetime64[ns] con el mismo índice (NaT si no es una fecha válida)
+    """
+    return _por_valor_unico(valores, _parse_unicos_ddmmyy)
+
+
+def _por_valor_unico(valores: pd.Series, convertir) -> pd.Series:
+    """Aplica ``convertir`` (valores distintos -> datetime64[ns]) una vez por valor distinto"""
+    codigos, unicos = pd.factorize(valores)
+    fechas_unicas = convertir(pd.Series(unicos, dtype=object))
+
+    resultado = np.full(len(codigos), np.datetime64("NaT"), dtype="datetime64[ns]")
+    validos = codigos >= 0
+    resultado[validos] = fechas_unicas[codigos[validos]]
+    return pd.Series(resultado, index=valores.index, name=valores.name)
+
+
+def _leer_formato_fijo(unicos: pd.Series, separador: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lee los valores con formato exacto "NN?NN?NN" (? = separador) como tres números de dos dígitos
+
+    Returns:
+        Tupla (posiciones en ``unicos`` de los valores leídos, arreglo (n, 3) con sus números)
+    """
+    fijos = unicos.map(lambda valor: isinstance(valor, str) and len(valor) == 8).to_numpy(dtype=bool)
+    posiciones = np.flatnonzero(fijos)
+
+    # Un renglón por valor con el código de cada carácter; los dígitos quedan como 0-9
+    caracteres = np.array(unicos[fijos].tolist(), dtype="U8").view(np.uint32).reshape(-1, 8)
+    digitos = caracteres[:, _DIGITOS].astype(np.int64) - ord("0")
+    validos = (((digitos >= 0) & (digitos <= 9)).all(axis=1)
+               & (caracteres[:, _SEPARADORES] == ord(separador)).all(axis=1))
+    numeros = digitos[:, 0::2] * 10 + digitos[:, 1::2]
+    return posiciones[validos], numeros[validos]
+
+
+def _parse_unicos_ddmmyy(unicos: pd.Series) -> np.ndarray:
+    """Convierte valores distintos "dd/mm/yy" a un arreglo datetime64[ns]"""
+    fechas = np.full(len(unicos), np.datetime64("NaT"), dtype="datetime64[ns]")
+    leidas = np.zeros(len(unicos), dtype=bool)
+
+    posiciones, numeros = _leer_formato_fijo(unicos, "/")
+    dia, mes, anio = numeros.T
+    anio = anio + np.where(anio >= PIVOTE_SIGLO, 1900, 2000)
+    validas = (mes >= 1) & (mes <= 12) & (dia >= 1)
+    inicio_mes = ((anio - 1970) * 12 + np.where(validas, mes, 1) - 1).astype("datetime64[M]")
+    dias_mes = ((inicio_mes + 1).astype("datetime64[D]") - inicio_mes.astype("datetime64[D]")).astype(np.int64)
+    validas &= dia <= dias_mes
+    fechas[posiciones[validas]] = inicio_mes[validas].astype("datetime64[D]") + (dia[validas] - 1)
+    leidas[posiciones[validas]] = True
+
+    # Los que no tienen el formato exacto (o no son una fecha válida) los resuelve pandas
+    otros = ~leidas
+    if otros.any():
+        fechas[otros] = pd.to_datetime(unicos[otros], format=FORMATO_CHAT, errors="coerce").to_numpy(dtype="datetime64[ns]")
+    return fechas
+
+
+def normalizar_fechas(valores: pd.Series) -> pd.Series:
+    """
+    Convierte una columna de fechas a datetime64 con formatos fijos
+
+    Las fechas ya tipadas se devuelven tal cual. Los textos se leen como ISO
+    8601 (el formato con que se guardan y exportan los pedidos) y los que no
+    lo son, como "dd/mm/yy" del chat; nunca se infiere el formato y cada
+    valor distinto se convierte una sola vez.
+
+    Args:
+        valores: Serie datetime64, de textos o de objetos fecha
+
+    Returns:
+        Serie datetime64 con el mismo índice (NaT si no es una fecha válida)
+    """
+    if pd.api.types.is_datetime64_any_dtype(valores):
+        return valores
+    return _por_valor_unico(valores, _parse_unicos_iso)
+
+
+def _parse_unicos_iso(unicos: pd.Series) -> np.ndarray:
+    """Convierte valores distintos ISO 8601 (o "dd/mm/yy") a un arreglo datetime64[ns]"""
+    fechas = pd.to_datetime(unicos, format="ISO8601", errors="coerce")
+    faltantes = fechas.isna().to_numpy()
+    if faltantes.any():
+        fechas = fechas.to_numpy(dtype="datetime64[ns]")
+        fechas[faltantes] = _parse_unicos_ddmmyy(unicos[faltantes].reset_index(drop=True))
+        return fechas
+    return fechas.to_numpy(dtype="datetime64[ns]")
+
+
+def segundos_del_dia(horas: pd.Series) -> pd.Series:
+    """
+    Convierte horas "HH:MM[:SS]" del chat a segundos desde la medianoche
+
+    Como las fechas, cada valor distinto se convierte una sola vez y los que
+    tienen el formato exacto "hh:mm:ss" se leen rebanando sus caracteres;
+    solo el resto pasa por RE_HORA. Las horas con sufijo de 12 horas
+    ("9:05:12 p. m.", "12:30 AM") se pasan a 24 horas: 12 a. m. es la
+    medianoche y 12 p. m. el mediodía.
+
+    Args:
+        horas: Serie de textos (None/NaN si el mensaje no tenía hora)
+
+    Returns:
+        Serie Int64 con el mismo índice (<NA> si falta o no es una hora válida)
+    """
+    codigos, unicos = pd.factorize(horas)
+    unicos = pd.Series(unicos, dtype=object)
+    numeros = np.full((len(unicos), 3), np.nan)
+    # "a"/"p" si la hora trae sufijo de 12 horas, "" si es de 24 horas
+    meridiano = np.full(len(unicos), "", dtype=object)
+
+    posiciones, leidos = _leer_formato_fijo(unicos, ":")
+    numeros[posiciones] = leidos
+    otros = np.ones(len(unicos), dtype=bool)
+    otros[posiciones] = False
+    if otros.any():
+        partes = unicos[otros].str.extract(RE_HORA)
+        numeros[otros] = partes[[0, 1, 2]].apply(pd.to_numeric).to_numpy(dtype=np.float64)
+        meridiano[otros] = partes[3].str.strip(" \u00a0\u202f").str[0].str.lower().fillna("").to_numpy(dtype=object)
+
+    hora, minuto, segundo = numeros.T
+    segundo = np.nan_to_num(segundo)
+    doce_horas = meridiano != ""
+    validas = np.where(doce_horas, (hora >= 1) & (hora <= 12), hora < 24) & (minuto < 60) & (segundo < 60)
+    hora = np.where(doce_horas, hora % 12 + np.where(meridiano == "p", 12, 0), hora)
+    segundos_unicos = np.where(validas, hora * 3600 + minuto * 60 + segundo, np.nan)
+
+    resultado = np.full(len(codigos), np.nan)
+    conocidos = codigos >= 0
+    resultado[conocidos] = segundos_unicos[codigos[conocidos]]
+    return pd.Series(resultado, index=horas.index, name=horas.name).astype("Int64")
+
+
+def marcas_de_tiempo(fechas: pd.Series, horas: pd.Series) -> pd.Series:
+    """
+    Une el día y la hora de cada mensaje en segundos desde 1970-01-01
+
+    La hora es la local del chat (sin zona horaria), así que ``marca // 3600 % 24``
+    es la hora del día y ``marca // 86400`` el día.
+
+    Args:
+        fechas: Serie datetime64 con el día (a medianoche)
+        horas: Serie de textos "HH:MM[:SS]" (con o sin sufijo de 12 horas) con el mismo índice
+
+    Returns:
+        Serie Int64 (<NA> si falta el día o la hora)
+    """
+    dias = fechas.to_numpy(dtype="datetime64[s]").astype(np.int64)
+    segundos = segundos_del_dia(horas)
+    validas = fechas.notna().to_numpy() & segundos.notna().to_numpy()
+    valores = np.where(validas, dias + segundos.fillna(0).to_numpy(dtype=np.int64), 0)
+    return pd.Series(pd.arrays.IntegerArray(valores, ~validas), index=fechas.index)
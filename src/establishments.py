@@ -0,0 +1,203 @@
+import re
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from trie_regex import build_trie_pattern
+
+# Diccionario de normalizaciones - agregar más según sea necesario
+NORMALIZACIONES = {
+    # Tacomarin y variaciones
+    "tacomarin": ["tacomarin centro", "taco marin", "taco marin centro", "tacomarin", "taco-marin"],
+
+    # McDonald's y variaciones
+    "mcdonalds": ["mc donalds", "mc donald's", "mcdonald's", "macdonalds", "mac donalds"],
+
+    # KFC y variaciones
+    "kfc": ["kentucky fried chicken", "k.f.c", "kfc", "kentucky"],
+
+    # Burger King y variaciones
+    "burger king": ["burger king", "burgerking", "bk", "burger-king"],
+
+    # Pizza Hut y variaciones
+    "pizza hut": ["pizza hut", "pizzahut", "pizza-hut"],
+
+    # Domino's y variaciones
+    "dominos": ["domino's", "dominos", "domino", "dominos pizza"],
+
+    # Subway y variaciones
+    "subway": ["subway", "sub way", "sub-way"],
+
+    # Starbucks y variaciones
+    "starbucks": ["starbucks", "star bucks", "star-bucks"],
+
+    # Agregar más establecimientos comunes aquí...
+}
+
+# Valores que no representan un establecimiento real
+VALORES_INVALIDOS = ["donde sea", "DONDE SEA", "-", "", "nan", "NaN"]
+
+# Palabras comunes que pueden variar entre sucursales del mismo negocio
+PALABRAS_A_REMOVER = [" centro", " local", " sucursal", " principal", " #1", " no. 1", " numero 1"]
+
+# Tamaño del memo de nombres ya normalizados
+TAMANO_CACHE = 4096
+
+RE_ESPACIOS = re.compile(r"\s+")
+RE_ESPECIALES = re.compile(r"[^\w\s]")
+
+# Nombres canónicos en el orden de prioridad del diccionario
+CANONICOS = [nombre_unificado.title() for nombre_unificado in NORMALIZACIONES]
+
+
+def _tabla_variaciones(compactar: bool) -> Dict[str, int]:
+    """
+    Precalcula variación -> índice del nombre canónico con mayor prioridad
+
+    Cada variación hereda el índice de las variaciones que son prefijo suyo,
+    porque el autómata solo reporta la coincidencia más larga en cada posición.
+    """
+    tabla: Dict[str, int] = {}
+    for indice, variaciones in enumerate(NORMALIZACIONES.values()):
+        for variacion in variaciones:
+            if compactar:
+                variacion = variacion.replace(" ", "").replace("-", "")
+            tabla.setdefault(variacion, indice)
+
+    return {
+        variacion: min(indice for otra, indice in tabla.items() if variacion.startswith(otra))
+        for variacion in tabla
+    }
+
+
+# Autómatas de subcadenas construidos una sola vez al importar:
+# uno para el nombre tal cual y otro para el nombre limpio sin espacios ni guiones
+VARIACIONES = _tabla_variaciones(compactar=False)
+VARIACIONES_COMPACTAS = _tabla_variaciones(compactar=True)
+RE_VARIACIONES = re.compile("(?=(" + build_trie_pattern(VARIACIONES) + "))")
+RE_VARIACIONES_COMPACTAS = re.compile("(?=(" + build_trie_pattern(VARIACIONES_COMPACTAS) + "))")
+
+
+def _buscar_canonico(texto: str, patron: re.Pattern, tabla: Dict[str, int]) -> Optional[str]:
+    """Devuelve el nombre canónico de mayor prioridad con alguna variación dentro del texto"""
+    indice = min((tabla[match.group(1)] for match in patron.finditer(texto)), default=None)
+    return CANONICOS[indice] if indice is not None else None
+
+
+def _normalizar(establecimiento: str) -> str:
+    # Convertir a string y limpiar
+    nombre = str(establecimiento).strip().lower()
+
+    # Buscar coincidencias y normalizar
+    canonico = _buscar_canonico(nombre, RE_VARIACIONES, VARIACIONES)
+    if canonico:
+        return canonico
+
+    # Normalizaciones adicionales para casos comunes
+    nombre_limpio = nombre
+    for palabra in PALABRAS_A_REMOVER:
+        nombre_limpio = nombre_limpio.replace(palabra, "")
+
+    # Remover espacios dobles y caracteres especiales
+    nombre_limpio = RE_ESPACIOS.sub(" ", nombre_limpio)
+    nombre_limpio = RE_ESPECIALES.sub("", nombre_limpio)
+    nombre_limpio = nombre_limpio.strip()
+
+    # Si después de la limpieza encontramos una coincidencia, usarla
+    canonico = _buscar_canonico(nombre_limpio.replace(" ", ""), RE_VARIACIONES_COMPACTAS, VARIACIONES_COMPACTAS)
+    if canonico:
+        return canonico
+
+    # Si no hay coincidencia, devolver el nombre original con formato título
+    return establecimiento.strip().title()
+
+
+# Coincidencias exactas resueltas de antemano (variación -> nombre canónico)
+EXACTOS = {variacion: _normalizar(variacion) for variaciones in NORMALIZACIONES.values() for variacion in variaciones}
+
+
+def limpiar_establecimientos(establecimiento):
+    """
+    Limpia nombres de establecimientos removiendo valores no válidos.
+
+    Args:
+        establecimiento (str): Nombre del establecimiento a limpiar
+
+    Returns:
+        str or None: Nombre limpio del establecimiento o None si no es válido
+    """
+    establecimiento = str(establecimiento).strip()
+    if establecimiento.lower() in VALORES_INVALIDOS:
+        return None
+    return establecimiento
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def normalizar_establecimiento(establecimiento):
+    """
+    Normaliza nombres de establecimientos para unificar variaciones del mismo negocio.
+
+    Args:
+        establecimiento (str): Nombre del establecimiento a normalizar
+
+    Returns:
+        str: Nombre normalizado del establecimiento
+    """
+    if not establecimiento or pd.isna(establecimiento):
+        return establecimiento
+
+    exacto = EXACTOS.get(str(establecimiento).strip().lower())
+    if exacto:
+        return exacto
+
+    return _normalizar(establecimiento)
+
+
+def normalize_series(establecimientos: pd.Series) -> pd.Series:
+    """
+    Normaliza una columna de establecimientos evaluando solo sus valores únicos
+
+    Args:
+        establecimientos: Serie con los nombres de establecimiento
+
+    Returns:
+        Serie con los nombres normalizados (mismo índice); los nulos se conservan
+    """
+    codigos, unicos = pd.factorize(establecimientos)
+    normalizados = np.array([normalizar_establecimiento(valor) for valor in unicos] + [None], dtype=object)
+    valores = np.where(codigos >= 0, normalizados[codigos], establecimientos.to_numpy(dtype=object))
+    return pd.Series(valores, index=establecimientos.index, name=establecimientos.name)
+
+
+def _categorica(valores_unicos: list, codigos: np.ndarray, indice: pd.Index, nombre) -> pd.Series:
+    """Construye una Serie categórica a partir de un valor por código de factorize"""
+    codigos_categoria, categorias = pd.factorize(pd.Series(valores_unicos, dtype=object))
+    categorica = pd.Categorical.from_codes(codigos_categoria[codigos], categories=categorias)
+    return pd.Series(categorica, index=indice, name=nombre)
+
+
+def clean_and_normalize_series(establecimientos: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """
+    Limpia y normaliza una columna de establecimientos en un solo paso
+
+    La columna se factoriza, ``limpiar_establecimientos`` y
+    ``normalizar_establecimiento`` se ejecutan una vez por valor distinto y el
+    resultado se reparte a las filas mediante los códigos.
+
+    Args:
+        establecimientos: Serie con los nombres de establecimiento
+
+    Returns:
+        Tupla (limpios, normalizados) de Series categóricas; los valores no
+        válidos quedan como nulos
+    """
+    codigos, unicos = pd.factorize(establecimientos, use_na_sentinel=False)
+    limpios = [limpiar_establecimientos(valor) for valor in unicos]
+    normalizados = [normalizar_establecimiento(valor) for valor in limpios]
+
+    return (
+        _categorica(limpios, codigos, establecimientos.index, establecimientos.name),
+        _categorica(normalizados, codigos, establecimientos.index, establecimientos.name),
+    )
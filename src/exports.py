@@ -0,0 +1,64 @@
+import os
+from typing import Any, Callable, Optional
+
+import pandas as pd
+import streamlit as st
+
+from charts import huella
+from size_cache import SizeBoundedCache
+
+# Límite de memoria para los archivos de exportación ya generados (compartido por todas las sesiones)
+CACHE_MAX_MB = int(os.getenv("EXPORT_CACHE_MAX_MB", "128"))
+
+_cache = SizeBoundedCache(CACHE_MAX_MB * 1024 * 1024)
+
+
+def csv_bytes(df: pd.DataFrame) -> bytes:
+    """CSV en UTF-8 sin índice, el formato de todas las exportaciones de tablas"""
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def descarga_diferida(etiqueta: str, generar: Callable[..., bytes], *datos, file_name: str, mime: str,
+                      help: Optional[str] = None, version: Any = None, **opciones) -> None:
+    """
+    Botón de descarga cuyo archivo se genera solo cuando se pide
+
+    Primero se muestra "Preparar"; al presionarlo se llama a
+    ``generar(*datos, **opciones)`` y aparece el botón de descarga. El
+    archivo se guarda en una cache compartida indexada por la huella de los
+    datos y opciones, así que si ya se generó con los mismos datos (en esta
+    u otra sesión) el botón de descarga aparece directo.
+
+    Args:
+        etiqueta: Texto del botón de descarga
+        generar: Función que produce los bytes del archivo
+        *datos: Datos que recibe ``generar`` (DataFrames, fechas, listas...)
+        file_name: Nombre del archivo descargado
+        mime: Tipo MIME del archivo
+        help: Ayuda de los botones
+        version: Valor que solo forma parte de la huella, para archivos que
+            dependen de algo que no está en ``datos`` (p. ej. el estado del
+            dataset en S3)
+        **opciones: Opciones que recibe ``generar``
+    """
+    clave = huella(generar, version, *datos, sorted(opciones.items()))
+    contenido = _cache.get(clave)
+
+    if contenido is None:
+        # El botón "Preparar" se quita en cuanto el archivo está listo
+        espacio = st.empty()
+        if espacio.button(f"⚙️ Preparar: {etiqueta}", key=f"preparar-{clave}", help=help):
+            with st.spinner("Generando archivo..."):
+                contenido = generar(*datos, **opciones)
+            _cache.put(clave, contenido, len(contenido))
+            espacio.empty()
+
+    if contenido is not None:
+        st.download_button(
+            label=etiqueta,
+            data=contenido,
+            file_name=file_name,
+            mime=mime,
+            key=f"descargar-{clave}",
+            help=help
+        )
@@ -1,17 +1,24 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
 from datetime import datetime
-from s3_manager import S3Manager
+from s3_manager import get_s3_manager
+from establishments import clean_and_normalize_series
+from dataset_rollup import COLUMNAS_PEDIDO, resumir_pedidos
+from courier_kpis import dias_activos as contar_dias_activos, estadisticas_por_repartidor
+from charts import (
+    grafica_envios_por_repartidor, grafica_ingresos_por_repartidor, grafica_tendencia_diaria,
+    grafica_top_establecimientos, render_png
+)
+from exports import csv_bytes, descarga_diferida
+from order_schema import normalizar_tipos
 from dotenv import load_dotenv
 
 # Cargar variables de entorno
 load_dotenv()
 
-# Inicializar S3 Manager
-s3_manager = S3Manager()
+# S3 Manager compartido por todas las sesiones (un solo cliente boto3 por proceso)
+s3_manager = get_s3_manager()
 
 # Colores Yupii
 YUPII_BLUE = "#185E8D"
@@ -92,96 +99,6 @@ EMOJI_REPARTIDOR = "🧑🏾‍🦱‍🛵"
 EMOJI_GLOBAL = "🌍"
 EMOJI_CALENDARIO = "📅"
 
-# Función global para limpiar establecimientos
-def limpiar_establecimientos(establecimiento):
-    """
-    Limpia nombres de establecimientos removiendo valores no válidos.
-    
-    Args:
-        establecimiento (str): Nombre del establecimiento a limpiar
-        
-    Returns:
-        str or None: Nombre limpio del establecimiento o None si no es válido
-    """
-    establecimiento = str(establecimiento).strip()
-    if establecimiento.lower() in ["donde sea", "DONDE SEA", "-", "", "nan", "NaN"]:
-        return None
-    return establecimiento
-
-# Función para normalizar y unificar nombres de establecimientos similares
-def normalizar_establecimiento(establecimiento):
-    """
-    Normaliza nombres de establecimientos para unificar variaciones del mismo negocio.
-    
-    Args:
-        establecimiento (str): Nombre del establecimiento a normalizar
-        
-    Returns:
-        str: Nombre normalizado del establecimiento
-    """
-    if not establecimiento or pd.isna(establecimiento):
-        return establecimiento
-    
-    # Convertir a string y limpiar
-    nombre = str(establecimiento).strip().lower()
-    
-    # Diccionario de normalizaciones - agregar más según sea necesario
-    normalizaciones = {
-        # Tacomarin y variaciones
-        "tacomarin": ["tacomarin centro", "taco marin", "taco marin centro", "tacomarin", "taco-marin"],
-        
-        # McDonald's y variaciones
-        "mcdonalds": ["mc donalds", "mc donald's", "mcdonald's", "macdonalds", "mac donalds"],
-        
-        # KFC y variaciones
-        "kfc": ["kentucky fried chicken", "k.f.c", "kfc", "kentucky"],
-        
-        # Burger King y variaciones
-        "burger king": ["burger king", "burgerking", "bk", "burger-king"],
-        
-        # Pizza Hut y variaciones
-        "pizza hut": ["pizza hut", "pizzahut", "pizza-hut"],
-        
-        # Domino's y variaciones
-        "dominos": ["domino's", "dominos", "domino", "dominos pizza"],
-        
-        # Subway y variaciones
-        "subway": ["subway", "sub way", "sub-way"],
-        
-        # Starbucks y variaciones
-        "starbucks": ["starbucks", "star bucks", "star-bucks"],
-        
-        # Agregar más establecimientos comunes aquí...
-    }
-    
-    # Buscar coincidencias y normalizar
-    for nombre_unificado, variaciones in normalizaciones.items():
-        for variacion in variaciones:
-            if variacion in nombre:
-                return nombre_unificado.title()
-    
-    # Normalizaciones adicionales para casos comunes
-    # Remover palabras comunes que pueden variar
-    palabras_a_remover = [" centro", " local", " sucursal", " principal", " #1", " no. 1", " numero 1"]
-    nombre_limpio = nombre
-    for palabra in palabras_a_remover:
-        nombre_limpio = nombre_limpio.replace(palabra, "")
-    
-    # Remover espacios dobles y caracteres especiales
-    import re
-    nombre_limpio = re.sub(r'\s+', ' ', nombre_limpio)  # Espacios múltiples a uno solo
-    nombre_limpio = re.sub(r'[^\w\s]', '', nombre_limpio)  # Remover caracteres especiales
-    nombre_limpio = nombre_limpio.strip()
-    
-    # Si después de la limpieza encontramos una coincidencia, usarla
-    for nombre_unificado, variaciones in normalizaciones.items():
-        for variacion in variaciones:
-            if variacion.replace(" ", "").replace("-", "") in nombre_limpio.replace(" ", ""):
-                return nombre_unificado.title()
-    
-    # Si no hay coincidencia, devolver el nombre original con formato título
-    return establecimiento.strip().title()
-
 st.title(f"{EMOJI_GLOBAL} Dashboard Global Yupii - Análisis Consolidado de Repartidores {EMOJI_MOTO}")
 st.markdown(f"""
 {EMOJI_ENTREGA} Este dashboard muestra estadísticas agregadas de repartidores. 
@@ -194,6 +111,7 @@ st.sidebar.header(f"{EMOJI_PAQUETE} Configuración del Análisis")
 # Selector de dataset
 df_global = pd.DataFrame()
 dataset_seleccionado = "No seleccionado"
+consulta_s3 = False
 
 st.sidebar.subheader(f"{EMOJI_CALENDARIO} Selección de Dataset")
 
@@ -205,20 +123,16 @@ if s3_connected:
     )
     
     if opcion_dataset == "Dataset global desde S3":
-        # Cargar dataset desde S3
-        df_global = s3_manager.load_dataset("dataset_global.csv")
+        # Solo se consulta el resumen de particiones; los pedidos se descargan al
+        # ejecutar el análisis, filtrados por fechas y repartidores en S3
+        resumen_s3 = s3_manager.dataset_overview()
         
-        if df_global is not None and not df_global.empty:
-            # Mejorar el parseo de fechas para manejar múltiples formatos
-            df_global["fecha"] = pd.to_datetime(df_global["fecha"], 
-                                              infer_datetime_format=True, 
-                                              errors='coerce')
-            
-            dataset_seleccionado = "dataset_global.csv (desde S3)"
-            st.sidebar.success(f"✅ Dataset cargado desde S3: {len(df_global)} registros")
+        if resumen_s3["meses"]:
+            consulta_s3 = True
+            dataset_seleccionado = "datasets/global/ (desde S3)"
+            st.sidebar.success(f"✅ Dataset disponible en S3: {resumen_s3['partes']} partes")
         else:
             st.sidebar.warning("📁 No se pudo cargar el dataset desde S3")
-            df_global = pd.DataFrame()
     
     elif opcion_dataset == "Cargar archivo personalizado":
         archivo_personalizado = st.sidebar.file_uploader(
@@ -229,10 +143,7 @@ if s3_connected:
         
         if archivo_personalizado:
             try:
-                df_global = pd.read_csv(archivo_personalizado)
-                df_global["fecha"] = pd.to_datetime(df_global["fecha"], 
-                                                  infer_datetime_format=True, 
-                                                  errors='coerce')
+                df_global = normalizar_tipos(pd.read_csv(archivo_personalizado))
                 dataset_seleccionado = archivo_personalizado.name
                 st.sidebar.success(f"✅ Archivo cargado: {len(df_global)} registros")
             except Exception as e:
@@ -250,16 +161,20 @@ else:
     
     if archivo_personalizado:
         try:
-            df_global = pd.read_csv(archivo_personalizado)
-            df_global["fecha"] = pd.to_datetime(df_global["fecha"], 
-                                              infer_datetime_format=True, 
-                                              errors='coerce')
+            df_global = normalizar_tipos(pd.read_csv(archivo_personalizado))
             dataset_seleccionado = archivo_personalizado.name
             st.sidebar.success(f"✅ Archivo cargado: {len(df_global)} registros")
         except Exception as e:
             st.sidebar.error(f"❌ Error al cargar archivo: {str(e)}")
             df_global = pd.DataFrame()
 
+# Mostrar información del dataset en S3 (sin descargar pedidos)
+if consulta_s3:
+    st.sidebar.info(f"📊 Dataset: {dataset_seleccionado}")
+    st.sidebar.info(f"💾 Tamaño: {resumen_s3['bytes'] / 1024 / 1024:,.1f} MB en {resumen_s3['partes']} partes")
+    st.sidebar.info(f"📅 Meses: {resumen_s3['meses'][0]} - {resumen_s3['meses'][-1]}")
+    st.sidebar.info(f"👥 Repartidores: {len(resumen_s3['repartidores'])}")
+
 # Mostrar información del dataset cargado
 if not df_global.empty:
     st.sidebar.info(f"📊 Dataset: {dataset_seleccionado}")
@@ -276,8 +191,10 @@ if not df_global.empty:
             st.sidebar.info(f"👥 Repartidores: {repartidores_unicos}")
     
     # Aplicar limpieza y normalización de establecimientos
-    df_global["establecimiento_limpio"] = df_global["establecimiento"].apply(limpiar_establecimientos)
-    df_global["establecimiento_normalizado"] = df_global["establecimiento_limpio"].apply(normalizar_establecimiento)
+    # (una vez por establecimiento distinto; el resultado es categórico)
+    limpios, normalizados = clean_and_normalize_series(df_global["establecimiento"])
+    df_global["establecimiento_limpio"] = limpios
+    df_global["establecimiento_normalizado"] = normalizados
     
     # Remover filas con establecimientos no válidos
     df_global = df_global.dropna(subset=["establecimiento_normalizado"])
@@ -288,8 +205,17 @@ if not df_global.empty:
         st.sidebar.warning("⚠️ No quedaron registros válidos después de la limpieza")
 
 # Selección de rango de fechas
-if not df_global.empty and "fecha" in df_global.columns:
-    fechas_validas = df_global["fecha"].dropna().sort_values().unique()
+if consulta_s3 or (not df_global.empty and "fecha" in df_global.columns):
+    if consulta_s3:
+        # Límites a partir de los meses que tienen particiones
+        primer_mes = pd.Period(resumen_s3["meses"][0], freq="M")
+        ultimo_mes = pd.Period(resumen_s3["meses"][-1], freq="M")
+        fechas_validas = [
+            primer_mes.start_time,
+            max(ultimo_mes.start_time, min(ultimo_mes.end_time, pd.Timestamp.now())),
+        ]
+    else:
+        fechas_validas = df_global["fecha"].dropna().sort_values().unique()
     
     if len(fechas_validas) >= 1:
         min_date = fechas_validas[0].date()
@@ -322,8 +248,11 @@ if not df_global.empty and "fecha" in df_global.columns:
         )
         
         # Filtro por repartidor
-        if "repartidor" in df_global.columns:
-            repartidores_disponibles = sorted(df_global["repartidor"].dropna().unique())
+        if consulta_s3 or "repartidor" in df_global.columns:
+            if consulta_s3:
+                repartidores_disponibles = resumen_s3["repartidores"]
+            else:
+                repartidores_disponibles = sorted(df_global["repartidor"].dropna().unique())
             repartidores_seleccionados = st.sidebar.multiselect(
                 f"{EMOJI_REPARTIDOR} Repartidores",
                 options=repartidores_disponibles,
@@ -333,12 +262,16 @@ if not df_global.empty and "fecha" in df_global.columns:
         else:
             repartidores_seleccionados = []
         
-        # Botón para ejecutar análisis
-        analizar_global = st.sidebar.button(
+        # Botón para ejecutar análisis; el resultado sigue visible en las siguientes
+        # ejecuciones (p. ej. al preparar una descarga) mientras no cambien los filtros
+        consulta = (dataset_seleccionado, fecha_inicio, fecha_fin, tuple(repartidores_seleccionados))
+        if st.sidebar.button(
             "🚀 Ejecutar Análisis Global",
             type="primary",
             help="Procesar datos con los filtros seleccionados"
-        )
+        ):
+            st.session_state["consulta_global"] = consulta
+        analizar_global = st.session_state.get("consulta_global") == consulta
         
     else:
         analizar_global = False
@@ -346,8 +279,20 @@ if not df_global.empty and "fecha" in df_global.columns:
 else:
     analizar_global = False
 
+def exportar_pedidos_s3(fecha_inicio_dt, fecha_fin_dt, repartidores):
+    """CSV con los pedidos limpios del período; se consultan en S3 solo al preparar la descarga"""
+    # Todas las columnas de los pedidos, como la exportación original (solo los KPIs usan COLUMNAS_PEDIDO)
+    pedidos = s3_manager.query_dataset(fecha_inicio_dt, fecha_fin_dt, repartidores=repartidores)
+    if pedidos is None or pedidos.empty:
+        pedidos = pd.DataFrame(columns=["fecha", "establecimiento", "producto", "costo_envio", "repartidor"])
+    
+    limpios, normalizados = clean_and_normalize_series(pedidos["establecimiento"])
+    pedidos["establecimiento_limpio"] = limpios
+    pedidos["establecimiento_normalizado"] = normalizados
+    return csv_bytes(pedidos.dropna(subset=["establecimiento_normalizado"]))
+
 # Ejecutar análisis si se presiona el botón
-if analizar_global and not df_global.empty:
+if analizar_global and (consulta_s3 or not df_global.empty):
     # Validar fechas
     if fecha_fin < fecha_inicio:
         st.error("❌ La fecha de fin no puede ser menor a la fecha de inicio.")
@@ -356,27 +301,47 @@ if analizar_global and not df_global.empty:
         fecha_inicio_dt = datetime.combine(fecha_inicio, datetime.min.time())
         fecha_fin_dt = datetime.combine(fecha_fin, datetime.max.time())
         
-        df_filtrado = df_global[
-            (df_global["fecha"] >= fecha_inicio_dt) & 
-            (df_global["fecha"] <= fecha_fin_dt)
-        ]
+        if consulta_s3:
+            # Resumen diario (día, repartidor, establecimiento) guardado al ingerir:
+            # el período se responde sumando sus renglones, sin descargar pedidos
+            resumen_filtrado = s3_manager.query_rollup(
+                fecha_inicio_dt,
+                fecha_fin_dt,
+                repartidores=repartidores_seleccionados or None
+            )
+            if resumen_filtrado is None:
+                resumen_filtrado = resumir_pedidos(pd.DataFrame(columns=COLUMNAS_PEDIDO))
+        else:
+            df_filtrado = df_global[
+                (df_global["fecha"] >= fecha_inicio_dt) & 
+                (df_global["fecha"] <= fecha_fin_dt)
+            ]
+            
+            # Filtrar por repartidores seleccionados
+            if repartidores_seleccionados and "repartidor" in df_global.columns:
+                df_filtrado = df_filtrado[df_filtrado["repartidor"].isin(repartidores_seleccionados)]
+            
+            # Mismo resumen diario que en S3, calculado con los pedidos del archivo
+            resumen_filtrado = resumir_pedidos(df_filtrado.reindex(columns=COLUMNAS_PEDIDO))
         
-        # Filtrar por repartidores seleccionados
-        if repartidores_seleccionados and "repartidor" in df_global.columns:
-            df_filtrado = df_filtrado[df_filtrado["repartidor"].isin(repartidores_seleccionados)]
+        # Normalización del resumen: una vez por establecimiento distinto
+        limpios, normalizados = clean_and_normalize_series(resumen_filtrado["establecimiento"])
+        resumen_filtrado["establecimiento_normalizado"] = normalizados
+        resumen_filtrado = resumen_filtrado.dropna(subset=["establecimiento_normalizado"])
+        tiene_repartidor = consulta_s3 or "repartidor" in df_global.columns
         
-        if df_filtrado.empty:
+        if resumen_filtrado.empty:
             st.warning("⚠️ No hay datos en el rango de fechas y filtros seleccionados.")
         else:
             # === ANÁLISIS GLOBAL ===
             st.header(f"{EMOJI_GLOBAL} Análisis Global del Período")
             st.markdown(f"**Período:** {fecha_inicio.strftime('%d/%m/%Y')} - {fecha_fin.strftime('%d/%m/%Y')}")
             
-            # KPIs Globales
-            total_envios = len(df_filtrado)
-            total_ingresos = df_filtrado["costo_envio"].sum()
-            promedio_por_envio = df_filtrado["costo_envio"].mean()
-            dias_activos = df_filtrado["fecha"].dt.date.nunique()
+            # KPIs Globales (sumas del resumen diario)
+            total_envios = int(resumen_filtrado["envios"].sum())
+            total_ingresos = resumen_filtrado["ingresos"].sum()
+            promedio_por_envio = total_ingresos / total_envios
+            dias_activos = contar_dias_activos(resumen_filtrado["fecha"])
             
             # Mostrar KPIs principales
             col1, col2, col3, col4 = st.columns(4)
@@ -410,22 +375,11 @@ if analizar_global and not df_global.empty:
                 )
 
             # === ANÁLISIS POR REPARTIDOR ===
-            if "repartidor" in df_filtrado.columns:
+            if tiene_repartidor:
                 st.header(f"{EMOJI_REPARTIDOR} Rendimiento por Repartidor")
                 
-                # Agrupar por repartidor
-                stats_repartidor = df_filtrado.groupby("repartidor").agg({
-                    "costo_envio": ["count", "sum", "mean"],
-                    "fecha": lambda x: x.dt.date.nunique()
-                }).round(2)
-                
-                # Aplanar nombres de columnas
-                stats_repartidor.columns = ["Envíos", "Ingresos_Total", "Promedio_Envío", "Días_Activos"]
-                stats_repartidor = stats_repartidor.reset_index()
-                
-                # Calcular métricas adicionales
-                stats_repartidor["Pago_Repartidor_70%"] = (stats_repartidor["Ingresos_Total"] * 0.7).round(2)
-                stats_repartidor["Promedio_Diario"] = (stats_repartidor["Ingresos_Total"] / stats_repartidor["Días_Activos"]).round(2)
+                # KPIs por repartidor sobre el resumen (vectorizados, sin callbacks por grupo)
+                stats_repartidor = estadisticas_por_repartidor(resumen_filtrado, envios="envios", ingresos="ingresos")
                 
                 # Ordenar por ingresos totales
                 stats_repartidor = stats_repartidor.sort_values("Ingresos_Total", ascending=False)
@@ -454,93 +408,32 @@ if analizar_global and not df_global.empty:
                 
                 with col_graf1:
                     st.subheader("📈 Envíos por Repartidor")
-                    fig1, ax1 = plt.subplots(figsize=(10, 6))
-                    
-                    bars = ax1.bar(stats_repartidor["repartidor"], stats_repartidor["Envíos"], 
-                                  color=YUPII_BLUE, alpha=0.8)
-                    
-                    ax1.set_xlabel("Repartidor", fontsize=12, color=YUPII_BLACK)
-                    ax1.set_ylabel("Número de Envíos", fontsize=12, color=YUPII_BLACK)
-                    ax1.set_title("Envíos por Repartidor", fontsize=14, color=YUPII_BLACK, fontweight='bold')
-                    ax1.tick_params(axis='x', rotation=45)
-                    
-                    # Agregar valores en las barras
-                    for bar in bars:
-                        height = bar.get_height()
-                        ax1.text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                                f'{int(height)}',
-                                ha='center', va='bottom', fontsize=10, color=YUPII_BLACK)
-                    
-                    plt.tight_layout()
-                    st.pyplot(fig1)
-                    plt.close(fig1)
+                    st.image(render_png(grafica_envios_por_repartidor, stats_repartidor), use_column_width=True)
                 
                 with col_graf2:
                     st.subheader("💰 Ingresos por Repartidor")
-                    fig2, ax2 = plt.subplots(figsize=(10, 6))
-                    
-                    bars = ax2.bar(stats_repartidor["repartidor"], stats_repartidor["Ingresos_Total"], 
-                                  color=YUPII_CYAN, alpha=0.8)
-                    
-                    ax2.set_xlabel("Repartidor", fontsize=12, color=YUPII_BLACK)
-                    ax2.set_ylabel("Ingresos Totales ($)", fontsize=12, color=YUPII_BLACK)
-                    ax2.set_title("Ingresos por Repartidor", fontsize=14, color=YUPII_BLACK, fontweight='bold')
-                    ax2.tick_params(axis='x', rotation=45)
-                    
-                    # Agregar valores en las barras
-                    for bar in bars:
-                        height = bar.get_height()
-                        ax2.text(bar.get_x() + bar.get_width()/2., height + max(stats_repartidor["Ingresos_Total"])*0.01,
-                                f'${int(height)}',
-                                ha='center', va='bottom', fontsize=10, color=YUPII_BLACK)
-                    
-                    plt.tight_layout()
-                    st.pyplot(fig2)
-                    plt.close(fig2)
+                    st.image(render_png(grafica_ingresos_por_repartidor, stats_repartidor), use_column_width=True)
 
             # === ANÁLISIS TEMPORAL ===
             st.header(f"{EMOJI_CALENDARIO} Análisis Temporal")
             
             # Tendencia diaria
-            df_filtrado["fecha_solo"] = df_filtrado["fecha"].dt.date
-            tendencia_diaria = df_filtrado.groupby("fecha_solo").agg({
-                "costo_envio": ["count", "sum"]
-            })
+            fecha_solo = resumen_filtrado["fecha"].dt.date.rename("fecha_solo")
+            tendencia_diaria = resumen_filtrado.groupby(fecha_solo)[["envios", "ingresos"]].sum()
             tendencia_diaria.columns = ["Envíos", "Ingresos"]
             tendencia_diaria = tendencia_diaria.reset_index()
             
-            # Gráfica de tendencia temporal
-            fig3, (ax3, ax4) = plt.subplots(2, 1, figsize=(14, 10))
-            
-            # Envíos por día
-            ax3.plot(tendencia_diaria["fecha_solo"], tendencia_diaria["Envíos"], 
-                    marker='o', linewidth=2, color=YUPII_BLUE, markersize=4)
-            ax3.set_ylabel("Número de Envíos", fontsize=12, color=YUPII_BLUE)
-            ax3.set_title("Tendencia Diaria de Envíos", fontsize=14, color=YUPII_BLACK, fontweight='bold')
-            ax3.grid(True, alpha=0.3)
-            ax3.tick_params(axis='x', rotation=45)
-            
-            # Ingresos por día
-            ax4.plot(tendencia_diaria["fecha_solo"], tendencia_diaria["Ingresos"], 
-                    marker='s', linewidth=2, color=YUPII_CYAN, markersize=4)
-            ax4.set_xlabel("Fecha", fontsize=12, color=YUPII_BLACK)
-            ax4.set_ylabel("Ingresos ($)", fontsize=12, color=YUPII_CYAN)
-            ax4.set_title("Tendencia Diaria de Ingresos", fontsize=14, color=YUPII_BLACK, fontweight='bold')
-            ax4.grid(True, alpha=0.3)
-            ax4.tick_params(axis='x', rotation=45)
-            
-            plt.tight_layout()
-            st.pyplot(fig3)
-            plt.close(fig3)
+            # Gráfica de tendencia temporal (PNG en cache mientras el período no cambie)
+            st.image(render_png(grafica_tendencia_diaria, tendencia_diaria), use_column_width=True)
 
             # === ANÁLISIS POR ESTABLECIMIENTO ===
-            if "establecimiento_normalizado" in df_filtrado.columns:
+            if "establecimiento_normalizado" in resumen_filtrado.columns:
                 st.header(f"🏪 Top Establecimientos")
                 
                 # Top 10 establecimientos
-                top_establecimientos = df_filtrado.groupby("establecimiento_normalizado").agg({
-                    "costo_envio": ["count", "sum"]
-                }).round(2)
+                top_establecimientos = resumen_filtrado.groupby("establecimiento_normalizado", observed=True)[
+                    ["envios", "ingresos"]
+                ].sum()
                 top_establecimientos.columns = ["Envíos", "Ingresos_Total"]
                 top_establecimientos = top_establecimientos.reset_index()
                 top_establecimientos = top_establecimientos.sort_values("Envíos", ascending=False).head(10)
@@ -557,33 +450,13 @@ if analizar_global and not df_global.empty:
                 
                 with col_top2:
                     st.subheader("📈 Gráfica Top Establecimientos")
-                    fig4, ax5 = plt.subplots(figsize=(10, 8))
-                    
-                    # Crear gráfica horizontal para mejor legibilidad
-                    y_pos = range(len(top_establecimientos))
-                    bars = ax5.barh(y_pos, top_establecimientos["Envíos"], color=YUPII_BLUE, alpha=0.8)
-                    
-                    ax5.set_yticks(y_pos)
-                    ax5.set_yticklabels(top_establecimientos["establecimiento_normalizado"], fontsize=10)
-                    ax5.set_xlabel("Número de Envíos", fontsize=12, color=YUPII_BLACK)
-                    ax5.set_title("Top 10 Establecimientos por Envíos", fontsize=14, color=YUPII_BLACK, fontweight='bold')
-                    
-                    # Agregar valores en las barras
-                    for i, bar in enumerate(bars):
-                        width = bar.get_width()
-                        ax5.text(width + 0.5, bar.get_y() + bar.get_height()/2,
-                                f'{int(width)}',
-                                ha='left', va='center', fontsize=9, color=YUPII_BLACK)
-                    
-                    plt.tight_layout()
-                    st.pyplot(fig4)
-                    plt.close(fig4)
+                    st.image(render_png(grafica_top_establecimientos, top_establecimientos), use_column_width=True)
 
             # === EXPORTAR RESULTADOS ===
             st.header(f"📁 Exportar Resultados")
             
             # Botón para exportar análisis completo
-            if "repartidor" in df_filtrado.columns:
+            if tiene_repartidor:
                 # Preparar datos para exportar
                 csv_export = stats_repartidor.copy()
                 csv_export.columns = [
@@ -592,25 +465,38 @@ if analizar_global and not df_global.empty:
                     "pago_repartidor_70", "promedio_diario"
                 ]
                 
-                csv_data = csv_export.to_csv(index=False).encode("utf-8")
-                
-                st.download_button(
-                    label="📊 Descargar análisis por repartidor (CSV)",
-                    data=csv_data,
+                descarga_diferida(
+                    "📊 Descargar análisis por repartidor (CSV)",
+                    csv_bytes,
+                    csv_export,
                     file_name=f"analisis_repartidores_{fecha_inicio.strftime('%Y%m%d')}_{fecha_fin.strftime('%Y%m%d')}.csv",
                     mime="text/csv",
                     help="Descarga el análisis completo en formato CSV"
                 )
             
-            # Exportar datos filtrados
-            csv_filtered = df_filtrado.to_csv(index=False).encode("utf-8")
-            st.download_button(
-                label="📋 Descargar datos filtrados (CSV)",
-                data=csv_filtered,
-                file_name=f"datos_filtrados_{fecha_inicio.strftime('%Y%m%d')}_{fecha_fin.strftime('%Y%m%d')}.csv",
-                mime="text/csv",
-                help="Descarga los datos filtrados en formato CSV"
-            )
+            # Exportar datos filtrados (en S3 los pedidos se consultan solo al prepararlos)
+            nombre_filtrados = f"datos_filtrados_{fecha_inicio.strftime('%Y%m%d')}_{fecha_fin.strftime('%Y%m%d')}.csv"
+            if consulta_s3:
+                descarga_diferida(
+                    "📋 Descargar datos filtrados (CSV)",
+                    exportar_pedidos_s3,
+                    fecha_inicio_dt,
+                    fecha_fin_dt,
+                    repartidores_seleccionados or None,
+                    file_name=nombre_filtrados,
+                    mime="text/csv",
+                    version=(resumen_s3["partes"], resumen_s3["bytes"]),
+                    help="Descarga los datos filtrados en formato CSV"
+                )
+            else:
+                descarga_diferida(
+                    "📋 Descargar datos filtrados (CSV)",
+                    csv_bytes,
+                    df_filtrado,
+                    file_name=nombre_filtrados,
+                    mime="text/csv",
+                    help="Descarga los datos filtrados en formato CSV"
+                )
 
 elif not analizar_global:
     # Pantalla inicial sin análisis
@@ -1,4 +1,9 @@
 import streamlit as st
+from s3_manager import get_s3_manager
+from dotenv import load_dotenv
+
+# Cargar variables de entorno
+load_dotenv()
 
 # Configuración de la página
 st.set_page_config(
@@ -42,4 +47,8 @@ with col2:
 
 # Información adicional
 st.markdown("---")
-st.info("📡 **Estado de Conexión S3:** ✅ Conectado al bucket `xideralaws-curso-carlos`")
+s3_manager = get_s3_manager()
+if s3_manager.test_connection():
+    st.info(f"📡 **Estado de Conexión S3:** ✅ Conectado al bucket `{s3_manager.bucket_name}`")
+else:
+    st.warning("📡 **Estado de Conexión S3:** ❌ Sin conexión - Verificar credenciales y configuración")
@@ -0,0 +1,35 @@
+"""
+Migra el dataset global de datasets/dataset_global.csv al formato
+particionado en Parquet (datasets/global/repartidor=.../mes=.../).
+
+Los renglones idénticos del CSV (copias que dejaba el dashboard anterior al
+volver a agregar el mismo lote) se migran una sola vez.
+
+Uso:
+    python src/migrar_dataset.py
+"""
+from dotenv import load_dotenv
+
+from s3_manager import get_s3_manager
+
+
+def main():
+    load_dotenv()
+    s3_manager = get_s3_manager()
+    if not s3_manager.probe_connection():
+        print("❌ Sin conexión con S3; revisa las variables de entorno")
+        return 1
+
+    resumen = s3_manager.migrate_legacy_dataset()
+    if not resumen:
+        print("❌ La migración falló")
+        return 1
+
+    print(f"✅ Registros migrados del CSV: {resumen['registros_migrados']}")
+    print(f"🧹 Renglones repetidos del CSV descartados: {resumen['duplicados_descartados']}")
+    print(f"✅ Particiones reescritas en Parquet: {resumen['particiones_reescritas']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
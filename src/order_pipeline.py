@@ -0,0 +1,134 @@
+import os
+from datetime import datetime
+from typing import IO, Dict, List, NamedTuple, Optional
+
+import pandas as pd
+import streamlit as st
+from botocore.exceptions import ClientError
+
+from chat_parser import extraer_chat
+from establishments import normalize_series
+from order_schema import memoria_bytes, normalizar_tipos
+from product_filter import classify_products
+from s3_stream import stream_etag
+from size_cache import SizeBoundedCache
+
+# Texto de ejemplo que se muestra cuando no hay archivo cargado
+TEXTO_PLACEHOLDER = "_chat_2.txt no cargado.\n_*Recoger en*_\n📍Establecimiento\n_*Pedido*_\nProducto\n_*Cobrar*_\n$0\n[01/01/25, 00:00:00]"
+
+# Límite de memoria para los chats ya procesados (compartido por todas las sesiones)
+CACHE_MAX_MB = int(os.getenv("CHAT_CACHE_MAX_MB", "256"))
+
+
+class PedidosProcesados(NamedTuple):
+    """Resultado de descargar, parsear y normalizar un chat (tratar como solo lectura)"""
+
+    df: pd.DataFrame
+    productos_filtrados: List[str]
+    establecimientos_normalizados: Dict[str, List[str]]
+    bonos: pd.DataFrame
+
+
+_cache = SizeBoundedCache(CACHE_MAX_MB * 1024 * 1024)
+
+
+def procesar_chat(archivo: IO[str]) -> PedidosProcesados:
+    """
+    Extrae los pedidos y bonos de un chat, filtra productos y normaliza establecimientos
+
+    Args:
+        archivo: Objeto tipo archivo de texto con el chat exportado de WhatsApp
+
+    Returns:
+        PedidosProcesados con el DataFrame, los bonos y las estadísticas de limpieza
+    """
+    # Extraer pedidos (un str.extract por campo) y bonos en una sola lectura del chat
+    df, bonos = extraer_chat(archivo)
+
+    # Normalizar establecimientos
+    establecimientos_raw = df["establecimiento"]
+    df["establecimiento"] = normalize_series(establecimientos_raw)
+
+    # Rastrear normalizaciones para estadísticas
+    cambiados = establecimientos_raw.str.lower() != df["establecimiento"].str.lower()
+    establecimientos_normalizados = (
+        establecimientos_raw[cambiados]
+        .groupby(df.loc[cambiados, "establecimiento"], sort=False)
+        .agg(list)
+        .to_dict()
+    )
+
+    # Filtrar productos - los que no son válidos se reemplazan por un placeholder
+    productos_validos = classify_products(df["producto"])
+    productos_filtrados = df.loc[~productos_validos, "producto"].tolist()
+    df.loc[~productos_validos, "producto"] = "Producto no especificado"
+
+    # Tabla compacta: categóricas, enteros chicos y productos del diccionario compartido
+    return PedidosProcesados(normalizar_tipos(df), productos_filtrados, establecimientos_normalizados, bonos)
+
+
+def sumar_bonos(bonos: pd.DataFrame, fecha_inicio: datetime, fecha_fin: datetime) -> int:
+    """
+    Total de bonos con fecha dentro de [fecha_inicio, fecha_fin]
+
+    Args:
+        bonos: Tabla de bonos de PedidosProcesados
+        fecha_inicio: Inicio del rango (inclusive)
+        fecha_fin: Fin del rango (inclusive)
+
+    Returns:
+        Suma de los montos
+    """
+    en_rango = (bonos["fecha"] >= fecha_inicio) & (bonos["fecha"] <= fecha_fin)
+    return int(bonos.loc[en_rango, "monto"].sum())
+
+
+def _tamano(resultado: PedidosProcesados) -> int:
+    """Tamaño aproximado en bytes de un resultado procesado (sin el diccionario compartido)"""
+    return memoria_bytes(resultado.df) + int(resultado.bonos.memory_usage(deep=True).sum())
+
+
+def cargar_pedidos_s3(s3_manager, key: str) -> Optional[PedidosProcesados]:
+    """
+    Descarga y procesa un chat de S3, reutilizando el resultado mientras no cambie
+
+    La cache se indexa por (bucket, key, ETag) con el ETag del primer GET por
+    rango del mismo stream que se procesa, así que cada entrada corresponde
+    exactamente al contenido leído: si el objeto se reemplaza en S3 su ETag
+    cambia y el chat se vuelve a procesar. Con el chat sin cambios solo se
+    hace ese primer GET y el stream se cierra sin leer el resto.
+
+    Args:
+        s3_manager: Instancia de S3Manager
+        key: Clave del chat en S3
+
+    Returns:
+        PedidosProcesados o None si el archivo no se pudo descargar o leer
+    """
+    # El chat se lee en streaming: nunca se tiene el texto completo en memoria
+    archivo = s3_manager.open_text(key)
+    if archivo is None:
+        return None
+
+    try:
+        with archivo:
+            etag = stream_etag(archivo)
+            clave = (s3_manager.bucket_name, key, etag)
+            if etag is not None:
+                resultado = _cache.get(clave)
+                if resultado is not None:
+                    return resultado
+            resultado = procesar_chat(archivo)
+    except ClientError as e:
+        # El objeto cambió o se borró a mitad de la lectura; no se cachea y se reintenta en la siguiente ejecución
+        s3_manager.report_error(e)
+        st.error(f"Error al descargar archivo de S3: {str(e)}")
+        return None
+    except Exception as e:
+        # Red caída a mitad del stream (BotoCoreError), UTF-8 inválido, etc.
+        s3_manager.report_error(e)
+        st.error(f"Error inesperado al descargar archivo: {str(e)}")
+        return None
+    if etag is not None:
+        _cache.put(clave, resultado, _tamano(resultado))
+    return resultado
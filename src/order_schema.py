@@ -0,0 +1,179 @@
+import os
+import threading
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from date_parsing import normalizar_fechas
+
+# Textos distintos que puede guardar el diccionario compartido de productos;
+# al llenarse, cada tabla usa sus propias categorías
+PRODUCT_DICTIONARY_MAX_ENTRIES = int(os.getenv("PRODUCT_DICTIONARY_MAX_ENTRIES", "500000"))
+
+# Tipos de las columnas conocidas de la tabla de pedidos ('producto' se
+# codifica aparte, con el diccionario compartido)
+TIPOS_COLUMNAS = {
+    "fecha": "datetime64[s]",
+    "costo_envio": "int32",
+    "marca_tiempo": "Int64",
+    "establecimiento": "category",
+    "repartidor": "category",
+}
+
+
+# Capacidad inicial del arreglo de textos del diccionario (se duplica al llenarse)
+CAPACIDAD_INICIAL_DICCIONARIO = 1024
+
+
+class DiccionarioTextos:
+    """
+    Diccionario de textos compartido entre hilos (y sesiones de Streamlit)
+
+    Cada texto recibe un código fijo la primera vez que aparece, así que las
+    tablas de todas las sesiones guardan solo los códigos y el texto de cada
+    producto existe una sola vez por proceso. Los códigos nunca cambian: una
+    columna codificada con una versión anterior del diccionario sigue siendo
+    válida con la actual.
+
+    Los textos viven en un arreglo que solo crece, con capacidad reservada
+    que se duplica al llenarse. Cada versión del diccionario es una vista de
+    su prefijo (agregar un texto escribe después del final de todas las
+    vistas, así que ninguna cambia): las tablas viejas en cache no retienen
+    copias propias del diccionario. Al duplicarse, el arreglo anterior sigue
+    vivo mientras alguna tabla use una versión suya, a lo más el doble de la
+    memoria del diccionario.
+
+    Solo un lote con textos nuevos publica una versión, y pandas valida sus
+    categorías una vez (~30 ms con 500k textos); los demás lotes reutilizan
+    el tipo vigente, cuya validación ya quedó guardada.
+
+    Los textos nunca se eliminan: el diccionario crece con cada producto
+    distinto que ve el proceso hasta ``max_textos``
+    (PRODUCT_DICTIONARY_MAX_ENTRIES) y desde ahí las tablas nuevas usan sus
+    propias categorías. Se vacía solo al reiniciar el proceso.
+    """
+
+    def __init__(self, max_textos: int, capacidad_inicial: int = CAPACIDAD_INICIAL_DICCIONARIO):
+        """
+        Args:
+            max_textos: Número máximo de textos distintos que se guardan
+            capacidad_inicial: Textos que caben antes de la primera ampliación
+        """
+        self.max_textos = max_textos
+        self._codigos = {}
+        self._reserva = np.empty(max(1, min(capacidad_inicial, max_textos)), dtype=object)
+        self._n = 0
+        self._tipo = pd.CategoricalDtype(pd.Index(self._reserva[:0], dtype=object, copy=False))
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._n
+
+    def es_compartida(self, valores: pd.Series) -> bool:
+        """True si ``valores`` ya está codificada con (alguna versión de) este diccionario"""
+        if not isinstance(valores.dtype, pd.CategoricalDtype):
+            return False
+        categorias = valores.cat.categories
+        textos = self._reserva
+        n = len(categorias)
+        # Cada versión es un prefijo de la actual y comparte sus objetos str
+        return 0 < n <= self._n and categorias[0] is textos[0] and categorias[n - 1] is textos[n - 1]
+
+    def _agregar(self, nuevos: List[str]) -> None:
+        """Agrega textos al final del arreglo, ampliándolo al doble si no caben (con el lock tomado)"""
+        fin = self._n + len(nuevos)
+        if fin > len(self._reserva):
+            capacidad = min(max(2 * len(self._reserva), fin), self.max_textos)
+            reserva = np.empty(capacidad, dtype=object)
+            reserva[:self._n] = self._reserva[:self._n]
+            self._reserva = reserva
+        for codigo, texto in enumerate(nuevos, start=self._n):
+            self._codigos[texto] = codigo
+        self._reserva[self._n:fin] = nuevos
+        self._n = fin
+        self._tipo = pd.CategoricalDtype(pd.Index(self._reserva[:fin], dtype=object, copy=False))
+
+    def codificar(self, valores: pd.Series) -> pd.Series:
+        """
+        Convierte una serie de textos a categórica con las categorías compartidas
+
+        Solo se buscan en el diccionario los valores distintos de la serie.
+
+        Args:
+            valores: Serie de textos u otra categórica (None/NaN se conservan)
+
+        Returns:
+            Serie categórica con el mismo índice; si el diccionario está lleno,
+            con sus propias categorías
+        """
+        if self.es_compartida(valores):
+            if valores.cat.categories is self._tipo.categories:
+                return valores
+            codigos = valores.cat.codes.to_numpy()
+            return pd.Series(pd.Categorical.from_codes(codigos, dtype=self._tipo),
+                             index=valores.index, name=valores.name)
+
+        locales, unicos = pd.factorize(valores)
+        unicos = [texto if isinstance(texto, str) else str(texto) for texto in unicos]
+
+        with self._lock:
+            nuevos = list(dict.fromkeys(texto for texto in unicos if texto not in self._codigos))
+            if self._n + len(nuevos) > self.max_textos:
+                return valores.astype("category")
+            if nuevos:
+                self._agregar(nuevos)
+            tipo = self._tipo
+            mapa = np.array([self._codigos[texto] for texto in unicos] + [-1], dtype=np.int32)
+
+        # locales == -1 (valor faltante) toma el último elemento del mapa (-1)
+        return pd.Series(pd.Categorical.from_codes(mapa[locales], dtype=tipo),
+                         index=valores.index, name=valores.name)
+
+    def memoria_bytes(self) -> int:
+        """Bytes que ocupan los textos del diccionario y su arreglo (una sola vez por proceso)"""
+        return int(self._tipo.categories.memory_usage(deep=True)) + 8 * (len(self._reserva) - self._n)
+
+
+# Diccionario de productos de todas las tablas de pedidos del proceso
+PRODUCTOS = DiccionarioTextos(PRODUCT_DICTIONARY_MAX_ENTRIES)
+
+
+def normalizar_tipos(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aplica el esquema compacto de la tabla de pedidos a las columnas presentes
+
+    'fecha' queda como datetime64[s], 'costo_envio' como int32,
+    'marca_tiempo' como Int64 (nulo en pedidos guardados sin hora),
+    'establecimiento'/'repartidor' como categóricas y 'producto' como
+    códigos del diccionario compartido PRODUCTOS.
+
+    Args:
+        df: DataFrame de pedidos o de resumen (se modifica y se devuelve)
+
+    Returns:
+        El mismo DataFrame con los tipos aplicados
+    """
+    if "fecha" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["fecha"]):
+        df["fecha"] = normalizar_fechas(df["fecha"])
+    if "costo_envio" in df.columns:
+        df["costo_envio"] = pd.to_numeric(df["costo_envio"], errors="coerce").fillna(0)
+    for columna, tipo in TIPOS_COLUMNAS.items():
+        if columna in df.columns and df[columna].dtype != tipo:
+            df[columna] = df[columna].astype(tipo)
+    if "producto" in df.columns:
+        df["producto"] = PRODUCTOS.codificar(df["producto"])
+    return df
+
+
+def memoria_bytes(df: pd.DataFrame) -> int:
+    """
+    Bytes que ocupa una tabla de pedidos sin contar el diccionario compartido
+
+    Con ``memory_usage(deep=True)`` cada tabla contaría todos los textos del
+    diccionario de productos, aunque existen una sola vez por proceso.
+    """
+    uso = df.memory_usage(deep=True)
+    if "producto" in df.columns and PRODUCTOS.es_compartida(df["producto"]):
+        uso["producto"] = df["producto"].cat.codes.nbytes
+    return int(uso.sum())
@@ -0,0 +1,179 @@
+import re
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from trie_regex import build_trie_pattern
+
+# 1. Filtros de exclusión directa (instrucciones de envío)
+INSTRUCCIONES_ENVIO = [
+    "tiene un envio", "tienen un envio", "tiene un envío", "tienen un envío",
+    "a nombre de yupii", "a nombre de", "donde sea", "sin producto",
+    "no aplica", "efectivo", "transferencia", "pago", "deposito",
+    "-", "", "nan", "null", "none"
+]
+
+# Palabras clave que indican productos reales
+PRODUCTOS_KEYWORDS = [
+    # Comida
+    "pizza", "hamburguesa", "burger", "pollo", "carne", "pescado",
+    "pasta", "espagueti", "lasaña", "ensalada", "sopa", "sandwich",
+    "taco", "burrito", "quesadilla", "empanada", "arepa", "hot dog",
+    "papas", "patatas", "french fries", "combo", "menu", "menú",
+    "desayuno", "almuerzo", "cena", "bebida", "refresco", "jugo",
+    "cerveza", "agua", "café", "té", "smoothie", "milkshake",
+    "helado", "postre", "torta", "pastel", "galleta", "donut",
+    "pan", "bread", "arroz", "frijoles", "beans", "verdura",
+
+    # Servicios/Pagos
+    "recarga", "pago de", "servicio", "factura", "bill", "cuenta",
+    "deposito", "retiro", "giro", "remesa", "envio de dinero",
+
+    # Retail/Productos
+    "producto", "articulo", "item", "medicamento", "medicina",
+    "shampoo", "jabon", "crema", "perfume", "maquillaje",
+    "ropa", "zapatos", "accesorio", "libro", "revista",
+    "electronico", "telefono", "cargador", "cable",
+
+    # Marcas conocidas
+    "coca cola", "pepsi", "sprite", "fanta", "mcdonalds", "kfc",
+    "burger king", "subway", "dominos", "pizza hut", "starbucks"
+]
+
+# Palabras que acompañan a un número en productos tipo "Combo #1", "Menu 2"
+PALABRAS_COMBO = ["combo", "menu", "menú", "#", "no.", "item"]
+
+# Ingredientes/descripción culinaria
+CONECTORES_CULINARIOS = ["con", "de", "y", "sin", "extra", "adicional"]
+
+# Palabras propias de instrucciones de entrega
+PALABRAS_ENTREGA = ["envio", "entregar", "recoger", "cliente", "direccion"]
+
+# Categorías como bits para acumularlas en un solo recorrido del texto
+INSTRUCCION = 1
+PRODUCTO = 2
+COMBO = 4
+CONECTOR = 8
+ENTREGA = 16
+
+
+def _construir_categorias() -> Dict[str, int]:
+    categorias: Dict[str, int] = {}
+    for palabras, bit in [
+        (INSTRUCCIONES_ENVIO, INSTRUCCION),
+        (PRODUCTOS_KEYWORDS, PRODUCTO),
+        (PALABRAS_COMBO, COMBO),
+        (CONECTORES_CULINARIOS, CONECTOR),
+        (PALABRAS_ENTREGA, ENTREGA),
+    ]:
+        for palabra in palabras:
+            if palabra:
+                categorias[palabra] = categorias.get(palabra, 0) | bit
+
+    # El patrón devuelve la palabra más larga en cada posición; las palabras
+    # que son prefijo de ella también aparecen ahí, así que heredan sus bits.
+    heredadas = {}
+    for palabra in categorias:
+        bits = 0
+        for otra, bits_otra in categorias.items():
+            if palabra.startswith(otra):
+                bits |= bits_otra
+        heredadas[palabra] = bits
+    return heredadas
+
+
+# Tabla palabra -> categorías y autómata, construidos una sola vez al importar
+CATEGORIAS = _construir_categorias()
+RE_PALABRAS = re.compile("(?=(" + build_trie_pattern(CATEGORIAS) + "))")
+
+# La cadena vacía está contenida en cualquier texto: toda instrucción corta
+# (menos de 25 caracteres) se considera instrucción de envío.
+INSTRUCCION_VACIA = "" in INSTRUCCIONES_ENVIO
+
+
+def categorias_texto(texto: str) -> int:
+    """
+    Recorre el texto una sola vez y acumula las categorías de palabras encontradas
+
+    Args:
+        texto: Texto en minúsculas
+
+    Returns:
+        Combinación de bits INSTRUCCION, PRODUCTO, COMBO, CONECTOR y ENTREGA
+    """
+    encontradas = 0
+    for match in RE_PALABRAS.finditer(texto):
+        encontradas |= CATEGORIAS[match.group(1)]
+    return encontradas
+
+
+def es_producto_valido(producto):
+    """
+    Determina si un texto representa un producto real o es una instrucción de envío.
+
+    Returns:
+        bool: True si es un producto válido, False si es instrucción/basura
+    """
+    if not producto or isinstance(producto, float):
+        return False
+
+    producto = str(producto).strip()
+    longitud = len(producto)
+
+    # 1. Filtros de exclusión directa (instrucciones de envío)
+    if longitud < 25 and INSTRUCCION_VACIA:
+        return False
+
+    producto_lower = producto.lower()
+    encontradas = categorias_texto(producto_lower)
+
+    if longitud < 25 and encontradas & INSTRUCCION:
+        return False
+
+    # 2. Si es muy corto (menos de 3 caracteres), probablemente no es un producto
+    if longitud < 3:
+        return False
+
+    # 4. Verificar si contiene palabras clave de productos
+    if encontradas & PRODUCTO:
+        return True
+
+    # 5. Productos con números/códigos (ej: "Combo #1", "Menu 2", "Item 123")
+    if encontradas & COMBO and any(char.isdigit() for char in producto):
+        return True
+
+    # 6. Si tiene ingredientes/descripción culinaria (contiene "con", "de", "y")
+    if encontradas & CONECTOR and longitud > 10:
+        return True
+
+    # 7. Si parece una descripción de comida (más de 8 caracteres y no es instrucción)
+    if longitud > 8 and not encontradas & ENTREGA:
+        # Verificar que no sea solo mayúsculas (que suelen ser instrucciones)
+        if not producto.isupper() or longitud > 15:
+            return True
+
+    # 8. Por defecto, si llegó hasta aquí y es texto largo, probablemente es producto
+    if longitud > 15:
+        return True
+
+    return False
+
+
+def classify_products(productos: pd.Series) -> pd.Series:
+    """
+    Clasifica toda una columna de productos de una sola vez
+
+    Cada texto distinto se evalúa una sola vez y el resultado se reparte a
+    todas las filas que lo contienen.
+
+    Args:
+        productos: Serie con los textos de producto
+
+    Returns:
+        Serie booleana (mismo índice) con True para los productos válidos
+    """
+    codigos, unicos = pd.factorize(productos)
+    resultados = np.array([es_producto_valido(producto) for producto in unicos] + [False], dtype=bool)
+    # Los nulos tienen código -1 y toman el False agregado al final
+    return pd.Series(resultados[codigos], index=productos.index)
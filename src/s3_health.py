@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Segundos que se considera vigente un chequeo exitoso
+HEALTH_TTL = float(os.getenv('S3_HEALTH_TTL', '30'))
+
+# Espera inicial y máxima (segundos) entre reintentos tras un fallo
+HEALTH_BACKOFF_BASE = float(os.getenv('S3_HEALTH_BACKOFF_BASE', '5'))
+HEALTH_BACKOFF_MAX = float(os.getenv('S3_HEALTH_BACKOFF_MAX', '300'))
+
+
+class S3HealthMonitor:
+    """
+    Estado de conectividad con S3 compartido por todas las sesiones
+
+    Las páginas leen el último estado conocido sin esperar a la red. Cuando el
+    estado vence se refresca en un hilo de fondo; tras un fallo los reintentos
+    se espacian con backoff exponencial.
+    """
+
+    def __init__(self, probe: Callable[[], bool], ttl: float = HEALTH_TTL,
+                 backoff_base: float = HEALTH_BACKOFF_BASE, backoff_max: float = HEALTH_BACKOFF_MAX):
+        """
+        Args:
+            probe: Función que hace el chequeo real y devuelve True si hay conexión
+            ttl: Vigencia (segundos) de un chequeo exitoso
+            backoff_base: Espera tras el primer fallo
+            backoff_max: Espera máxima entre reintentos
+        """
+        self._probe = probe
+        self.ttl = ttl
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._lock = threading.Lock()
+        self._healthy: Optional[bool] = None
+        self._failures = 0
+        self._checked_at = 0.0
+        self._next_check = 0.0
+        self._refreshing = False
+
+    def is_healthy(self) -> bool:
+        """
+        Devuelve el último estado conocido sin bloquear
+
+        Solo el primer llamado del proceso hace el chequeo de forma síncrona.
+        """
+        with self._lock:
+            healthy = self._healthy
+            vencido = time.monotonic() >= self._next_check
+            lanzar = healthy is not None and vencido and not self._refreshing
+            if lanzar:
+                self._refreshing = True
+
+        if healthy is None:
+            return self.refresh()
+
+        if lanzar:
+            threading.Thread(target=self._refresh_background, daemon=True).start()
+        return healthy
+
+    def refresh(self) -> bool:
+        """Ejecuta el chequeo real ahora y actualiza el estado"""
+        try:
+            ok = bool(self._probe())
+        except Exception:
+            ok = False
+
+        if ok:
+            self.mark_healthy()
+        else:
+            self.mark_unhealthy()
+        return ok
+
+    def _refresh_background(self) -> None:
+        try:
+            self.refresh()
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def mark_healthy(self) -> None:
+        """Registra una operación exitosa contra S3"""
+        with self._lock:
+            ahora = time.monotonic()
+            self._healthy = True
+            self._failures = 0
+            self._checked_at = ahora
+            self._next_check = ahora + self.ttl
+
+    def mark_unhealthy(self) -> None:
+        """Registra un fallo (de un chequeo o de una operación real) de inmediato"""
+        with self._lock:
+            ahora = time.monotonic()
+            self._healthy = False
+            self._failures += 1
+            self._checked_at = ahora
+            espera = min(self.backoff_base * 2 ** min(self._failures - 1, 16), self.backoff_max)
+            self._next_check = ahora + espera
+
+    def snapshot(self) -> Dict:
+        """Estado actual para mostrar en la interfaz"""
+        with self._lock:
+            ahora = time.monotonic()
+            return {
+                'healthy': self._healthy,
+                'failures': self._failures,
+                'age_seconds': ahora - self._checked_at if self._healthy is not None else None,
+                'next_check_seconds': max(self._next_check - ahora, 0.0),
+            }
@@ -0,0 +1,206 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Segundos entre refrescos del listado de un prefijo
+LISTING_TTL = float(os.getenv('S3_LISTING_TTL', '60'))
+
+# Segundos entre re-listados completos de los prefijos con claves crecientes
+# (detectan borrados y sobrescrituras; los demás prefijos se re-listan en cada refresco)
+LISTING_FULL_TTL = float(os.getenv('S3_LISTING_FULL_TTL', '600'))
+
+# Subcarpetas que se listan en paralelo
+LISTING_WORKERS = int(os.getenv('S3_LISTING_WORKERS', '8'))
+
+
+class ObjectInfo(NamedTuple):
+    """Metadatos de un objeto del bucket"""
+
+    key: str
+    size: int
+    etag: str
+    last_modified: datetime
+
+
+class _PrefixSnapshot:
+    """Índice en memoria de un prefijo: claves directas más una partición por subcarpeta"""
+
+    def __init__(self):
+        # Partición ("" = claves directas del prefijo, o la subcarpeta) -> clave -> ObjectInfo
+        self.particiones: Dict[str, Dict[str, ObjectInfo]] = {}
+        self.full_at = 0.0
+        self.refreshed_at = 0.0
+        self.lock = threading.Lock()
+
+    def objects(self) -> List[ObjectInfo]:
+        particiones = self.particiones
+        return [obj for particion in particiones.values() for obj in particion.values()]
+
+
+class S3ListingIndex:
+    """
+    Listado paginado de S3 con índice en memoria compartido por todo el proceso
+
+    El primer listado de un prefijo lo recorre completo con el paginador,
+    repartiendo cada subcarpeta (por ejemplo una por repartidor) en hilos, y
+    se repite completo cada ``ttl`` segundos: los chats y las partes del
+    dataset tienen nombres arbitrarios (un chat nuevo o una parte con hash
+    puede quedar antes que las claves conocidas) y se sobrescriben en el
+    mismo lugar.
+
+    Solo en los prefijos de ``claves_crecientes``, cuyas claves nuevas siempre
+    quedan después de las existentes, los refrescos piden únicamente las
+    claves posteriores a la última conocida de cada subcarpeta
+    (``StartAfter``); aun así las claves directas del prefijo se vuelven a
+    listar completas y cada ``full_ttl`` segundos se re-lista todo para
+    detectar borrados y sobrescrituras.
+    """
+
+    def __init__(self, s3_client, bucket_name: str, ttl: float = LISTING_TTL,
+                 full_ttl: float = LISTING_FULL_TTL, workers: int = LISTING_WORKERS,
+                 claves_crecientes: Tuple[str, ...] = ()):
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.ttl = ttl
+        self.full_ttl = full_ttl
+        self.workers = workers
+        self.claves_crecientes = claves_crecientes
+        self._snapshots: Dict[str, _PrefixSnapshot] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def _snapshot(self, prefix: str) -> _PrefixSnapshot:
+        with self._lock:
+            return self._snapshots.setdefault(prefix, _PrefixSnapshot())
+
+    def list_objects(self, prefix: str) -> List[ObjectInfo]:
+        """
+        Devuelve todos los objetos bajo el prefijo, refrescando el índice si venció
+
+        Si otro hilo ya está refrescando y hay datos previos, se devuelven
+        estos sin esperar.
+
+        Args:
+            prefix: Prefijo a listar
+
+        Returns:
+            Lista de ObjectInfo (sin orden garantizado)
+        """
+        snapshot = self._snapshot(prefix)
+        ahora = time.monotonic()
+
+        if snapshot.refreshed_at and ahora - snapshot.refreshed_at < self.ttl:
+            return snapshot.objects()
+
+        bloqueante = not snapshot.refreshed_at
+        if not snapshot.lock.acquire(blocking=bloqueante):
+            return snapshot.objects()
+        try:
+            ahora = time.monotonic()
+            incremental = prefix in self.claves_crecientes and ahora - snapshot.full_at < self.full_ttl
+            if not snapshot.refreshed_at or not incremental:
+                self._full_refresh(prefix, snapshot)
+            elif ahora - snapshot.refreshed_at >= self.ttl:
+                self._incremental_refresh(prefix, snapshot)
+        finally:
+            snapshot.lock.release()
+
+        return snapshot.objects()
+
+    def invalidate(self, prefix: Optional[str] = None) -> None:
+        """Descarta el índice de un prefijo (o de todos) para forzar un re-listado completo"""
+        with self._lock:
+            if prefix is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(prefix, None)
+
+    def record_put(self, key: str, size: int, etag: str) -> None:
+        """Registra en el índice un objeto que acabamos de escribir, sin volver a listar"""
+        info = ObjectInfo(key, size, etag, datetime.now().astimezone())
+        with self._lock:
+            snapshots = [(prefix, snap) for prefix, snap in self._snapshots.items() if key.startswith(prefix)]
+        for prefix, snapshot in snapshots:
+            resto = key[len(prefix):]
+            particion = prefix + resto.split('/')[0] + '/' if '/' in resto else ""
+            with snapshot.lock:
+                particiones = dict(snapshot.particiones)
+                particiones[particion] = {**particiones.get(particion, {}), key: info}
+                snapshot.particiones = particiones
+
+    def record_delete(self, keys: List[str]) -> None:
+        """Quita del índice objetos que acabamos de borrar, sin volver a listar"""
+        borrar = set(keys)
+        with self._lock:
+            snapshots = list(self._snapshots.values())
+        for snapshot in snapshots:
+            with snapshot.lock:
+                snapshot.particiones = {
+                    particion: {key: obj for key, obj in objetos.items() if key not in borrar}
+                    for particion, objetos in snapshot.particiones.items()
+                }
+
+    def _paginate(self, prefix: str, start_after: Optional[str] = None, delimiter: Optional[str] = None):
+        """Recorre todas las páginas de list_objects_v2 (sin el límite de 1000 claves)"""
+        params = {'Bucket': self.bucket_name, 'Prefix': prefix}
+        if start_after:
+            params['StartAfter'] = start_after
+        if delimiter:
+            params['Delimiter'] = delimiter
+
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(**params):
+            self.requests += 1
+            yield page
+
+    def _list_partition(self, prefix: str, start_after: Optional[str] = None) -> Dict[str, ObjectInfo]:
+        objetos = {}
+        for page in self._paginate(prefix, start_after=start_after):
+            for obj in page.get('Contents', []):
+                objetos[obj['Key']] = ObjectInfo(obj['Key'], obj['Size'], obj['ETag'], obj['LastModified'])
+        return objetos
+
+    def _list_root(self, prefix: str, start_after: Optional[str] = None):
+        """Lista las claves directas del prefijo y descubre sus subcarpetas"""
+        directos: Dict[str, ObjectInfo] = {}
+        subcarpetas: List[str] = []
+        for page in self._paginate(prefix, start_after=start_after, delimiter='/'):
+            for obj in page.get('Contents', []):
+                directos[obj['Key']] = ObjectInfo(obj['Key'], obj['Size'], obj['ETag'], obj['LastModified'])
+            subcarpetas.extend(common['Prefix'] for common in page.get('CommonPrefixes', []))
+        return directos, subcarpetas
+
+    def _full_refresh(self, prefix: str, snapshot: _PrefixSnapshot) -> None:
+        directos, subcarpetas = self._list_root(prefix)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(subcarpetas) or 1))) as executor:
+            resultados = executor.map(self._list_partition, subcarpetas)
+            particiones = {"": directos}
+            particiones.update(zip(subcarpetas, resultados))
+
+        snapshot.particiones = particiones
+        snapshot.full_at = snapshot.refreshed_at = time.monotonic()
+
+    def _incremental_refresh(self, prefix: str, snapshot: _PrefixSnapshot) -> None:
+        # Se construye un índice nuevo y se publica al final (los lectores no toman el lock)
+        particiones = {particion: dict(objetos) for particion, objetos in snapshot.particiones.items()}
+
+        # Las claves directas (pocas, con Delimiter) se listan completas: así aparecen
+        # también las subcarpetas nuevas y las claves directas sobrescritas o borradas
+        directos, subcarpetas = self._list_root(prefix)
+        particiones[""] = directos
+
+        trabajos = [(particion, max(objetos, default=None)) for particion, objetos in particiones.items() if particion]
+        trabajos += [(subcarpeta, None) for subcarpeta in subcarpetas if subcarpeta not in particiones]
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(trabajos) or 1))) as executor:
+            resultados = list(executor.map(lambda trabajo: self._list_partition(*trabajo), trabajos))
+
+        for (particion, _), objetos in zip(trabajos, resultados):
+            particiones.setdefault(particion, {}).update(objetos)
+
+        snapshot.particiones = particiones
+        snapshot.refreshed_at = time.monotonic()
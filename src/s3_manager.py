@@ -1,8 +1,100 @@
 import boto3
 import streamlit as st
-from botocore.exceptions import NoCredentialsError, ClientError
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, NoCredentialsError, ClientError
+import io
 import os
-from typing import List, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from dataset_manifest import (
+    COMMIT_RETRIES, ConflictoConcurrente, Manifest, confirmar, es_conflicto, esperar_reintento, leer_manifest
+)
+from dataset_rollup import (
+    COLUMNAS_PEDIDO, combinar_resumenes, es_resumen, filtrar_resumen, key_de_resumen, resumir_pedidos
+)
+from dataset_store import (
+    COMPACT_MIN_PARTS, COMPACT_TARGET_MB, DATASET_PREFIX, DATASET_READ_WORKERS, LEGACY_DATASET,
+    LEGACY_PART_EXTENSION, MES_SIN_FECHA, Particion, claves_pedidos, con_claves, dividir_en_particiones,
+    filtrar_rango, key_de_parte, leer_parte, meses_en_rango, normalizar_tipos, particion_de_key, serializar_parte
+)
+from order_schema import memoria_bytes
+from s3_health import S3HealthMonitor
+from s3_listing import ObjectInfo, S3ListingIndex
+from s3_stream import RANGE_SIZE, S3RandomAccessFile, open_text_stream
+from seen_keys import SeenKeysIndex
+from size_cache import SizeBoundedCache
+
+# Conexiones HTTP que el cliente compartido mantiene abiertas para reutilizar
+MAX_POOL_CONNECTIONS = int(os.getenv('S3_MAX_POOL_CONNECTIONS', '32'))
+
+# Segundos que una parte sin confirmar se conserva antes de considerarla huérfana
+ORPHAN_GRACE = 3600
+
+# Intentos de lectura del dataset si una compactación reemplaza partes a la mitad
+LOAD_RETRIES = 3
+
+# Partes a partir de este tamaño se leen por rangos al consultar un rango de fechas
+PARTIAL_READ_MIN = int(os.getenv('DATASET_PARTIAL_READ_MB', '4')) * 1024 * 1024
+
+# Memoria para el CSV anterior ya leído mientras no se migra (compartida por todas las sesiones)
+LEGACY_CACHE_MAX_MB = int(os.getenv('LEGACY_DATASET_CACHE_MB', '256'))
+
+# Cliente boto3 compartido por todas las sesiones de Streamlit del proceso
+_shared_client = None
+_shared_manager = None
+_lock = threading.Lock()
+
+# CSV anterior (pedidos y su resumen diario) por (bucket, key, ETag)
+_legacy_cache = SizeBoundedCache(LEGACY_CACHE_MAX_MB * 1024 * 1024)
+
+
+def _get_shared_client():
+    """
+    Crea (una sola vez por proceso) el cliente S3 con pool de conexiones y keep-alive
+    
+    Los clientes de boto3 son seguros entre hilos, pero su creación no lo es,
+    por eso se protege con un lock.
+    """
+    global _shared_client
+    if _shared_client is None:
+        with _lock:
+            if _shared_client is None:
+                _shared_client = boto3.client(
+                    's3',
+                    aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+                    aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+                    region_name=os.getenv('AWS_DEFAULT_REGION', 'us-west-1'),
+                    # Permite apuntar a un S3 compatible local (MinIO, moto server)
+                    endpoint_url=os.getenv('S3_ENDPOINT_URL') or None,
+                    config=Config(
+                        max_pool_connections=MAX_POOL_CONNECTIONS,
+                        tcp_keepalive=True,
+                        retries={'max_attempts': 3, 'mode': 'standard'}
+                    )
+                )
+    return _shared_client
+
+
+def get_s3_manager() -> "S3Manager":
+    """
+    Devuelve el S3Manager compartido por todo el proceso
+    
+    Returns:
+        Instancia única de S3Manager (se crea en la primera llamada)
+    """
+    global _shared_manager
+    if _shared_manager is None:
+        manager = S3Manager()
+        if not manager.s3_client:
+            # No se guarda un manager sin cliente para reintentar en la siguiente ejecución
+            return manager
+        with _lock:
+            if _shared_manager is None:
+                _shared_manager = manager
+    return _shared_manager
+
 
 class S3Manager:
     """Maneja las operaciones con AWS S3"""
@@ -10,17 +102,41 @@ class S3Manager:
     def __init__(self):
         """Inicializa el cliente S3 con las credenciales de las variables de entorno"""
         try:
-            self.s3_client = boto3.client(
-                's3',
-                aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-                aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-                region_name=os.getenv('AWS_DEFAULT_REGION', 'us-west-1')
-            )
+            self.s3_client = _get_shared_client()
             self.bucket_name = os.getenv('S3_BUCKET_NAME', 'xideralaws-curso-carlos')
         except Exception as e:
             st.error(f"Error al configurar S3: {str(e)}")
             self.s3_client = None
             self.bucket_name = None
+        
+        # Estado de conexión cacheado; se refresca en segundo plano
+        self.health = S3HealthMonitor(self.probe_connection)
+        
+        # Índice en memoria de los listados del bucket
+        self.listing = S3ListingIndex(self.s3_client, self.bucket_name) if self.s3_client else None
+        
+        # Claves de los pedidos ya guardados en el dataset global, por partición
+        self.seen_keys = SeenKeysIndex(self._read_keys)
+        
+        # Commits del dataset rechazados porque otra sesión escribió primero
+        self.commit_conflicts = 0
+    
+    def report_error(self, error: Exception) -> None:
+        """
+        Marca la conexión como caída si el error no es solo un objeto inexistente
+        
+        Para errores de S3 que ocurren fuera del manager, p. ej. al leer un
+        stream de ``open_text``.
+        
+        Args:
+            error: Excepción capturada
+        """
+        if isinstance(error, ClientError):
+            if error.response.get('Error', {}).get('Code') in ('NoSuchKey', '404', 'NotFound'):
+                return
+        elif not isinstance(error, BotoCoreError):
+            return
+        self.health.mark_unhealthy()
     
     def list_files(self, prefix: str = "pedidos/") -> List[Tuple[str, str]]:
         """
@@ -36,28 +152,51 @@ class S3Manager:
             return []
         
         try:
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=prefix
-            )
-            
             files = []
-            if 'Contents' in response:
-                for obj in response['Contents']:
-                    key = obj['Key']
-                    # Solo incluir archivos .txt y evitar directorios
-                    if key.endswith('.txt') and not key.endswith('/'):
-                        filename = key.split('/')[-1]  # Obtener solo el nombre del archivo
-                        files.append((filename, key))
+            for obj in self.listing.list_objects(prefix):
+                key = obj.key
+                # Solo incluir archivos .txt y evitar directorios
+                if key.endswith('.txt') and not key.endswith('/'):
+                    filename = key.split('/')[-1]  # Obtener solo el nombre del archivo
+                    files.append((filename, key))
             
             return sorted(files)
             
         except ClientError as e:
+            self.report_error(e)
             st.error(f"Error al listar archivos de S3: {str(e)}")
             return []
-        except NoCredentialsError:
+        except NoCredentialsError as e:
+            self.report_error(e)
             st.error("Credenciales de AWS no encontradas")
             return []
+        except BotoCoreError as e:
+            self.report_error(e)
+            st.error(f"Error al listar archivos de S3: {str(e)}")
+            return []
+    
+    def list_objects(self, prefix: str) -> List[ObjectInfo]:
+        """
+        Lista todos los objetos bajo un prefijo con sus metadatos
+        
+        Usa el índice en memoria (paginado, sin límite de 1000 claves) y solo
+        consulta S3 cuando el índice venció.
+        
+        Args:
+            prefix: Prefijo a listar
+            
+        Returns:
+            Lista de ObjectInfo (key, size, etag, last_modified) ordenada por key
+        """
+        if not self.s3_client:
+            return []
+        
+        try:
+            return sorted(self.listing.list_objects(prefix))
+        except (ClientError, BotoCoreError) as e:
+            self.report_error(e)
+            st.error(f"Error al listar archivos de S3: {str(e)}")
+            return []
     
     def download_file(self, key: str) -> str:
         """
@@ -78,12 +217,44 @@ class S3Manager:
             return content
             
         except ClientError as e:
+            self.report_error(e)
             st.error(f"Error al descargar archivo de S3: {str(e)}")
             return ""
         except Exception as e:
+            self.report_error(e)
             st.error(f"Error inesperado al descargar archivo: {str(e)}")
             return ""
     
+    def open_text(self, key: str, range_size: int = RANGE_SIZE) -> Optional[io.TextIOWrapper]:
+        """
+        Abre un archivo de S3 como texto en streaming, sin cargarlo completo
+        
+        Los objetos grandes se descargan por rangos y se decodifican en UTF-8
+        de forma incremental, así que la memoria se mantiene plana sin importar
+        el tamaño del chat. Debe cerrarse al terminar (admite ``with``).
+        
+        Args:
+            key: Clave del archivo en S3
+            range_size: Bytes por cada GET por rango
+        
+        Returns:
+            Objeto tipo archivo de texto o None si no se pudo abrir
+        """
+        if not self.s3_client:
+            return None
+        
+        try:
+            return open_text_stream(self.s3_client, self.bucket_name, key, range_size)
+        
+        except ClientError as e:
+            self.report_error(e)
+            st.error(f"Error al descargar archivo de S3: {str(e)}")
+            return None
+        except Exception as e:
+            self.report_error(e)
+            st.error(f"Error inesperado al descargar archivo: {str(e)}")
+            return None
+    
     def upload_file(self, content: str, key: str) -> bool:
         """
         Sube un archivo a S3
@@ -99,18 +270,22 @@ class S3Manager:
             return False
         
         try:
-            self.s3_client.put_object(
+            body = content.encode('utf-8')
+            response = self.s3_client.put_object(
                 Bucket=self.bucket_name,
                 Key=key,
-                Body=content.encode('utf-8'),
+                Body=body,
                 ContentType='text/plain'
             )
+            self.listing.record_put(key, len(body), response.get('ETag', ''))
             return True
             
         except ClientError as e:
+            self.report_error(e)
             st.error(f"Error al subir archivo a S3: {str(e)}")
             return False
         except Exception as e:
+            self.report_error(e)
             st.error(f"Error inesperado al subir archivo: {str(e)}")
             return False
     
@@ -132,15 +307,18 @@ class S3Manager:
             csv_content = df.to_csv(index=False)
             key = f"datasets/{filename}"
             
-            self.s3_client.put_object(
+            body = csv_content.encode('utf-8')
+            response = self.s3_client.put_object(
                 Bucket=self.bucket_name,
                 Key=key,
-                Body=csv_content.encode('utf-8'),
+                Body=body,
                 ContentType='text/csv'
             )
+            self.listing.record_put(key, len(body), response.get('ETag', ''))
             return True
             
         except Exception as e:
+            self.report_error(e)
             st.error(f"Error al guardar dataset en S3: {str(e)}")
             return False
     
@@ -174,15 +352,632 @@ class S3Manager:
                 import pandas as pd
                 return pd.DataFrame()
             else:
+                self.report_error(e)
                 st.error(f"Error al cargar dataset desde S3: {str(e)}")
                 return None
         except Exception as e:
+            self.report_error(e)
             st.error(f"Error inesperado al cargar dataset: {str(e)}")
             return None
     
+    def append_dataset(self, df) -> int:
+        """
+        Agrega un lote de pedidos al dataset global particionado
+        
+        Cada partición (repartidor, mes) del lote se sube como un objeto
+        inmutable nuevo; no se lee ni reescribe lo que ya existe, así que el
+        costo es proporcional al lote y no al historial. Los pedidos que ya
+        estaban guardados (misma clave) se descartan, de modo que volver a
+        ingerir el mismo chat o un rango de fechas que se traslapa no duplica
+        registros. Las particiones con demasiadas partes pequeñas se compactan
+        al terminar.
+        
+        La parte solo cuenta como guardada cuando se confirma en el manifest
+        de la partición con una escritura condicional. Si otra sesión confirmó
+        antes, se relee el manifest, se vuelven a filtrar los pedidos ya
+        guardados y se reintenta; no hace falta un lock global.
+        
+        Args:
+            df: DataFrame con columnas 'repartidor' y 'fecha' (datetime)
+            
+        Returns:
+            Número de pedidos nuevos guardados o -1 si hubo un error
+        """
+        if not self.s3_client:
+            return -1
+        
+        try:
+            nuevos = 0
+            tocadas = []
+            df = df.assign(clave=claves_pedidos(df))
+            for particion, grupo in dividir_en_particiones(df):
+                tocadas.append(particion)
+                nuevos += self._append_partition(particion, grupo)
+            
+            for particion in tocadas:
+                self.compact_partition(particion)
+            return nuevos
+            
+        except Exception as e:
+            self.report_error(e)
+            st.error(f"Error al guardar dataset en S3: {str(e)}")
+            return -1
+    
+    def _append_partition(self, particion: Particion, grupo) -> int:
+        """Escribe y confirma los pedidos nuevos de una partición; devuelve cuántos se guardaron"""
+        claves = grupo["clave"].to_numpy(dtype='uint64')
+        subidas = set()
+        
+        # El lock solo evita carreras entre sesiones del mismo proceso; entre
+        # procesos las resuelve la escritura condicional del manifest
+        with self.seen_keys.lock(particion):
+            for intento in range(COMMIT_RETRIES + 1):
+                manifest = self._read_manifest(particion)
+                pendientes = grupo[self.seen_keys.filtrar_nuevas(particion, list(manifest.partes), claves)]
+                if pendientes.empty:
+                    # Todos los pedidos de la partición ya estaban guardados
+                    return 0
+                
+                body = serializar_parte(pendientes)
+                key = key_de_parte(particion, body)
+                # El resumen diario se calcula solo con los pedidos nuevos y se
+                # confirma junto con la parte, así que nunca se desfasa
+                resumen = serializar_parte(resumir_pedidos(pendientes))
+                if key not in subidas:
+                    self._put_part(key, body)
+                    self._put_part(key_de_resumen(key), resumen)
+                    subidas.add(key)
+                
+                try:
+                    confirmar(self.s3_client, self.bucket_name, particion, manifest,
+                              {**manifest.partes, key: len(body)},
+                              {**manifest.resumenes, key: len(resumen)})
+                except ClientError as e:
+                    if not es_conflicto(e):
+                        raise
+                    self.commit_conflicts += 1
+                    esperar_reintento(intento)
+                    continue
+                
+                self.seen_keys.registrar(particion, key, pendientes["clave"].to_numpy(dtype='uint64'))
+                return len(pendientes)
+        
+        raise ConflictoConcurrente(
+            f"La partición {particion.prefix} cambió {COMMIT_RETRIES + 1} veces seguidas; intenta de nuevo"
+        )
+    
+    def _put_part(self, key: str, body: bytes) -> None:
+        """Sube una parte o un resumen del dataset (aún sin confirmar en el manifest)"""
+        response = self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=key,
+            Body=body,
+            ContentType='application/vnd.apache.parquet'
+        )
+        self.listing.record_put(key, len(body), response.get('ETag', ''))
+    
+    def _read_manifest(self, particion: Particion, listadas: Optional[List[ObjectInfo]] = None) -> Manifest:
+        """
+        Lee la versión confirmada de una partición
+        
+        Las particiones escritas antes de los manifests no tienen uno; para
+        ellas todas las partes que existen cuentan como confirmadas. Se usan
+        ``listadas`` si se pasan, o se listan directamente en S3.
+        """
+        manifest = leer_manifest(self.s3_client, self.bucket_name, particion)
+        if manifest is not None:
+            return manifest
+        
+        if listadas is None:
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            listadas = [
+                ObjectInfo(obj['Key'], obj['Size'], obj['ETag'], obj['LastModified'])
+                for page in paginator.paginate(Bucket=self.bucket_name, Prefix=particion.prefix)
+                for obj in page.get('Contents', [])
+            ]
+        partes = {
+            obj.key: obj.size for obj in listadas
+            if particion_de_key(obj.key) == particion and not es_resumen(obj.key)
+        }
+        return Manifest(0, partes, {}, None)
+    
+    def list_partitions(self) -> Dict[Particion, List[ObjectInfo]]:
+        """
+        Lista las partes del dataset global agrupadas por partición
+        
+        Returns:
+            Diccionario Particion -> partes (ObjectInfo) ordenadas por key
+        """
+        particiones: Dict[Particion, List[ObjectInfo]] = {}
+        for obj in self.list_objects(DATASET_PREFIX):
+            particion = particion_de_key(obj.key)
+            if particion is not None and not es_resumen(obj.key):
+                particiones.setdefault(particion, []).append(obj)
+        return particiones
+    
+    def _read_keys(self, keys: List[str]) -> List:
+        """Lee solo las claves de pedido de varias partes (las calcula si la parte no las trae)"""
+        resultado = []
+        for key, frame in zip(keys, self._read_parts(keys, ['clave'])):
+            if 'clave' not in frame.columns:
+                frame = con_claves(self._read_parts([key])[0])
+            resultado.append(frame['clave'].to_numpy(dtype='uint64'))
+        return resultado
+    
+    def _read_parts(self, keys: List[str], columns: Optional[List[str]] = None, rango=None,
+                    tamanos: Optional[Dict[str, int]] = None) -> List:
+        """
+        Descarga y lee varias partes en paralelo sobre el pool compartido
+        
+        Con un rango de fechas, las partes Parquet grandes (tamaño conocido en
+        ``tamanos``) se leen por rangos: solo el pie y los row groups que
+        tocan esas fechas.
+        """
+        tamanos = tamanos or {}
+        
+        def leer(key):
+            tamano = tamanos.get(key, 0)
+            if rango is not None and tamano > PARTIAL_READ_MIN and not key.endswith(LEGACY_PART_EXTENSION):
+                return leer_parte(S3RandomAccessFile(self.s3_client, self.bucket_name, key, tamano), key, columns, rango)
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
+            return leer_parte(response['Body'].read(), key, columns, rango)
+        
+        if not keys:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(DATASET_READ_WORKERS, len(keys)))) as executor:
+            return list(executor.map(leer, keys))
+    
+    def _select_partitions(self, repartidores: Optional[List[str]] = None,
+                           meses: Optional[List[str]] = None) -> List[Tuple[Particion, List[ObjectInfo]]]:
+        """Particiones (con sus partes listadas) de los repartidores y meses pedidos (None = todos)"""
+        return [
+            (particion, listadas)
+            for particion, listadas in sorted(self.list_partitions().items())
+            if (repartidores is None or particion.repartidor in repartidores)
+            and (meses is None or particion.mes in meses)
+        ]
+    
+    def _read_manifests(self, seleccion: List[Tuple[Particion, List[ObjectInfo]]]) -> List[Manifest]:
+        """Lee en paralelo los manifests de varias particiones"""
+        with ThreadPoolExecutor(max_workers=max(1, min(DATASET_READ_WORKERS, len(seleccion)))) as executor:
+            return list(executor.map(lambda item: self._read_manifest(*item), seleccion))
+    
+    def load_partitions(self, repartidores: Optional[List[str]] = None, meses: Optional[List[str]] = None,
+                        columns: Optional[List[str]] = None, rango=None):
+        """
+        Carga el dataset global particionado
+        
+        Args:
+            repartidores: Solo estos repartidores (None = todos)
+            meses: Solo estos meses en formato 'YYYY-MM' (None = todos)
+            columns: Solo estas columnas (None = todas); con Parquet las demás
+                no se decodifican
+            rango: Tupla (inicio, fin) de Timestamps para quedarse solo con
+                esos pedidos (None = todos)
+            
+        Returns:
+            DataFrame (vacío si no hay partes) o None si no se pudo cargar
+        """
+        if not self.s3_client:
+            return None
+        
+        import pandas as pd
+        
+        try:
+            seleccion = self._select_partitions(repartidores, meses)
+            
+            for intento in range(LOAD_RETRIES):
+                # Solo se leen las partes confirmadas en cada manifest
+                manifests = self._read_manifests(seleccion)
+                tamanos = {key: size for manifest in manifests for key, size in manifest.partes.items()}
+                try:
+                    frames = self._read_parts(sorted(tamanos), columns, rango, tamanos)
+                    break
+                except ClientError as e:
+                    # Una compactación reemplazó partes entre la lectura del manifest y la de las partes
+                    if e.response.get('Error', {}).get('Code') != 'NoSuchKey' or intento == LOAD_RETRIES - 1:
+                        raise
+            
+            if not frames:
+                return pd.DataFrame()
+            if columns is None or 'clave' not in columns:
+                # La clave de pedido es interna; las partes anteriores no la tienen
+                frames = [frame.drop(columns='clave', errors='ignore') for frame in frames]
+            # Al concatenar, categóricas con categorías distintas vuelven a object
+            return normalizar_tipos(pd.concat(frames, ignore_index=True))
+            
+        except Exception as e:
+            self.report_error(e)
+            st.error(f"Error inesperado al cargar dataset: {str(e)}")
+            return None
+    
+    def query_dataset(self, fecha_inicio=None, fecha_fin=None, repartidores: Optional[List[str]] = None,
+                      columns: Optional[List[str]] = None):
+        """
+        Consulta el dataset global filtrando en el almacenamiento
+        
+        Solo se leen las particiones de los repartidores y meses pedidos y,
+        dentro de cada parte, los row groups cuyas fechas tocan el rango; abrir
+        una vista de 30 días no descarga el historial completo. Incluye el CSV
+        anterior si todavía no se migró (ese se lee completo, una vez por
+        versión; ver ``_load_legacy_dataset``).
+        
+        Args:
+            fecha_inicio: Primer instante incluido (None = sin límite)
+            fecha_fin: Último instante incluido (None = sin límite)
+            repartidores: Solo estos repartidores (None = todos)
+            columns: Solo estas columnas (None = todas)
+            
+        Returns:
+            DataFrame (vacío si no hay pedidos) o None si no se pudo cargar
+        """
+        import pandas as pd
+        
+        rango = None
+        meses = None
+        if fecha_inicio is not None or fecha_fin is not None:
+            rango = (
+                pd.Timestamp(fecha_inicio) if fecha_inicio is not None else pd.Timestamp.min,
+                pd.Timestamp(fecha_fin) if fecha_fin is not None else pd.Timestamp.max,
+            )
+            if fecha_inicio is not None and fecha_fin is not None:
+                meses = meses_en_rango(*rango)
+        
+        particionado = self.load_partitions(repartidores, meses, columns, rango)
+        if particionado is None:
+            return None
+        
+        legado = self._legacy_dataset()
+        if legado is None:
+            return particionado
+        
+        cargado = self._load_legacy_dataset(legado)
+        if cargado is None:
+            return None
+        anterior = cargado[0]
+        if not anterior.empty:
+            if rango is not None:
+                anterior = filtrar_rango(anterior, *rango)
+            if repartidores is not None:
+                anterior = anterior[anterior["repartidor"].isin(repartidores)]
+        if columns is not None:
+            anterior = anterior[[columna for columna in columns if columna in anterior.columns]]
+        frames = [frame for frame in (anterior, particionado) if not frame.empty]
+        return normalizar_tipos(pd.concat(frames, ignore_index=True)) if frames else pd.DataFrame()
+    
+    def query_rollup(self, fecha_inicio=None, fecha_fin=None, repartidores: Optional[List[str]] = None):
+        """
+        Consulta el resumen diario (día, repartidor, establecimiento) del dataset global
+        
+        Suma los resúmenes que se guardaron al ingerir cada parte, así que un
+        período de cualquier tamaño se responde con unos cientos de renglones
+        en lugar de leer todos los pedidos. Las partes anteriores a los
+        resúmenes y el CSV anterior (si no se migró) se resumen al vuelo.
+        
+        El resumen es por día: el rango incluye completos los días de
+        ``fecha_inicio`` a ``fecha_fin``.
+        
+        Args:
+            fecha_inicio: Primer día incluido (None = sin límite)
+            fecha_fin: Último instante incluido (None = sin límite)
+            repartidores: Solo estos repartidores (None = todos)
+            
+        Returns:
+            DataFrame con columnas fecha, repartidor, establecimiento, envios
+            (número de pedidos) e ingresos (suma de costo_envio), o None si no
+            se pudo cargar
+        """
+        if not self.s3_client:
+            return None
+        
+        import pandas as pd
+        
+        try:
+            inicio = pd.Timestamp(fecha_inicio).normalize() if fecha_inicio is not None else None
+            fin = pd.Timestamp(fecha_fin) if fecha_fin is not None else None
+            rango = None
+            meses = None
+            if inicio is not None or fin is not None:
+                rango = (inicio if inicio is not None else pd.Timestamp.min,
+                         fin if fin is not None else pd.Timestamp.max)
+                if inicio is not None and fin is not None:
+                    meses = meses_en_rango(inicio, fin)
+            seleccion = self._select_partitions(repartidores, meses)
+            
+            for intento in range(LOAD_RETRIES):
+                manifests = self._read_manifests(seleccion)
+                tamanos = {key: size for manifest in manifests for key, size in manifest.partes.items()}
+                con_resumen = sorted(
+                    key_de_resumen(key) for manifest in manifests for key in manifest.partes if key in manifest.resumenes
+                )
+                sin_resumen = sorted(
+                    key for manifest in manifests for key in manifest.partes if key not in manifest.resumenes
+                )
+                try:
+                    frames = self._read_parts(con_resumen)
+                    pedidos = self._read_parts(sin_resumen, COLUMNAS_PEDIDO, rango, tamanos)
+                    frames += [resumir_pedidos(frame) for frame in pedidos]
+                    break
+                except ClientError as e:
+                    # Una compactación reemplazó partes entre la lectura del manifest y la de las partes
+                    if e.response.get('Error', {}).get('Code') != 'NoSuchKey' or intento == LOAD_RETRIES - 1:
+                        raise
+            
+            legado = self._legacy_dataset()
+            if legado is not None:
+                cargado = self._load_legacy_dataset(legado)
+                if cargado is None:
+                    return None
+                resumen_anterior = cargado[1]
+                if repartidores is not None:
+                    resumen_anterior = resumen_anterior[resumen_anterior["repartidor"].isin(repartidores)]
+                frames.append(resumen_anterior)
+            
+            return combinar_resumenes([filtrar_resumen(frame, inicio, fin) for frame in frames])
+            
+        except Exception as e:
+            self.report_error(e)
+            st.error(f"Error inesperado al cargar resumen del dataset: {str(e)}")
+            return None
+    
+    def _legacy_dataset(self) -> Optional[ObjectInfo]:
+        """El CSV monolítico anterior si todavía existe (sin migrar), según el listado en memoria"""
+        key = f"datasets/{LEGACY_DATASET}"
+        return next((obj for obj in self.list_objects("datasets/") if obj.key == key), None)
+    
+    def _load_legacy_dataset(self, legado: ObjectInfo):
+        """
+        Lee el CSV anterior una sola vez por versión, con su resumen diario
+        
+        Mientras no se corre ``migrar_dataset.py`` cada rerun del dashboard
+        global lo necesita para los filtros, las consultas y los KPIs. Se
+        guarda ya tipado, compartido por todas las sesiones, con el ETag del
+        mismo GET que lo descargó: si el CSV se reemplaza se vuelve a leer.
+        
+        Args:
+            legado: Objeto del CSV en el listado
+            
+        Returns:
+            Tupla (pedidos, resumen diario) de solo lectura, o None si no se pudo leer
+        """
+        import pandas as pd
+        
+        resultado = _legacy_cache.get((self.bucket_name, legado.key, legado.etag))
+        if resultado is not None:
+            return resultado
+        
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=legado.key)
+            anterior = pd.read_csv(io.StringIO(response['Body'].read().decode('utf-8')))
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'NoSuchKey':
+                # Se migró entre el listado y la lectura
+                return pd.DataFrame(), resumir_pedidos(pd.DataFrame())
+            self.report_error(e)
+            st.error(f"Error al cargar dataset desde S3: {str(e)}")
+            return None
+        except Exception as e:
+            self.report_error(e)
+            st.error(f"Error inesperado al cargar dataset: {str(e)}")
+            return None
+        
+        if not anterior.empty:
+            anterior = normalizar_tipos(anterior)
+        resultado = (anterior, resumir_pedidos(anterior))
+        _legacy_cache.put((self.bucket_name, legado.key, response.get('ETag')), resultado,
+                          memoria_bytes(anterior) + memoria_bytes(resultado[1]))
+        return resultado
+    
+    def load_global_dataset(self, columns: Optional[List[str]] = None):
+        """
+        Carga el dataset global completo: partes particionadas más el CSV anterior si existe
+        
+        Args:
+            columns: Solo estas columnas (None = todas)
+            
+        Returns:
+            DataFrame o None si no se pudo cargar
+        """
+        return self.query_dataset(columns=columns)
+    
+    def dataset_overview(self) -> Dict:
+        """
+        Resumen del dataset global sin descargar pedidos, a partir de las particiones
+        
+        Returns:
+            Diccionario con 'repartidores' y 'meses' (ordenados, sin 'sin-fecha'),
+            'partes' y 'bytes'
+        """
+        particiones = self.list_partitions()
+        resumen = {
+            'repartidores': sorted({particion.repartidor for particion in particiones}),
+            'meses': sorted({particion.mes for particion in particiones} - {MES_SIN_FECHA}),
+            'partes': sum(len(partes) for partes in particiones.values()),
+            'bytes': sum(obj.size for partes in particiones.values() for obj in partes),
+        }
+        
+        legado = self._legacy_dataset()
+        if legado is not None:
+            # El CSV anterior no está particionado: sus repartidores y meses salen de su resumen diario
+            cargado = self._load_legacy_dataset(legado)
+            if cargado is not None and not cargado[1].empty:
+                dias = cargado[1]
+                resumen['repartidores'] = sorted(set(resumen['repartidores']) | set(dias["repartidor"].dropna()))
+                meses = dias["fecha"].dropna().dt.strftime("%Y-%m")
+                resumen['meses'] = sorted(set(resumen['meses']) | set(meses))
+        return resumen
+    
+    def compact_partition(self, particion: Particion, min_parts: int = COMPACT_MIN_PARTS) -> bool:
+        """
+        Une las partes pequeñas de una partición en una sola
+        
+        La parte compactada y su resumen diario se escriben primero y se
+        confirman en el manifest reemplazando a las originales con una
+        escritura condicional; solo después se borran las originales y sus
+        resúmenes. Si otra sesión confirmó cambios a la vez, se reintenta
+        sobre la nueva versión. Las partes CSV de versiones anteriores y las
+        que todavía no tienen resumen siempre se reescriben, y las partes
+        huérfanas (subidas pero nunca confirmadas) se borran tras ORPHAN_GRACE
+        segundos.
+        
+        Args:
+            particion: Partición a compactar
+            min_parts: Mínimo de partes pequeñas para que valga la pena compactar
+            
+        Returns:
+            True si se compactó, False si no hacía falta o hubo un error
+        """
+        if not self.s3_client:
+            return False
+        
+        import pandas as pd
+        
+        try:
+            limite = COMPACT_TARGET_MB * 1024 * 1024
+            for intento in range(COMMIT_RETRIES + 1):
+                manifest = self._read_manifest(particion)
+                pequenas = sorted(key for key, size in manifest.partes.items() if size < limite)
+                hay_csv = any(key.endswith(LEGACY_PART_EXTENSION) for key in pequenas)
+                sin_resumen = any(key not in manifest.resumenes for key in pequenas)
+                if len(pequenas) < max(min_parts, 2) and not hay_csv and not sin_resumen:
+                    return False
+                
+                frames = [con_claves(frame) for frame in self._read_parts(pequenas)]
+                df = pd.concat(frames, ignore_index=True).drop_duplicates(subset='clave')
+                body = serializar_parte(df)
+                key = key_de_parte(particion, body)
+                resumen = serializar_parte(resumir_pedidos(df))
+                self._put_part(key, body)
+                self._put_part(key_de_resumen(key), resumen)
+                
+                partes = {k: size for k, size in manifest.partes.items() if k not in pequenas}
+                partes[key] = len(body)
+                resumenes = {k: size for k, size in manifest.resumenes.items() if k in partes}
+                resumenes[key] = len(resumen)
+                try:
+                    confirmar(self.s3_client, self.bucket_name, particion, manifest, partes, resumenes)
+                except ClientError as e:
+                    if not es_conflicto(e):
+                        raise
+                    self.commit_conflicts += 1
+                    esperar_reintento(intento)
+                    continue
+                
+                # Originales ya reemplazadas (con sus resúmenes) y huérfanas antiguas
+                reemplazadas = [k for k in pequenas if k != key]
+                reemplazadas += [key_de_resumen(k) for k in reemplazadas if k in manifest.resumenes]
+                vigentes = set(partes) | {key_de_resumen(k) for k in resumenes}
+                antiguedad = datetime.now(timezone.utc) - timedelta(seconds=ORPHAN_GRACE)
+                huerfanas = [
+                    obj.key for obj in self.listing.list_objects(particion.prefix)
+                    if particion_de_key(obj.key) == particion and obj.key not in vigentes
+                    and obj.key not in reemplazadas and obj.last_modified < antiguedad
+                ]
+                borrar = reemplazadas + huerfanas
+                for inicio in range(0, len(borrar), 1000):
+                    self.s3_client.delete_objects(
+                        Bucket=self.bucket_name,
+                        Delete={'Objects': [{'Key': k} for k in borrar[inicio:inicio + 1000]], 'Quiet': True}
+                    )
+                self.listing.record_delete(borrar)
+                self.seen_keys.reemplazar_partes(particion, [k for k in pequenas if k != key], key)
+                return True
+            
+            # La partición está muy activa; se compactará en una escritura posterior
+            return False
+            
+        except Exception as e:
+            self.report_error(e)
+            st.error(f"Error al compactar dataset en S3: {str(e)}")
+            return False
+    
+    def compact_dataset(self, min_parts: int = COMPACT_MIN_PARTS) -> int:
+        """
+        Compacta todas las particiones del dataset global
+        
+        Args:
+            min_parts: Mínimo de partes pequeñas para compactar una partición
+            
+        Returns:
+            Número de particiones compactadas
+        """
+        return sum(self.compact_partition(particion, min_parts) for particion in self.list_partitions())
+    
+    def migrate_legacy_dataset(self) -> Dict[str, int]:
+        """
+        Migra una sola vez el dataset CSV anterior al formato particionado en Parquet
+        
+        El CSV se reparte en particiones Parquet tipadas, se archiva en
+        ``datasets/legacy/`` y se quita de ``datasets/``. Después se reescriben
+        en Parquet las partes CSV que queden en las particiones y las que no
+        tienen resumen diario. Es seguro volver a ejecutarla.
+        
+        Los renglones idénticos del CSV se guardan una sola vez: el dashboard
+        anterior volvía a agregar el lote completo en cada análisis, así que
+        casi todas las repeticiones son copias (la clave de pedido distingue
+        pedidos iguales por su ordinal y las conservaría para siempre). Dos
+        pedidos legítimos idénticos del mismo día también quedan en uno.
+        
+        Returns:
+            Diccionario con registros migrados, duplicados descartados y
+            particiones reescritas, o vacío si hubo un error
+        """
+        if not self.s3_client:
+            return {}
+        
+        resumen = {'registros_migrados': 0, 'duplicados_descartados': 0, 'particiones_reescritas': 0}
+        key = f"datasets/{LEGACY_DATASET}"
+        
+        try:
+            if any(obj.key == key for obj in self.list_objects("datasets/")):
+                anterior = self.load_dataset(LEGACY_DATASET)
+                if anterior is None:
+                    return {}
+                if not anterior.empty:
+                    anterior = normalizar_tipos(anterior)
+                    unicos = anterior.drop_duplicates(ignore_index=True)
+                    resumen['duplicados_descartados'] = len(anterior) - len(unicos)
+                    migrados = self.append_dataset(unicos)
+                    if migrados < 0:
+                        return {}
+                    resumen['registros_migrados'] = migrados
+        
+                archivo = f"datasets/legacy/{LEGACY_DATASET}"
+                self.s3_client.copy_object(
+                    Bucket=self.bucket_name,
+                    Key=archivo,
+                    CopySource={'Bucket': self.bucket_name, 'Key': key}
+                )
+                self.s3_client.delete_object(Bucket=self.bucket_name, Key=key)
+                self.listing.invalidate()
+                _legacy_cache.clear()
+        
+            resumen['particiones_reescritas'] = self.compact_dataset(min_parts=1)
+            return resumen
+        
+        except Exception as e:
+            self.report_error(e)
+            st.error(f"Error al migrar dataset en S3: {str(e)}")
+            return {}
+    
     def test_connection(self) -> bool:
         """
-        Prueba la conexión con S3
+        Devuelve el estado de conexión con S3 sin esperar a la red
+        
+        El chequeo real (head_bucket) se hace como mucho una vez cada
+        S3_HEALTH_TTL segundos, en segundo plano, para todas las sesiones.
+        
+        Returns:
+            True si la conexión es exitosa, False en caso contrario
+        """
+        if not self.s3_client:
+            return False
+        
+        return self.health.is_healthy()
+    
+    def probe_connection(self) -> bool:
+        """
+        Prueba la conexión con S3 con una petición real
         
         Returns:
             True si la conexión es exitosa, False en caso contrario
@@ -193,7 +988,5 @@ class S3Manager:
         try:
             self.s3_client.head_bucket(Bucket=self.bucket_name)
             return True
-        except ClientError:
-            return False
-        except NoCredentialsError:
+        except (ClientError, BotoCoreError):
             return False
@@ -0,0 +1,188 @@
+import io
+import os
+import re
+from typing import Optional
+
+from botocore.exceptions import ClientError
+
+# Tamaño de cada GET por rango; la memoria usada no depende del tamaño del objeto
+RANGE_SIZE = int(os.getenv('S3_RANGE_SIZE_MB', '8')) * 1024 * 1024
+
+# Buffer de lectura (bytes) entre la red y el decodificador UTF-8 incremental
+READ_BUFFER = 256 * 1024
+
+RE_CONTENT_RANGE = re.compile(r"bytes \d+-\d+/(\d+)")
+
+
+class S3RangeReader(io.RawIOBase):
+    """
+    Lector binario de un objeto S3 que lo descarga por rangos consecutivos
+
+    Cada rango se pide con ``IfMatch`` sobre el ETag del primero, de modo que
+    si el objeto cambia a mitad de la lectura falla en lugar de mezclar
+    versiones.
+    """
+
+    def __init__(self, s3_client, bucket_name: str, key: str, range_size: int = RANGE_SIZE):
+        super().__init__()
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.key = key
+        self.range_size = range_size
+        self.etag: Optional[str] = None
+        self.size: Optional[int] = None
+        self._pos = 0
+        self._body = None
+        # El primer rango se pide al abrir para que los errores (p. ej. NoSuchKey) salgan aquí
+        self._open_range()
+
+    def _open_range(self) -> None:
+        params = {
+            'Bucket': self.bucket_name,
+            'Key': self.key,
+            'Range': f"bytes={self._pos}-{self._pos + self.range_size - 1}",
+        }
+        if self.etag:
+            params['IfMatch'] = self.etag
+
+        try:
+            response = self.s3_client.get_object(**params)
+        except ClientError as e:
+            # Un objeto vacío no admite rangos
+            if self._pos == 0 and e.response.get('Error', {}).get('Code') == 'InvalidRange':
+                self.size = 0
+                self._body = None
+                return
+            raise
+
+        if self.etag is None:
+            self.etag = response.get('ETag')
+            match = RE_CONTENT_RANGE.match(response.get('ContentRange', ''))
+            self.size = int(match.group(1)) if match else response.get('ContentLength', 0)
+        self._body = response['Body']
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while True:
+            if self._body is None:
+                if self.size is not None and self._pos >= self.size:
+                    return 0
+                self._open_range()
+                if self._body is None:
+                    return 0
+
+            data = self._body.read(len(buffer))
+            if data:
+                buffer[:len(data)] = data
+                self._pos += len(data)
+                return len(data)
+
+            # Rango agotado: pasar al siguiente
+            self._body.close()
+            self._body = None
+            if self.size is None or self._pos >= self.size:
+                return 0
+
+    def close(self) -> None:
+        if self._body is not None:
+            self._body.close()
+            self._body = None
+        super().close()
+
+
+class S3RandomAccessFile(io.RawIOBase):
+    """
+    Archivo binario de solo lectura sobre un objeto S3 con acceso aleatorio
+
+    Cada ``read`` es un GET por rango de exactamente los bytes pedidos, así
+    que un lector columnar (Parquet) descarga solo el pie de página y los
+    bloques que necesita. Pensado para objetos inmutables de tamaño conocido.
+    """
+
+    def __init__(self, s3_client, bucket_name: str, key: str, size: int):
+        super().__init__()
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.key = key
+        self.size = size
+        self._pos = 0
+        self.requests = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = self.size + offset
+        self._pos = max(0, min(self._pos, self.size))
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        fin = self.size if size is None or size < 0 else min(self._pos + size, self.size)
+        if fin <= self._pos:
+            return b""
+        response = self.s3_client.get_object(
+            Bucket=self.bucket_name,
+            Key=self.key,
+            Range=f"bytes={self._pos}-{fin - 1}"
+        )
+        self.requests += 1
+        data = response['Body'].read()
+        self._pos += len(data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def open_text_stream(s3_client, bucket_name: str, key: str, range_size: int = RANGE_SIZE) -> io.TextIOWrapper:
+    """
+    Abre un objeto S3 como archivo de texto UTF-8 que se lee en streaming
+
+    El texto se decodifica de forma incremental con buffers acotados, así que
+    se puede pasar directamente al parser del chat o recorrer por líneas. Los
+    saltos de línea se entregan tal cual (también "\r\n"), igual que al
+    leer un chat subido como archivo.
+
+    Args:
+        s3_client: Cliente boto3 de S3
+        bucket_name: Bucket del objeto
+        key: Clave del objeto
+        range_size: Bytes por cada GET por rango
+
+    Returns:
+        Objeto tipo archivo de texto (admite ``read(n)`` e iteración por líneas)
+    """
+    raw = S3RangeReader(s3_client, bucket_name, key, range_size)
+    # Sin traducir "\r\n" y cortando líneas solo en "\n", como el io.StringIO de la carga local
+    return io.TextIOWrapper(io.BufferedReader(raw, buffer_size=READ_BUFFER), encoding='utf-8', newline='\n')
+
+
+def stream_etag(archivo: io.TextIOWrapper) -> Optional[str]:
+    """
+    ETag del objeto que se está leyendo con un stream de ``open_text_stream``
+
+    Es el que devolvió el primer GET por rango; los rangos siguientes se piden
+    con ``IfMatch`` sobre él, así que identifica exactamente el contenido leído.
+
+    Args:
+        archivo: Objeto devuelto por ``open_text_stream``
+
+    Returns:
+        ETag o None si el objeto está vacío
+    """
+    return archivo.buffer.raw.etag
@@ -0,0 +1,88 @@
+import threading
+from typing import Callable, Dict, Hashable, List
+
+import numpy as np
+
+
+class _ClavesParticion:
+    """Claves ya ingeridas de una partición y las partes de las que salieron"""
+
+    def __init__(self):
+        self.partes: set = set()
+        self.claves = np.empty(0, dtype=np.uint64)
+        self.lock = threading.RLock()
+
+
+class SeenKeysIndex:
+    """
+    Índice en memoria de las claves de pedido ya guardadas, por partición
+
+    Cada partición guarda sus claves en un arreglo uint64 ordenado (8 bytes
+    por pedido). Para saber qué pedidos de un lote son nuevos se busca cada
+    clave con búsqueda binaria, así que el costo depende del lote y no del
+    historial. Solo se leen las claves de las partes que el índice todavía no
+    conoce (por ejemplo, las escritas por otro proceso).
+    """
+
+    def __init__(self, cargar_claves: Callable[[List[str]], List[np.ndarray]]):
+        """
+        Args:
+            cargar_claves: Función que recibe claves de partes en S3 y devuelve
+                las claves de pedido de cada una
+        """
+        self._cargar_claves = cargar_claves
+        self._particiones: Dict[Hashable, _ClavesParticion] = {}
+        self._lock = threading.Lock()
+
+    def _entrada(self, particion: Hashable) -> _ClavesParticion:
+        with self._lock:
+            return self._particiones.setdefault(particion, _ClavesParticion())
+
+    def lock(self, particion: Hashable) -> threading.RLock:
+        """Lock de la partición, para filtrar y escribir un lote sin carreras dentro del proceso"""
+        return self._entrada(particion).lock
+
+    def _sincronizar(self, entrada: _ClavesParticion, partes: List[str]) -> None:
+        faltantes = [parte for parte in partes if parte not in entrada.partes]
+        if faltantes:
+            nuevas = self._cargar_claves(faltantes)
+            entrada.claves = np.union1d(entrada.claves, np.concatenate([entrada.claves[:0], *nuevas]))
+        # Las partes que ya no existen (compactadas) se olvidan; sus claves siguen en otra parte
+        entrada.partes = set(partes)
+
+    def filtrar_nuevas(self, particion: Hashable, partes: List[str], claves: np.ndarray) -> np.ndarray:
+        """
+        Indica qué claves de un lote todavía no están guardadas
+
+        Args:
+            particion: Partición del lote
+            partes: Partes que existen hoy en la partición
+            claves: Claves uint64 de los pedidos del lote
+
+        Returns:
+            Máscara booleana (True = pedido nuevo)
+        """
+        entrada = self._entrada(particion)
+        with entrada.lock:
+            self._sincronizar(entrada, partes)
+            conocidas = entrada.claves
+            if not len(conocidas):
+                return np.ones(len(claves), dtype=bool)
+            posiciones = np.searchsorted(conocidas, claves)
+            encontradas = conocidas[np.minimum(posiciones, len(conocidas) - 1)] == claves
+            return ~encontradas
+
+    def registrar(self, particion: Hashable, parte: str, claves: np.ndarray) -> None:
+        """Agrega al índice las claves de una parte recién escrita"""
+        entrada = self._entrada(particion)
+        with entrada.lock:
+            entrada.claves = np.union1d(entrada.claves, claves.astype(np.uint64))
+            entrada.partes.add(parte)
+
+    def reemplazar_partes(self, particion: Hashable, viejas: List[str], nueva: str) -> None:
+        """Registra una compactación: las claves no cambian, solo las partes que las contienen"""
+        entrada = self._entrada(particion)
+        with entrada.lock:
+            if entrada.partes.issuperset(viejas):
+                entrada.partes.difference_update(viejas)
+                entrada.partes.add(nueva)
@@ -0,0 +1,70 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class SizeBoundedCache:
+    """Cache LRU compartida entre hilos con límite por tamaño total en bytes"""
+
+    def __init__(self, max_bytes: int):
+        """
+        Args:
+            max_bytes: Tamaño máximo (aproximado) que pueden ocupar las entradas
+        """
+        self.max_bytes = max_bytes
+        self._entradas: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, clave: Hashable) -> Optional[Any]:
+        """Devuelve el valor guardado (y lo marca como usado recientemente) o None"""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.hits += 1
+            return entrada[0]
+
+    def put(self, clave: Hashable, valor: Any, tamano: int) -> None:
+        """
+        Guarda un valor y expulsa los menos usados hasta respetar el límite
+
+        Los valores más grandes que el límite completo no se guardan.
+        """
+        if tamano > self.max_bytes:
+            return
+
+        with self._lock:
+            anterior = self._entradas.pop(clave, None)
+            if anterior is not None:
+                self._bytes -= anterior[1]
+
+            self._entradas[clave] = (valor, tamano)
+            self._bytes += tamano
+
+            while self._bytes > self.max_bytes:
+                _, (_, tamano_expulsado) = self._entradas.popitem(last=False)
+                self._bytes -= tamano_expulsado
+
+    def discard(self, clave: Hashable) -> None:
+        """Elimina una entrada si existe"""
+        with self._lock:
+            entrada = self._entradas.pop(clave, None)
+            if entrada is not None:
+                self._bytes -= entrada[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
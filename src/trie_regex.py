@@ -0,0 +1,43 @@
+import re
+from typing import Dict, Iterable
+
+
+def build_trie_pattern(palabras: Iterable[str]) -> str:
+    """
+    Construye una expresión regular equivalente a un árbol de prefijos (trie)
+
+    A diferencia de una alternación plana ``a|b|c``, el motor solo recorre las
+    ramas que comparten prefijo con el texto, así que cada intento cuesta como
+    mucho la longitud de la palabra más larga. Si varias palabras coinciden en
+    la misma posición, gana la más larga.
+
+    Args:
+        palabras: Palabras literales a reconocer (las vacías se ignoran)
+
+    Returns:
+        Patrón de regex (sin compilar) que reconoce cualquiera de las palabras
+    """
+    trie: Dict = {}
+    for palabra in palabras:
+        if not palabra:
+            continue
+        nodo = trie
+        for caracter in palabra:
+            nodo = nodo.setdefault(caracter, {})
+        nodo[""] = {}  # Marca de fin de palabra
+
+    return _nodo_a_patron(trie) if trie else r"(?!)"
+
+
+def _nodo_a_patron(nodo: Dict) -> str:
+    terminal = "" in nodo
+    ramas = [re.escape(caracter) + _nodo_a_patron(hijo) for caracter, hijo in nodo.items() if caracter]
+
+    if not ramas:
+        return ""
+
+    patron = ramas[0] if len(ramas) == 1 else "(?:" + "|".join(ramas) + ")"
+    if terminal:
+        # Rama opcional y codiciosa: se prefiere la palabra más larga
+        patron = "(?:" + patron + ")?"
+    return patron
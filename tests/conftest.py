@@ -0,0 +1,34 @@
+import os
+import sys
+
+import boto3
+import pytest
+from moto import mock_aws
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+BUCKET = "yupii-test"
+
+
+@pytest.fixture
+def s3_client(monkeypatch):
+    """Cliente S3 contra un bucket simulado con moto (sin red)"""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("S3_BUCKET_NAME", BUCKET)
+    monkeypatch.delenv("S3_ENDPOINT_URL", raising=False)
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+@pytest.fixture
+def manager(s3_client, monkeypatch):
+    """S3Manager sobre el bucket simulado, sin esperas entre reintentos"""
+    import s3_manager
+
+    monkeypatch.setattr(s3_manager, "_shared_client", None)
+    monkeypatch.setattr(s3_manager, "esperar_reintento", lambda intento: None)
+    return s3_manager.S3Manager()
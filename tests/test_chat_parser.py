@@ -0,0 +1,89 @@
+import io
+import os
+import random
+import re
+
+import pandas as pd
+import pytest
+
+from chat_parser import MARCADOR_PEDIDO, extraer_chat, extraer_pedidos_df, iter_bloques, iter_pedidos, parse_bloque
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "chat_pedidos.txt")
+
+
+def parse_original(pedido):
+    """Extracción por regex de la versión original de main_dashboard.py (sin filtrar ni normalizar)"""
+    est_match = re.search(r"📍(.*?)(?:\n|$)", pedido)
+    establecimiento = est_match.group(1).strip() if est_match else "-"
+    prod_match = re.search(r"_\*Pedido\*_\n(.+?)_\*Entregar en\*_", pedido, re.S)
+    producto = prod_match.group(1).strip().replace("▪️", "").replace("◼️", "") if prod_match else "-"
+    costo_match = re.search(r"_\*Cobrar\*_\s*\n*\s*\$(\d+)", pedido)
+    costo = int(costo_match.group(1)) if costo_match else 0
+    fecha_match = re.search(r"\[(\d{2}/\d{2}/\d{2}),", pedido)
+    fecha = fecha_match.group(1) if fecha_match else None
+    return fecha, establecimiento, producto, costo
+
+
+def chat_aleatorio(pedidos, seed):
+    """Chat con marcadores faltantes, espacios raros y productos de varias líneas"""
+    rnd = random.Random(seed)
+    partes = ["[01/01/25, 09:00:00] Yupii: Inicio\n"]
+    for i in range(pedidos):
+        partes.append(f"[{rnd.randint(1, 28):02d}/{rnd.randint(1, 12):02d}/25, 1{rnd.randint(0, 9)}:00:00] Yupii: ")
+        partes.append(MARCADOR_PEDIDO + "\n")
+        if rnd.random() < 0.9:
+            partes.append(rnd.choice(["📍Tacomarin\n", "📍  KFC  \n", "📍\n", "📍Pizza Hut"]))
+        if rnd.random() < 0.9:
+            partes.append("_*Pedido*_\n" + rnd.choice(["▪️Tacos\n", "Combo #1\ncon papas\n", "", "◼️Agua"]))
+        if rnd.random() < 0.8:
+            partes.append(f"_*Entregar en*_\nCalle {i}\n")
+        if rnd.random() < 0.9:
+            partes.append("_*Cobrar*_" + rnd.choice(["\n", " ", "\n  \n ", ""]) + rnd.choice(["$40\n", "$ 40\n", "cuarenta\n"]))
+    return "".join(partes)
+
+
+def textos():
+    with open(FIXTURE, encoding="utf-8") as archivo:
+        yield archivo.read()
+    for seed in range(5):
+        yield chat_aleatorio(200, seed)
+
+
+@pytest.mark.parametrize("texto", list(textos()))
+def test_parse_bloque_igual_al_regex_original(texto):
+    bloques = texto.split(MARCADOR_PEDIDO)[1:]
+    assert bloques
+    for bloque in bloques:
+        assert tuple(parse_bloque(bloque))[:4] == parse_original(bloque), bloque
+
+
+@pytest.mark.parametrize("texto", list(textos()))
+def test_lectura_en_streaming_igual_al_original(texto):
+    esperado = [parse_original(bloque) for bloque in texto.split(MARCADOR_PEDIDO)[1:]]
+
+    assert [tuple(pedido)[:4] for pedido in iter_pedidos(io.StringIO(texto))] == esperado
+    # Marcadores partidos entre lecturas de 7 caracteres
+    bloques = iter_bloques(io.StringIO(texto), tamano_lectura=7)
+    assert [tuple(parse_bloque(bloque))[:4] for bloque in bloques] == esperado
+
+
+@pytest.mark.parametrize("texto", list(textos()))
+def test_extraccion_por_lotes_igual_al_original(texto):
+    esperado = [parse_original(bloque) for bloque in texto.split(MARCADOR_PEDIDO)[1:]]
+
+    pedidos = extraer_pedidos_df(io.StringIO(texto))
+
+    original = pd.DataFrame(esperado, columns=["fecha", "establecimiento", "producto", "costo_envio"])
+    original["fecha"] = pd.to_datetime(original["fecha"], format="%d/%m/%y", errors="coerce")
+    pd.testing.assert_frame_equal(pedidos[list(original.columns)], original)
+
+
+def test_fixture_pedidos_y_bonos_en_una_lectura():
+    with open(FIXTURE, encoding="utf-8") as archivo:
+        pedidos, bonos = extraer_chat(archivo)
+
+    assert len(pedidos) == 8
+    assert pedidos["costo_envio"].tolist() == [40, 55, 35, 0, 0, 60, 45, 50]
+    assert pedidos.loc[1, "establecimiento"] == "Mc Donald's"
+    assert pedidos.loc[0, "producto"] == "2 tacos de pastor con todo\n1 agua de jamaica"
+    assert bonos["monto"].tolist() == [20]
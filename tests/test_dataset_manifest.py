@@ -0,0 +1,113 @@
+import pandas as pd
+import pytest
+from botocore.exceptions import ClientError
+
+import s3_manager as s3_manager_modulo
+from conftest import BUCKET
+from dataset_manifest import ConflictoConcurrente, Manifest, confirmar, es_conflicto, leer_manifest
+from dataset_store import Particion, claves_pedidos
+
+PARTICION = Particion("Ana", "2025-01")
+
+
+def pedidos(*productos):
+    return pd.DataFrame({
+        "fecha": pd.to_datetime(["2025-01-02"] * len(productos)),
+        "establecimiento": ["Tacomarin"] * len(productos),
+        "producto": list(productos),
+        "costo_envio": [40] * len(productos),
+        "repartidor": ["Ana"] * len(productos),
+    })
+
+
+def test_confirmar_crea_el_manifest_y_rechaza_otra_creacion(s3_client):
+    vacio = Manifest(0, {}, {}, None)
+    publicado = confirmar(s3_client, BUCKET, PARTICION, vacio, {"a.parquet": 10})
+
+    assert publicado.version == 1
+    assert leer_manifest(s3_client, BUCKET, PARTICION).partes == {"a.parquet": 10}
+
+    # Otro proceso que también partió de "no existe" no puede sobrescribirlo
+    with pytest.raises(ClientError) as error:
+        confirmar(s3_client, BUCKET, PARTICION, vacio, {"b.parquet": 20})
+    assert es_conflicto(error.value)
+    assert leer_manifest(s3_client, BUCKET, PARTICION).partes == {"a.parquet": 10}
+
+
+def test_confirmar_con_etag_obsoleto_falla_y_el_reintento_conserva_ambas_partes(s3_client):
+    confirmar(s3_client, BUCKET, PARTICION, Manifest(0, {}, {}, None), {"a.parquet": 10})
+    base = leer_manifest(s3_client, BUCKET, PARTICION)
+
+    # Otro proceso confirma primero sobre la misma base
+    confirmar(s3_client, BUCKET, PARTICION, base, {**base.partes, "b.parquet": 20})
+    with pytest.raises(ClientError) as error:
+        confirmar(s3_client, BUCKET, PARTICION, base, {**base.partes, "c.parquet": 30})
+    assert es_conflicto(error.value)
+
+    # Releer y reintentar
+    actual = leer_manifest(s3_client, BUCKET, PARTICION)
+    publicado = confirmar(s3_client, BUCKET, PARTICION, actual, {**actual.partes, "c.parquet": 30})
+
+    assert publicado.version == 3
+    assert leer_manifest(s3_client, BUCKET, PARTICION).partes == {"a.parquet": 10, "b.parquet": 20, "c.parquet": 30}
+
+
+def test_confirmar_conserva_resumenes_de_las_partes_que_siguen(s3_client):
+    base = confirmar(s3_client, BUCKET, PARTICION, Manifest(0, {}, {}, None),
+                     {"a.parquet": 10, "b.parquet": 20}, {"a.parquet": 1, "b.parquet": 2})
+    publicado = confirmar(s3_client, BUCKET, PARTICION, base, {"b.parquet": 20})
+    assert publicado.resumenes == {"b.parquet": 2}
+
+
+def test_es_conflicto_solo_con_escrituras_condicionales_rechazadas():
+    def error(codigo):
+        return ClientError({"Error": {"Code": codigo}}, "PutObject")
+
+    assert es_conflicto(error("PreconditionFailed"))
+    assert es_conflicto(error("ConditionalRequestConflict"))
+    assert not es_conflicto(error("AccessDenied"))
+    assert not es_conflicto(ValueError("PreconditionFailed"))
+
+
+def test_append_partition_reintenta_si_otra_sesion_confirma_primero(manager, monkeypatch):
+    # La partición ya tiene manifest: los commits compiten por su ETag
+    assert manager.append_dataset(pedidos("Tacos")) == 1
+    otra_sesion = s3_manager_modulo.S3Manager()
+    confirmar_original = s3_manager_modulo.confirmar
+    llamadas = []
+
+    def confirmar_con_carrera(*args, **kwargs):
+        # Justo antes del primer commit, otra sesión guarda su lote en la misma partición
+        if not llamadas:
+            llamadas.append("carrera")
+            monkeypatch.setattr(s3_manager_modulo, "confirmar", confirmar_original)
+            assert otra_sesion.append_dataset(pedidos("Torta", "Agua")) == 2
+            monkeypatch.setattr(s3_manager_modulo, "confirmar", confirmar_con_carrera)
+        return confirmar_original(*args, **kwargs)
+
+    monkeypatch.setattr(s3_manager_modulo, "confirmar", confirmar_con_carrera)
+    # "Torta" ya lo guardó la otra sesión: al reintentar se filtra y solo entra "Pizza"
+    assert manager.append_dataset(pedidos("Torta", "Pizza")) == 1
+
+    assert manager.commit_conflicts == 1
+    manifest = leer_manifest(manager.s3_client, BUCKET, PARTICION)
+    assert manifest.version == 3
+    assert len(manifest.partes) == 3
+    guardados = manager.query_dataset()
+    assert sorted(guardados["producto"].astype(str)) == ["Agua", "Pizza", "Tacos", "Torta"]
+
+
+def test_append_partition_se_rinde_tras_agotar_los_reintentos(manager, monkeypatch):
+    assert manager.append_dataset(pedidos("Tacos")) == 1
+
+    def siempre_en_conflicto(*args, **kwargs):
+        raise ClientError({"Error": {"Code": "PreconditionFailed"}}, "PutObject")
+
+    monkeypatch.setattr(s3_manager_modulo, "confirmar", siempre_en_conflicto)
+    monkeypatch.setattr(s3_manager_modulo, "COMMIT_RETRIES", 2)
+    grupo = pedidos("Torta").assign(clave=lambda df: claves_pedidos(df))
+
+    with pytest.raises(ConflictoConcurrente):
+        manager._append_partition(PARTICION, grupo)
+    assert manager.commit_conflicts == 3
+    assert leer_manifest(manager.s3_client, BUCKET, PARTICION).version == 1
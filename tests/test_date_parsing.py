@@ -0,0 +1,72 @@
+import io
+
+import pandas as pd
+import pytest
+
+from chat_parser import MARCADOR_PEDIDO, extraer_chat, parse_bloque
+from date_parsing import marcas_de_tiempo, segundos_del_dia
+
+NBSP, ANGOSTO = "\u00a0", "\u202f"
+
+
+@pytest.mark.parametrize("hora, esperado", [
+    ("21:05:12", 21 * 3600 + 5 * 60 + 12),
+    ("00:00:00", 0),
+    ("9:05:12", 9 * 3600 + 5 * 60 + 12),
+    ("21:05", 21 * 3600 + 5 * 60),
+    ("9:05:12 p. m.", 21 * 3600 + 5 * 60 + 12),
+    (f"9:05:12{ANGOSTO}p.{ANGOSTO}m.", 21 * 3600 + 5 * 60 + 12),
+    (f"9:05{NBSP}a.{NBSP}m.", 9 * 3600 + 5 * 60),
+    ("9:05:12 PM", 21 * 3600 + 5 * 60 + 12),
+    ("9:05:12 am", 9 * 3600 + 5 * 60 + 12),
+    ("12:30:00 a. m.", 30 * 60),
+    ("12:30:00 p. m.", 12 * 3600 + 30 * 60),
+    ("11:59:59 PM", 23 * 3600 + 59 * 60 + 59),
+])
+def test_segundos_del_dia_con_reloj_de_24_y_12_horas(hora, esperado):
+    assert segundos_del_dia(pd.Series([hora]))[0] == esperado
+
+
+@pytest.mark.parametrize("hora", ["24:00:00", "13:00:00 p. m.", "0:30 AM", "9:61", "9:05 x. m.", "", None])
+def test_segundos_del_dia_invalidas_quedan_na(hora):
+    assert segundos_del_dia(pd.Series([hora], dtype=object)).isna().all()
+
+
+def test_segundos_del_dia_mezcla_de_formatos_conserva_el_indice():
+    horas = pd.Series(["21:05:12", "9:05:12 p. m.", None, "21:05:12"], index=[5, 6, 7, 8])
+
+    resultado = segundos_del_dia(horas)
+
+    assert resultado.index.tolist() == [5, 6, 7, 8]
+    assert resultado.tolist() == [75912, 75912, pd.NA, 75912]
+
+
+def test_marcas_de_tiempo_iguales_en_ambos_relojes():
+    fechas = pd.to_datetime(pd.Series(["2025-03-05", "2025-03-05", None]))
+    marcas = marcas_de_tiempo(fechas, pd.Series(["21:05:12", "9:05:12 p. m.", "21:05:12"]))
+
+    esperado = int(pd.Timestamp("2025-03-05 21:05:12").timestamp())
+    assert marcas.tolist() == [esperado, esperado, pd.NA]
+
+
+def pedido(encabezado):
+    return f"{encabezado} Yupii: {MARCADOR_PEDIDO}\n📍Tacomarin\n_*Pedido*_\nTacos\n_*Entregar en*_\nCalle 1\n_*Cobrar*_\n$40\n"
+
+
+def test_chat_con_reloj_de_12_horas():
+    # Como en el original, la fecha de cada pedido es la del encabezado que sigue a su marcador
+    chat = "[05/03/25, 20:00:00] Yupii: Inicio\n" + "".join([
+        pedido("[05/03/25, 21:05:12]"),
+        pedido("[05/03/25, 9:05:12 p. m.]"),
+        pedido(f"[05/03/25, 9:05:12{ANGOSTO}a.{ANGOSTO}m.]"),
+        pedido("[05/03/25, 12:10 AM]"),
+        "[05/03/25, 12:15 AM] Yupii: Fin\n",
+    ])
+
+    pedidos, _ = extraer_chat(io.StringIO(chat))
+
+    assert pedidos["fecha"].tolist() == [pd.Timestamp("2025-03-05")] * 4
+    horas = (pedidos["marca_tiempo"] % 86400).tolist()
+    assert horas == [75912, 9 * 3600 + 5 * 60 + 12, 10 * 60, 15 * 60]
+    bloque = chat.split(MARCADOR_PEDIDO)[2]
+    assert parse_bloque(bloque).hora == f"9:05:12{ANGOSTO}a.{ANGOSTO}m."
@@ -0,0 +1,79 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from establishments import clean_and_normalize_series, normalizar_establecimiento, normalize_series
+
+# Diccionario de la versión original de main_dashboard.py
+NORMALIZACIONES_ORIGINAL = {
+    "tacomarin": ["tacomarin centro", "taco marin", "taco marin centro", "tacomarin", "taco-marin"],
+    "mcdonalds": ["mc donalds", "mc donald's", "mcdonald's", "macdonalds", "mac donalds"],
+    "kfc": ["kentucky fried chicken", "k.f.c", "kfc", "kentucky"],
+    "burger king": ["burger king", "burgerking", "bk", "burger-king"],
+    "pizza hut": ["pizza hut", "pizzahut", "pizza-hut"],
+    "dominos": ["domino's", "dominos", "domino", "dominos pizza"],
+    "subway": ["subway", "sub way", "sub-way"],
+    "starbucks": ["starbucks", "star bucks", "star-bucks"],
+}
+
+
+def normalizar_original(establecimiento):
+    """normalizar_establecimiento de la versión original de main_dashboard.py"""
+    if not establecimiento or pd.isna(establecimiento):
+        return establecimiento
+
+    nombre = str(establecimiento).strip().lower()
+    for nombre_unificado, variaciones in NORMALIZACIONES_ORIGINAL.items():
+        for variacion in variaciones:
+            if variacion in nombre:
+                return nombre_unificado.title()
+
+    nombre_limpio = nombre
+    for palabra in [" centro", " local", " sucursal", " principal", " #1", " no. 1", " numero 1"]:
+        nombre_limpio = nombre_limpio.replace(palabra, "")
+    nombre_limpio = re.sub(r'\s+', ' ', nombre_limpio)
+    nombre_limpio = re.sub(r'[^\w\s]', '', nombre_limpio)
+    nombre_limpio = nombre_limpio.strip()
+
+    for nombre_unificado, variaciones in NORMALIZACIONES_ORIGINAL.items():
+        for variacion in variaciones:
+            if variacion.replace(" ", "").replace("-", "") in nombre_limpio.replace(" ", ""):
+                return nombre_unificado.title()
+
+    return establecimiento.strip().title()
+
+
+NOMBRES = [
+    "Tacomarin Centro", "TACO MARIN", "  taco-marin  ", "Mc Donald's", "MacDonalds Plaza", "K.F.C",
+    "Kentucky", "BK Express", "Burger-King", "Pizza-Hut local", "pizzahut", "Domino's Pizza", "Sub Way",
+    "Star Bucks", "star-bucks centro", "Mc-Donalds", "Tortas Lupita", "tortas  lupita sucursal",
+    "Mariscos El Güero", "Farmacia #1", "Oxxo No. 1", "Café Ñoño", "K F C", "Abkhaz", "Subwayy",
+    "Domino", "Pizzas Juan", "donde sea", "-", "", "x", "🍕 Pizza Hut", "Super K.F.C.",
+]
+
+
+@pytest.mark.parametrize("nombre", NOMBRES)
+def test_normalizar_establecimiento_igual_al_original(nombre):
+    assert normalizar_establecimiento(nombre) == normalizar_original(nombre)
+
+
+def test_normalize_series_igual_al_original():
+    valores = pd.Series(NOMBRES * 3 + [None, np.nan], index=range(100, 100 + len(NOMBRES) * 3 + 2), name="establecimiento")
+
+    resultado = normalize_series(valores)
+
+    esperado = valores.map(normalizar_original, na_action="ignore")
+    pd.testing.assert_series_equal(resultado, esperado.astype(object))
+
+
+def test_clean_and_normalize_series_descarta_valores_invalidos():
+    valores = pd.Series(["Taco Marin", "donde sea", "-", "Pizza-Hut local", None])
+
+    limpios, normalizados = clean_and_normalize_series(valores)
+
+    assert normalizados.astype(object).where(normalizados.notna(), None).tolist() == [
+        "Tacomarin", None, None, "Pizza Hut", None
+    ]
+    assert limpios.isna().tolist() == [False, True, True, False, True]
@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+
+import s3_manager as s3_manager_modulo
+from conftest import BUCKET
+from size_cache import SizeBoundedCache
+
+LEGADO = "datasets/dataset_global.csv"
+CSV = (
+    "fecha,establecimiento,producto,costo_envio,repartidor\n"
+    "2024-11-03,Tacomarin,Tacos,40,Ana\n"
+    "2024-12-10,Kfc,Pollo,55,Beto\n"
+    "2024-12-11,Kfc,Pollo,35,Ana\n"
+)
+
+
+@pytest.fixture
+def lecturas(manager, monkeypatch):
+    """GETs del CSV anterior hechos por el manager, con la cache del CSV vacía"""
+    monkeypatch.setattr(s3_manager_modulo, "_legacy_cache", SizeBoundedCache(64 * 1024 * 1024))
+    manager.s3_client.put_object(Bucket=BUCKET, Key=LEGADO, Body=CSV.encode("utf-8"))
+    registro = []
+    get_object = manager.s3_client.get_object
+
+    def contar(**kwargs):
+        if kwargs["Key"] == LEGADO:
+            registro.append(kwargs)
+        return get_object(**kwargs)
+
+    monkeypatch.setattr(manager.s3_client, "get_object", contar)
+    return registro
+
+
+def test_csv_sin_migrar_se_lee_una_vez_por_version(manager, lecturas):
+    for _ in range(3):
+        resumen = manager.dataset_overview()
+        pedidos = manager.query_dataset(pd.Timestamp("2024-12-01"), pd.Timestamp("2024-12-31"), repartidores=["Ana"])
+        kpis = manager.query_rollup(pd.Timestamp("2024-12-01"), pd.Timestamp("2024-12-31"))
+
+    assert len(lecturas) == 1
+    assert resumen["repartidores"] == ["Ana", "Beto"]
+    assert resumen["meses"] == ["2024-11", "2024-12"]
+    assert pedidos["producto"].astype(str).tolist() == ["Pollo"]
+    assert pedidos["costo_envio"].tolist() == [35]
+    assert int(kpis["envios"].sum()) == 2 and int(kpis["ingresos"].sum()) == 90
+
+    # Un CSV reemplazado tiene otro ETag: se vuelve a leer en cuanto el listado lo refleja
+    manager.s3_client.put_object(Bucket=BUCKET, Key=LEGADO, Body=CSV.replace("40,Ana", "45,Ana").encode("utf-8"))
+    manager.listing.invalidate()
+    pedidos = manager.query_dataset(repartidores=["Ana"])
+
+    assert len(lecturas) == 2
+    assert sorted(pedidos["costo_envio"].tolist()) == [35, 45]
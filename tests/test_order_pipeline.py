@@ -0,0 +1,75 @@
+import os
+
+import pytest
+from botocore.exceptions import EndpointConnectionError
+
+import order_pipeline
+from conftest import BUCKET
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "chat_pedidos.txt")
+KEY = "pedidos/_chat_ana.txt"
+
+
+@pytest.fixture
+def errores(manager, monkeypatch):
+    """Errores reportados al S3Manager y mostrados con st.error"""
+    registro = {"reportados": [], "mostrados": []}
+    monkeypatch.setattr(manager, "report_error", registro["reportados"].append)
+    monkeypatch.setattr(order_pipeline.st, "error", registro["mostrados"].append)
+    monkeypatch.setattr(order_pipeline, "_cache", order_pipeline.SizeBoundedCache(1024 * 1024 * 1024))
+    return registro
+
+
+def subir(manager, contenido: bytes):
+    manager.s3_client.put_object(Bucket=BUCKET, Key=KEY, Body=contenido)
+
+
+def test_utf8_invalido_devuelve_none_sin_cachear(manager, errores):
+    with open(FIXTURE, "rb") as archivo:
+        valido = archivo.read()
+    subir(manager, valido[:100] + b"\xff\xfe" + valido[100:])
+
+    assert order_pipeline.cargar_pedidos_s3(manager, KEY) is None
+    assert [type(e) for e in errores["reportados"]] == [UnicodeDecodeError]
+    assert len(errores["mostrados"]) == 1
+    assert len(order_pipeline._cache) == 0
+
+    # Al corregir el archivo se procesa normalmente
+    subir(manager, valido)
+    assert len(order_pipeline.cargar_pedidos_s3(manager, KEY).df) == 8
+
+
+def test_error_de_red_a_mitad_de_la_lectura_marca_la_conexion(manager, errores, monkeypatch):
+    with open(FIXTURE, "rb") as archivo:
+        subir(manager, archivo.read())
+
+    def red_caida(archivo):
+        archivo.read(10)
+        raise EndpointConnectionError(endpoint_url="https://s3.amazonaws.com")
+
+    monkeypatch.setattr(order_pipeline, "procesar_chat", red_caida)
+
+    assert order_pipeline.cargar_pedidos_s3(manager, KEY) is None
+    assert [type(e) for e in errores["reportados"]] == [EndpointConnectionError]
+    assert len(errores["mostrados"]) == 1
+    assert len(order_pipeline._cache) == 0
+
+
+def test_cache_por_etag_del_contenido_leido(manager, errores, monkeypatch):
+    with open(FIXTURE, "rb") as archivo:
+        original = archivo.read()
+    reemplazo = original.replace(b"$40", b"$99")
+    procesados = []
+    procesar_chat = order_pipeline.procesar_chat
+    monkeypatch.setattr(order_pipeline, "procesar_chat", lambda archivo: procesados.append(1) or procesar_chat(archivo))
+
+    subir(manager, original)
+    assert order_pipeline.cargar_pedidos_s3(manager, KEY).df["costo_envio"].iat[0] == 40
+    subir(manager, reemplazo)
+    assert order_pipeline.cargar_pedidos_s3(manager, KEY).df["costo_envio"].iat[0] == 99
+    # Mismos bytes que la primera versión: mismo ETag y la entrada guardada es de ese contenido
+    subir(manager, original)
+    assert order_pipeline.cargar_pedidos_s3(manager, KEY).df["costo_envio"].iat[0] == 40
+
+    assert len(procesados) == 2
+    assert errores["reportados"] == [] and errores["mostrados"] == []
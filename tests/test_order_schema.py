@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from order_schema import DiccionarioTextos
+
+
+def textos(serie):
+    return serie.astype(object).where(serie.notna(), None).tolist()
+
+
+def test_codigos_fijos_y_versiones_anteriores_validas_tras_ampliar():
+    diccionario = DiccionarioTextos(max_textos=100, capacidad_inicial=2)
+    primera = diccionario.codificar(pd.Series(["Tacos", "Agua", None, "Tacos"]))
+
+    # Lotes con textos nuevos: el arreglo pasa de 2 a 4, 8 y 16 lugares
+    lotes = [diccionario.codificar(pd.Series([f"Producto {i}", "Agua"])) for i in range(10)]
+
+    assert len(diccionario) == 12
+    assert textos(primera) == ["Tacos", "Agua", None, "Tacos"]
+    assert primera.cat.codes.tolist() == [0, 1, -1, 0]
+    assert [textos(lote) for lote in lotes] == [[f"Producto {i}", "Agua"] for i in range(10)]
+    assert all(diccionario.es_compartida(serie) for serie in [primera, *lotes])
+
+    # Recodificar una versión vieja solo cambia el dtype, no los códigos
+    actual = diccionario.codificar(primera)
+    assert actual.cat.categories.is_unique and len(actual.cat.categories) == 12
+    assert actual.cat.codes.tolist() == [0, 1, -1, 0]
+
+
+def test_las_versiones_son_vistas_del_mismo_arreglo():
+    diccionario = DiccionarioTextos(max_textos=100, capacidad_inicial=8)
+    a = diccionario.codificar(pd.Series(["Tacos"]))
+    b = diccionario.codificar(pd.Series(["Agua", "Torta"]))
+
+    assert a.cat.categories.tolist() == ["Tacos"]
+    assert b.cat.categories.tolist() == ["Tacos", "Agua", "Torta"]
+    assert np.shares_memory(a.cat.categories.to_numpy(), b.cat.categories.to_numpy())
+
+    # Las tablas de versiones distintas se comparan y se unen por texto
+    assert textos(pd.concat([a, b], ignore_index=True)) == ["Tacos", "Agua", "Torta"]
+    assert (b == "Torta").tolist() == [False, True]
+
+
+def test_diccionario_lleno_usa_categorias_propias():
+    diccionario = DiccionarioTextos(max_textos=3, capacidad_inicial=2)
+    diccionario.codificar(pd.Series(["a", "b"]))
+
+    propia = diccionario.codificar(pd.Series(["c", "d"]))
+
+    assert len(diccionario) == 2
+    assert not diccionario.es_compartida(propia)
+    assert textos(propia) == ["c", "d"]
+    # Los textos ya conocidos siguen compartiéndose
+    assert diccionario.es_compartida(diccionario.codificar(pd.Series(["b", "a"])))